@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Static PromQL Cost Analysis for Alerting Rules and Dashboards
+
+This script parses every PromQL expression in alerting-rules/*.yaml and
+dashboards/*.json and estimates its query cost from the expression's shape,
+without talking to Prometheus:
+1. Series touched per selector: a metric without label filters is assumed to
+   have --series-per-metric series; equality matchers narrow it, regexes
+   narrow it less, selectors without a metric name widen it
+2. Samples loaded: range windows load range / --scrape-interval samples per
+   series; subqueries re-evaluate their inner expression once per step
+3. Load: samples per evaluation times evaluations per minute (rule group
+   interval, or dashboard refresh times the steps of its time range)
+
+Findings explain the cost: unbounded regex matchers, missing label filters,
+long range windows, nested subqueries, high-cardinality `by` clauses,
+`without` aggregations and histogram_quantile over unaggregated buckets.
+Expressions are ranked by load; --max-cost and --budget turn the estimate
+into an enforceable query-load budget.
+
+The numbers are relative estimates for ranking, not predictions of real
+latency.
+
+Usage:
+    python3 scripts/analyze-promql-cost.py
+
+    # Only alerting rules, top 10, fail if any rule loads > 50k samples
+    python3 scripts/analyze-promql-cost.py --source rules --top 10 --max-cost 50000
+
+    # Machine-readable output
+    python3 scripts/analyze-promql-cost.py --json
+
+Exit codes:
+    0: Success (within budget)
+    1: Parse errors, or --max-cost / --budget exceeded
+"""
+
+import sys
+import json
+import math
+import argparse
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from chartlib.monitoring import ExprSource, collect_expressions
+from chartlib.promql import (
+    Aggregate, Binary, Call, MatrixSelector, Node, NumberLiteral, PromQLError,
+    StringLiteral, Subquery, Unary, VectorSelector, format_duration, parse,
+)
+
+# Labels that usually have one value per pod/process/request
+HIGH_CARDINALITY_LABELS = {
+    'pod', 'instance', 'container', 'id', 'uid', 'container_id', 'pod_ip', 'ip',
+    'path', 'url', 'uri', 'user', 'tenant', 'org_id', 'trace_id', 'request_id',
+    'image', 'name', 'endpoint', 'handler', 'route', 'client', 'device',
+}
+LONG_RANGE = 3600.0
+# Histogram buckets per series group
+BUCKETS_PER_HISTOGRAM = 12
+# Steps Grafana requests at most for a panel
+MAX_DASHBOARD_POINTS = 1000
+REGEX_META = set('.*+?[](){}|\\^$')
+
+
+class Cost(NamedTuple):
+    """Estimated work for one evaluation of a (sub-)expression."""
+    series: float
+    samples: float
+
+
+class ExprReport(NamedTuple):
+    source: ExprSource
+    series: float
+    samples: float
+    load: float
+    findings: List[str]
+    error: Optional[str] = None
+
+
+def human(n: float) -> str:
+    for unit, size in (('G', 1e9), ('M', 1e6), ('k', 1e3)):
+        if n >= size:
+            return f"{n / size:.1f}{unit}"
+    return f"{n:.0f}"
+
+
+def is_literal_regex(value: str) -> bool:
+    """Regex without metacharacters (or a Grafana variable) matches like '='."""
+    if value.startswith('$'):
+        return True
+    return not (set(value) & REGEX_META)
+
+
+def literal_alternatives(value: str) -> Optional[int]:
+    """Number of alternatives for a regex like 'a|b|c', else None."""
+    parts = value.split('|')
+    if all(p and is_literal_regex(p) for p in parts):
+        return len(parts)
+    return None
+
+
+class CostModel:
+    """Estimate series/samples for an expression and collect findings."""
+
+    def __init__(self, series_per_metric: float, scrape_interval: float, step: float):
+        self.series_per_metric = series_per_metric
+        self.scrape_interval = scrape_interval
+        # Default subquery resolution (the rule evaluation interval)
+        self.step = step
+
+    def analyze(self, node: Node) -> Tuple[Cost, List[str]]:
+        findings: List[str] = []
+        cost = self._cost(node, findings, subquery_depth=0)
+        return cost, list(dict.fromkeys(findings))
+
+    def _selector_series(self, sel: VectorSelector, findings: List[str]) -> float:
+        name = sel.name
+        series = self.series_per_metric
+        positive = False
+        for m in sel.matchers:
+            if m.name == '__name__':
+                if m.op == '=':
+                    name = m.value
+                else:
+                    findings.append(f"metric name matched by regex ({m.op}\"{m.value}\")")
+                    series *= 10
+                continue
+            if m.op == '=':
+                if m.value:
+                    series /= 10
+                    positive = True
+            elif m.op == '=~':
+                if m.value in ('.*', '.+', '.*.*'):
+                    findings.append(f"{m.name}=~\"{m.value}\" matches every series")
+                    continue
+                alternatives = literal_alternatives(m.value)
+                if alternatives:
+                    series = series / 10 * min(alternatives, 10)
+                    positive = True
+                elif m.value.startswith(('.*', '.+')):
+                    findings.append(f"unbounded regex {m.name}=~\"{m.value}\" scans every label value")
+                    series /= 2
+                    positive = True
+                else:
+                    series /= 5
+                    positive = True
+            else:
+                series /= 1.1
+
+        if name is None:
+            findings.append(f"selector {{{', '.join(m.name for m in sel.matchers)}}} has no metric name")
+            series *= 50
+        elif not positive:
+            findings.append(f"no label filter on {name}")
+        if name and name.endswith('_bucket'):
+            series *= BUCKETS_PER_HISTOGRAM
+        return max(series, 1.0)
+
+    def _cost(self, node: Node, findings: List[str], subquery_depth: int) -> Cost:
+        if isinstance(node, (NumberLiteral, StringLiteral)):
+            return Cost(0, 0)
+
+        if isinstance(node, VectorSelector):
+            series = self._selector_series(node, findings)
+            return Cost(series, series)
+
+        if isinstance(node, MatrixSelector):
+            series = self._selector_series(node.vector, findings)
+            if node.range > LONG_RANGE:
+                findings.append(f"long range window [{format_duration(node.range)}] "
+                                f"on {node.vector.name or 'selector'}")
+            samples_per_series = max(node.range / self.scrape_interval, 1)
+            return Cost(series, series * samples_per_series)
+
+        if isinstance(node, Subquery):
+            step = node.step or self.step
+            evaluations = max(node.range / step, 1)
+            if subquery_depth:
+                findings.append("nested subquery multiplies inner evaluations")
+            findings.append(f"subquery [{format_duration(node.range)}:{format_duration(step)}] "
+                            f"evaluates its inner expression {evaluations:.0f} times")
+            inner = self._cost(node.expr, findings, subquery_depth + 1)
+            return Cost(inner.series, inner.samples * evaluations)
+
+        if isinstance(node, Call):
+            costs = [self._cost(arg, findings, subquery_depth) for arg in node.args]
+            if node.func == 'histogram_quantile' and len(node.args) == 2:
+                inner = node.args[1]
+                if not (isinstance(inner, Aggregate) and 'le' in inner.grouping and not inner.without):
+                    findings.append("histogram_quantile over unaggregated buckets "
+                                    "(wrap the buckets in sum by (le, ...))")
+            series = max((c.series for c in costs), default=0)
+            return Cost(series, sum(c.samples for c in costs))
+
+        if isinstance(node, Aggregate):
+            inner = self._cost(node.expr, findings, subquery_depth)
+            param = self._cost(node.param, findings, subquery_depth) if node.param is not None else Cost(0, 0)
+            if node.without:
+                findings.append(f"{node.op} without ({', '.join(node.grouping)}) keeps every other label")
+                series = inner.series
+            else:
+                high = sorted(set(node.grouping) & HIGH_CARDINALITY_LABELS)
+                if high:
+                    findings.append(f"{node.op} by ({', '.join(high)}) keeps a series per "
+                                    f"{'/'.join(high)}")
+                    series = inner.series
+                else:
+                    series = max(inner.series / 10, 1) if node.grouping else 1
+            return Cost(series, inner.samples + param.samples)
+
+        if isinstance(node, Binary):
+            lhs = self._cost(node.lhs, findings, subquery_depth)
+            rhs = self._cost(node.rhs, findings, subquery_depth)
+            # Vector/vector matching hashes both sides
+            join = lhs.series + rhs.series if lhs.series and rhs.series else 0
+            return Cost(max(lhs.series, rhs.series), lhs.samples + rhs.samples + join)
+
+        if isinstance(node, Unary):
+            return self._cost(node.expr, findings, subquery_depth)
+
+        return Cost(0, 0)
+
+
+def evaluations_per_minute(source: ExprSource, scrape_interval: float) -> float:
+    """How many instant evaluations an expression costs per minute."""
+    per_refresh = 1.0
+    if source.kind == 'panel':
+        step = max(scrape_interval, source.range / MAX_DASHBOARD_POINTS)
+        per_refresh = math.ceil(source.range / step) + 1
+    return per_refresh * 60.0 / source.interval
+
+
+def analyze(sources: List[ExprSource], model: CostModel, scrape_interval: float) -> List[ExprReport]:
+    reports = []
+    for source in sources:
+        try:
+            node = parse(source.expr)
+        except PromQLError as e:
+            reports.append(ExprReport(source, 0, 0, 0, [], str(e)))
+            continue
+        cost, findings = model.analyze(node)
+        load = cost.samples * evaluations_per_minute(source, scrape_interval)
+        reports.append(ExprReport(source, cost.series, cost.samples, load, findings))
+    return reports
+
+
+def report_json(report: ExprReport, repo_root: Path) -> Dict:
+    source = report.source
+    return {
+        'file': str(source.file.relative_to(repo_root)),
+        'kind': source.kind,
+        'name': source.name,
+        'group': source.group,
+        'expr': source.expr.strip(),
+        'series': round(report.series, 1),
+        'samples_per_eval': round(report.samples, 1),
+        'samples_per_minute': round(report.load, 1),
+        'findings': report.findings,
+        'error': report.error,
+    }
+
+
+def main():
+    """Main analysis logic."""
+    parser = argparse.ArgumentParser(
+        description='Estimate and rank the query cost of PromQL in alerting rules and dashboards'
+    )
+    parser.add_argument(
+        '--source',
+        choices=['all', 'rules', 'dashboards'],
+        default='all',
+        help='Which expressions to analyze (default: all)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        help='Number of expressions to show (default: 20, 0 = all)'
+    )
+    parser.add_argument(
+        '--scrape-interval',
+        type=float,
+        default=30.0,
+        help='Assumed scrape interval in seconds (default: 30)'
+    )
+    parser.add_argument(
+        '--series-per-metric',
+        type=float,
+        default=1000.0,
+        help='Assumed series for a metric without label filters (default: 1000)'
+    )
+    parser.add_argument(
+        '--max-cost',
+        type=float,
+        help='Fail if one evaluation of any expression loads more samples than this'
+    )
+    parser.add_argument(
+        '--budget',
+        type=float,
+        help='Fail if the total load exceeds this many samples per minute'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the ranked report as JSON'
+    )
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).parent.parent
+    sources = collect_expressions(
+        repo_root,
+        rules=args.source in ('all', 'rules'),
+        dashboards=args.source in ('all', 'dashboards')
+    )
+    model = CostModel(args.series_per_metric, args.scrape_interval, step=60.0)
+    reports = analyze(sources, model, args.scrape_interval)
+
+    errors = [r for r in reports if r.error]
+    ranked = sorted((r for r in reports if not r.error), key=lambda r: r.load, reverse=True)
+    total_load = sum(r.load for r in ranked)
+    over_cost = [r for r in ranked if args.max_cost is not None and r.samples > args.max_cost]
+    over_budget = args.budget is not None and total_load > args.budget
+    shown = ranked if args.top == 0 else ranked[:args.top]
+
+    if args.json:
+        print(json.dumps({
+            'total_samples_per_minute': round(total_load, 1),
+            'expressions': [report_json(r, repo_root) for r in shown],
+            'errors': [report_json(r, repo_root) for r in errors],
+        }, indent=2))
+    else:
+        print("=" * 80)
+        print("PromQL Cost Analysis")
+        print("=" * 80)
+        print()
+        print(f"Analyzed {len(reports)} expressions "
+              f"({sum(1 for r in reports if r.source.kind != 'panel')} rules, "
+              f"{sum(1 for r in reports if r.source.kind == 'panel')} dashboard targets)")
+        print(f"Estimated total load: {human(total_load)} samples/min")
+        print()
+
+        for rank, report in enumerate(shown, 1):
+            share = report.load / total_load * 100 if total_load else 0
+            print(f"{rank:>3}. {human(report.load):>7} samples/min ({share:4.1f}%)  "
+                  f"{human(report.samples)} per eval  [{report.source.kind}] {report.source.label}")
+            print(f"     {' '.join(report.source.expr.split())}")
+            for finding in report.findings:
+                print(f"     - {finding}")
+        if shown:
+            print()
+
+        for report in errors:
+            print(f"❌ {report.source.label}: {report.error}")
+        if errors:
+            print()
+
+        print("=" * 80)
+        if over_cost:
+            print(f"❌ {len(over_cost)} expression(s) exceed --max-cost {human(args.max_cost)} samples per eval:")
+            for report in over_cost:
+                print(f"   - {report.source.label} ({human(report.samples)})")
+        if over_budget:
+            print(f"❌ Total load {human(total_load)} samples/min exceeds --budget {human(args.budget)}")
+        if not (over_cost or over_budget or errors):
+            print("✅ Analysis complete")
+        print("=" * 80)
+
+    if errors or over_cost or over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
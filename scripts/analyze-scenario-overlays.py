@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Scenario Overlay Analyzer
+
+This script diffs every scenario values file (values-<scenario>.yaml)
+structurally against its chart's values.yaml, the way helm merges them:
+- No-op keys: overlay keys whose value equals values.yaml (or that delete
+  a key values.yaml does not have) and therefore change nothing
+- The minimal overlay: what the scenario actually changes; the merged
+  values are identical
+- Common overrides: changes every scenario of a chart makes the same way,
+  candidates for moving into values.yaml
+
+Each document of a multi-document values-example.yaml is analyzed as its
+own scenario (example#1, example#2, ...).
+
+Minimal overlays and the effective merged values can be written out for
+review. They are plain YAML dumps without the original comments, so copy
+the reductions back into the scenario files by hand rather than replacing
+them.
+
+Usage:
+    # Report every chart
+    python3 scripts/analyze-scenario-overlays.py
+
+    # One chart, listing every no-op key
+    python3 scripts/analyze-scenario-overlays.py --chart redis --keys
+
+    # Write minimal overlays and merged values to build/overlays/
+    python3 scripts/analyze-scenario-overlays.py --write-minimal --write-effective
+
+    # Fail when a scenario repeats values.yaml (e.g. in CI)
+    python3 scripts/analyze-scenario-overlays.py --check --changed-since origin/master
+
+Exit codes:
+    0: Analysis complete
+    1: Values files could not be read, or --check found no-op keys
+"""
+
+import sys
+import json
+import fnmatch
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper
+
+from chartlib import ChartRepository, find_chart_dirs
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.output import AtomicWriter
+from chartlib.overlay import common_overrides, effective_values, flatten, minimal_overlay, same_value
+from chartlib.render import ScenarioValues, chart_scenarios, scenario_values
+
+DEFAULT_OUTPUT_DIR = 'build/overlays'
+# No-op keys listed per scenario without --keys
+SHOWN_KEYS = 5
+
+
+class ScenarioReport(NamedTuple):
+    chart: str
+    scenario: str
+    values_file: str
+    keys: int
+    redundant: List[str]
+    minimal_keys: int
+    size: int
+    minimal_size: int
+    minimal: Dict[str, Any]
+    effective: Dict[str, Any]
+
+
+class OverlayDumper(SafeDumper):
+    """Writes multi-line strings (embedded configs) as literal blocks."""
+
+
+def _represent_str(dumper, data):
+    style = '|' if '\n' in data else None
+    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style=style)
+
+
+OverlayDumper.add_representer(str, _represent_str)
+
+
+def dump_yaml(values: Any) -> str:
+    return yaml.dump(values, Dumper=OverlayDumper, sort_keys=False, default_flow_style=False,
+                     allow_unicode=True)
+
+
+def leaf_count(values: Any) -> int:
+    return sum(1 for path in flatten(values) if path)
+
+
+def analyze(repo: ChartRepository, document: ScenarioValues, base: Dict) -> ScenarioReport:
+    overlay = document.values or {}
+    if not isinstance(overlay, dict):
+        raise ValueError(f"expected a mapping, got {type(overlay).__name__}")
+    result = minimal_overlay(base, overlay)
+    effective = effective_values(base, overlay)
+    # Dropping no-op keys must not change what the chart renders with
+    if not same_value(effective_values(base, result.minimal), effective):
+        raise ValueError("minimal overlay does not merge to the same values")
+    values_file = document.scenario.values_file.relative_to(repo.repo_root)
+    return ScenarioReport(
+        chart=document.scenario.chart,
+        scenario=document.name,
+        values_file=str(values_file.parent / document.source),
+        keys=leaf_count(overlay),
+        redundant=result.redundant,
+        minimal_keys=leaf_count(result.minimal),
+        size=len(dump_yaml(overlay).encode('utf-8')),
+        minimal_size=len(dump_yaml(result.minimal).encode('utf-8')) if result.minimal else 0,
+        minimal=result.minimal,
+        effective=effective,
+    )
+
+
+def main():
+    """Main analysis logic."""
+    parser = argparse.ArgumentParser(
+        description='Find no-op keys in scenario values files and compute minimal overlays'
+    )
+    parser.add_argument(
+        '--chart',
+        type=str,
+        help='Analyze specific chart only'
+    )
+    parser.add_argument(
+        '--scenario',
+        type=str,
+        help="Only scenarios matching this glob, e.g. 'prod*' or home-single"
+    )
+    parser.add_argument(
+        '--keys',
+        action='store_true',
+        help=f'List every no-op key (default: the first {SHOWN_KEYS} per scenario)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default=DEFAULT_OUTPUT_DIR,
+        help=f'Directory for --write-minimal/--write-effective (default: {DEFAULT_OUTPUT_DIR})'
+    )
+    parser.add_argument(
+        '--write-minimal',
+        action='store_true',
+        help='Write each minimal overlay to <output-dir>/<chart>/values-<scenario>.yaml'
+    )
+    parser.add_argument(
+        '--write-effective',
+        action='store_true',
+        help='Write the merged values to <output-dir>/<chart>/effective-<scenario>.yaml'
+    )
+    parser.add_argument(
+        '--json',
+        type=str,
+        metavar='FILE',
+        help='Also write the report as JSON'
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Exit 1 when any scenario has no-op keys'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Scenario Overlay Analysis")
+    print("=" * 80)
+    print()
+
+    chart_dirs = find_chart_dirs(repo.charts_dir)
+    if args.chart:
+        chart_dirs = [d for d in chart_dirs if d.name == args.chart]
+        if not chart_dirs:
+            print(f"Error: Chart '{args.chart}' not found in {repo.charts_dir}")
+            sys.exit(1)
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(
+                repo.repo_root, {d.name for d in chart_dirs}, args.changed_since, args.staged
+            )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+
+    reports: List[ScenarioReport] = []
+    common: Dict[str, List] = {}
+    errors: List[str] = []
+
+    for chart_dir in chart_dirs:
+        chart = chart_dir.name
+        try:
+            base = repo.load_yaml(chart_dir / 'values.yaml') or {}
+        except Exception as e:
+            errors.append(f"{chart}/values.yaml: {str(e).splitlines()[0]}")
+            continue
+
+        chart_reports = []
+        for scenario in chart_scenarios(chart_dir):
+            if scenario.values_file is None:
+                continue
+            if args.scenario and not fnmatch.fnmatch(scenario.name, args.scenario):
+                continue
+            try:
+                documents = scenario_values(repo, scenario)
+            except Exception as e:
+                errors.append(f"{scenario.label}: {str(e).splitlines()[0]}")
+                continue
+            # Multi-document example files are analyzed one example at a time
+            for document in documents:
+                try:
+                    chart_reports.append(analyze(repo, document, base))
+                except Exception as e:
+                    errors.append(f"{document.label}: {str(e).splitlines()[0]}")
+        reports.extend(chart_reports)
+
+        shared = common_overrides(r.minimal for r in chart_reports)
+        if shared:
+            common[chart] = shared
+    repo.save_cache()
+
+    print(f"{'Scenario':<40} {'Keys':>6} {'No-op':>6} {'Kept':>6} {'YAML bytes':>18}")
+    print("-" * 80)
+    for report in reports:
+        saved = 1 - report.minimal_size / report.size if report.size else 0.0
+        sizes = f"{report.size} -> {report.minimal_size}"
+        print(f"{report.chart + '/' + report.scenario:<40} {report.keys:>6} {len(report.redundant):>6} "
+              f"{report.minimal_keys:>6} {sizes:>18} ({saved:>4.0%})")
+        shown = report.redundant if args.keys else report.redundant[:SHOWN_KEYS]
+        for path in shown:
+            print(f"    = {path}")
+        if len(report.redundant) > len(shown):
+            print(f"    ... and {len(report.redundant) - len(shown)} more (--keys to list all)")
+    print("-" * 80)
+    total_keys = sum(r.keys for r in reports)
+    total_redundant = sum(len(r.redundant) for r in reports)
+    total_size = sum(r.size for r in reports)
+    total_minimal = sum(r.minimal_size for r in reports)
+    sizes = f"{total_size} -> {total_minimal}"
+    print(f"{'Total':<40} {total_keys:>6} {total_redundant:>6} "
+          f"{sum(r.minimal_keys for r in reports):>6} {sizes:>18}")
+    print()
+
+    for chart, shared in common.items():
+        scenarios = sum(1 for r in reports if r.chart == chart)
+        print(f"ℹ️  {chart}: {len(shared)} override(s) identical in all {scenarios} scenarios "
+              f"(candidates for values.yaml)")
+        for path, value in shared[:SHOWN_KEYS] if not args.keys else shared:
+            print(f"    {path}: {json.dumps(value)}")
+        if not args.keys and len(shared) > SHOWN_KEYS:
+            print(f"    ... and {len(shared) - SHOWN_KEYS} more (--keys to list all)")
+    if common:
+        print()
+
+    output_dir = repo.repo_root / args.output_dir
+    written = 0
+    for report in reports:
+        # example#2 (the second document of values-example.yaml) -> example-2
+        name = report.scenario.replace('#', '-')
+        if args.write_minimal:
+            header = (f"# Minimal overlay of {report.values_file} over values.yaml\n"
+                      f"# (generated by scripts/analyze-scenario-overlays.py; comments not kept)\n")
+            body = dump_yaml(report.minimal) if report.minimal else "{}\n"
+            with AtomicWriter(output_dir / report.chart / f"values-{name}.yaml") as writer:
+                writer.write(header + body)
+            written += writer.changed
+        if args.write_effective:
+            with AtomicWriter(output_dir / report.chart / f"effective-{name}.yaml") as writer:
+                writer.write(dump_yaml(report.effective))
+            written += writer.changed
+
+    if args.json:
+        document = {
+            'scenarios': [
+                {
+                    'chart': r.chart,
+                    'scenario': r.scenario,
+                    'file': r.values_file,
+                    'keys': r.keys,
+                    'redundant': r.redundant,
+                    'minimal_keys': r.minimal_keys,
+                    'yaml_bytes': r.size,
+                    'minimal_yaml_bytes': r.minimal_size,
+                }
+                for r in reports
+            ],
+            'common_overrides': {
+                chart: {path: value for path, value in shared}
+                for chart, shared in common.items()
+            },
+        }
+        with AtomicWriter(Path(args.json)) as writer:
+            writer.write(json.dumps(document, indent=2) + '\n')
+
+    print("=" * 80)
+    with_redundant = sum(1 for r in reports if r.redundant)
+    print(f"{len(reports)} scenario(s) in {len(chart_dirs)} chart(s): "
+          f"{with_redundant} with no-op keys, {total_redundant} of {total_keys} key(s) removable")
+    if args.write_minimal or args.write_effective:
+        print(f"   {written} file(s) updated in {args.output_dir}")
+    if args.json:
+        print(f"   Report: {args.json}")
+    failed = bool(errors) or (args.check and with_redundant > 0)
+    if errors:
+        print(f"❌ {len(errors)} values file(s) could not be analyzed:")
+        for error in errors:
+            print(f"  - {error}")
+    elif args.check and with_redundant:
+        print("❌ Scenario files repeat values.yaml - remove the keys listed above")
+    else:
+        print("✅ Overlay analysis complete")
+    print("=" * 80)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
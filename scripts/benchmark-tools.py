@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Metadata and Docs Tooling
+
+This script generates synthetic repositories (charts-metadata.yaml, one
+Chart.yaml and a couple of values files per chart) and times the metadata
+tools against them, so scaling problems show up before they reach CI:
+- validate: validate-chart-metadata.py
+- sync: sync-chart-keywords.py --dry-run
+- catalog: generate-chart-catalog.py
+- dashboard: generate-artifacthub-dashboard.py
+
+Each tool runs as a subprocess from a copy of scripts/ inside the synthetic
+repository, first cold (empty parse/section caches, no generated docs) and
+then warm. Wall time and peak RSS of the child process are recorded; the
+best of --repeat runs is kept. About 10% of the synthetic charts have
+keywords that differ from the metadata so validate and sync do real work.
+
+Results can be saved as a baseline JSON and later runs compared against it.
+A measurement regresses when it exceeds the baseline by more than
+--threshold (ratio) and by more than --min-delta seconds, so noise on tiny
+timings does not fail the run. The scaling table shows how time grows from
+one size to the next; an exponent well above 1.0 means superlinear work.
+
+Usage:
+    # Run the default sizes (50, 500, 5000) and compare with the baseline
+    python3 scripts/benchmark-tools.py
+
+    # Quick run, store the result as the new baseline
+    python3 scripts/benchmark-tools.py --sizes 50 500 --save-baseline
+
+    # Only some tools, keep the generated repositories for inspection
+    python3 scripts/benchmark-tools.py --tools catalog dashboard --workdir /tmp/bench
+
+Exit codes:
+    0: Success (no regressions)
+    1: Regressions against the baseline or a tool failed
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+import yaml
+
+SCRIPTS_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPTS_DIR.parent
+DEFAULT_BASELINE = SCRIPTS_DIR / 'benchmark-baseline.json'
+DEFAULT_SIZES = [50, 500, 5000]
+RESULTS_VERSION = 1
+
+CATEGORIES = ['application', 'infrastructure', 'database', 'monitoring', 'storage']
+TAGS = ['Monitoring', 'Database', 'Storage', 'Networking', 'Security', 'Observability',
+        'Messaging', 'Caching', 'CI-CD', 'Analytics', 'Search', 'Backup']
+WORDS = ['backup', 'cache', 'cluster', 'metrics', 'proxy', 'queue', 'replica', 's3',
+         'search', 'sql', 'storage', 'stream', 'tls', 'tracing', 'web', 'worker']
+MISMATCH_RATIO = 0.1
+SEED = 20240601
+
+
+class Tool(NamedTuple):
+    """One benchmarked command."""
+    script: str
+    args: Tuple[str, ...]
+    # Exit codes that still count as a successful run
+    ok_codes: Tuple[int, ...] = (0,)
+
+
+TOOLS: Dict[str, Tool] = {
+    # Synthetic keyword mismatches make validation exit 1
+    'validate': Tool('validate-chart-metadata.py', (), (0, 1)),
+    'sync': Tool('sync-chart-keywords.py', ('--dry-run',)),
+    'catalog': Tool('generate-chart-catalog.py', ()),
+    'dashboard': Tool('generate-artifacthub-dashboard.py', ()),
+}
+
+# Files each tool generates; removed before a cold run
+GENERATED_DOCS = ['docs/CHARTS.md', 'docs/ARTIFACTHUB_DASHBOARD.md']
+
+
+class Measurement(NamedTuple):
+    """Best wall time and peak RSS over the repeats of one run."""
+    wall: float
+    rss_kb: int
+
+
+def chart_name(i: int) -> str:
+    return f"chart-{i:05d}"
+
+
+def generate_repository(root: Path, size: int) -> None:
+    """Write a synthetic repository with `size` charts and a copy of scripts/."""
+    rng = random.Random(SEED + size)
+    charts_dir = root / 'charts'
+    charts_dir.mkdir(parents=True)
+    (root / 'docs').mkdir()
+
+    metadata = {'charts': {}}
+    for i in range(size):
+        name = chart_name(i)
+        keywords = [name] + rng.sample(WORDS, 5)
+        metadata['charts'][name] = {
+            'name': f"Chart {i}",
+            'path': f"charts/{name}",
+            'category': rng.choice(CATEGORIES),
+            'tags': rng.sample(TAGS, 3),
+            'keywords': keywords,
+            'description': f"Synthetic chart {i} for benchmarking the metadata tools",
+        }
+
+        chart_keywords = list(keywords)
+        if rng.random() < MISMATCH_RATIO:
+            chart_keywords[-1] = 'stale-keyword'
+
+        chart_dir = charts_dir / name
+        chart_dir.mkdir()
+        (chart_dir / 'templates').mkdir()
+        chart_yaml = (
+            "apiVersion: v2\n"
+            f"name: {name}\n"
+            f"description: Synthetic chart {i}\n"
+            "type: application\n"
+            "\n"
+            "# Keywords are synced from charts-metadata.yaml\n"
+            "keywords:\n"
+            + ''.join(f"  - {kw}\n" for kw in chart_keywords) +
+            "\n"
+            "annotations:\n"
+            "  artifacthub.io/license: Apache-2.0\n"
+            "  artifacthub.io/prerelease: \"false\"\n"
+            "\n"
+            "home: https://example.com\n"
+            "version: 0.1.0\n"
+            f"appVersion: \"1.{i % 50}.0\"\n"
+        )
+        (chart_dir / 'Chart.yaml').write_text(chart_yaml, encoding='utf-8')
+
+        values = {
+            'replicaCount': 1,
+            'image': {'repository': f"example/{name}", 'tag': '', 'pullPolicy': 'IfNotPresent'},
+            'service': {'type': 'ClusterIP', 'port': 8080},
+            'resources': {'limits': {'cpu': '500m', 'memory': '512Mi'}},
+            'persistence': {'enabled': True, 'size': '8Gi'},
+        }
+        (chart_dir / 'values.yaml').write_text(yaml.safe_dump(values, sort_keys=False), encoding='utf-8')
+        (chart_dir / 'values-home-single.yaml').write_text(
+            yaml.safe_dump({'resources': {'limits': {'cpu': '250m'}}}, sort_keys=False), encoding='utf-8'
+        )
+
+    with open(charts_dir / 'charts-metadata.yaml', 'w', encoding='utf-8') as f:
+        yaml.safe_dump(metadata, f, sort_keys=False, allow_unicode=True)
+
+    shutil.copytree(
+        SCRIPTS_DIR, root / 'scripts',
+        ignore=shutil.ignore_patterns('__pycache__', '*.sh', 'benchmark-*')
+    )
+
+
+def run_tool(root: Path, tool: Tool, env: Dict[str, str]) -> Tuple[float, int, int]:
+    """Run one tool; returns (wall seconds, peak RSS in KiB, exit code)."""
+    cmd = [sys.executable, str(root / 'scripts' / tool.script), *tool.args]
+    # stderr goes to a file: nothing drains a pipe while wait4 blocks, so a
+    # tool writing more than a pipe buffer of warnings would never exit
+    with tempfile.TemporaryFile() as stderr_file:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=root, env=env,
+                                stdout=subprocess.DEVNULL, stderr=stderr_file)
+        # wait4 reports the child's own rusage, not the max over all children
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode('utf-8', errors='replace')
+
+    rss_kb = rusage.ru_maxrss
+    if sys.platform == 'darwin':
+        rss_kb //= 1024
+    if proc.returncode not in tool.ok_codes:
+        print(f"  ❌ {tool.script} exited with {proc.returncode}")
+        if stderr.strip():
+            print('     ' + stderr.strip().replace('\n', '\n     '))
+    return wall, rss_kb, proc.returncode
+
+
+def reset_cold_state(root: Path, cache_dir: Path) -> None:
+    """Drop caches and generated docs so the next run starts cold."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    for doc in GENERATED_DOCS:
+        (root / doc).unlink(missing_ok=True)
+
+
+def benchmark_size(
+    root: Path,
+    size: int,
+    tools: List[str],
+    repeat: int
+) -> Tuple[Dict[str, Dict[str, Measurement]], bool]:
+    """Time each tool cold and warm against one synthetic repository."""
+    cache_dir = root / '.cache' / 'chart-tools'
+    env = dict(os.environ, CHART_TOOLS_CACHE_DIR=str(cache_dir), PYTHONDONTWRITEBYTECODE='1')
+    env.pop('CHART_TOOLS_NO_CACHE', None)
+
+    results = {}
+    ok = True
+    for name in tools:
+        tool = TOOLS[name]
+        cold, warm = [], []
+        for _ in range(repeat):
+            reset_cold_state(root, cache_dir)
+            wall, rss, code = run_tool(root, tool, env)
+            ok &= code in tool.ok_codes
+            cold.append((wall, rss))
+            wall, rss, code = run_tool(root, tool, env)
+            ok &= code in tool.ok_codes
+            warm.append((wall, rss))
+        results[name] = {
+            'cold': Measurement(min(w for w, _ in cold), max(r for _, r in cold)),
+            'warm': Measurement(min(w for w, _ in warm), max(r for _, r in warm)),
+        }
+        print(f"  {name:<10} cold {results[name]['cold'].wall:8.3f}s "
+              f"{results[name]['cold'].rss_kb / 1024:7.1f} MiB   "
+              f"warm {results[name]['warm'].wall:8.3f}s "
+              f"{results[name]['warm'].rss_kb / 1024:7.1f} MiB")
+    return results, ok
+
+
+def to_json(results: Dict[int, Dict[str, Dict[str, Measurement]]]) -> Dict:
+    """Results document written to --output / the baseline."""
+    return {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'yaml': yaml.__version__,
+        'cext': bool(getattr(yaml, '__with_libyaml__', False)),
+        'results': {
+            str(size): {
+                tool: {phase: m._asdict() for phase, m in phases.items()}
+                for tool, phases in tools.items()
+            }
+            for size, tools in results.items()
+        },
+    }
+
+
+def print_scaling(results: Dict[int, Dict[str, Dict[str, Measurement]]]) -> None:
+    """Growth of warm wall time between consecutive sizes."""
+    sizes = sorted(results)
+    if len(sizes) < 2:
+        return
+    print("Scaling (warm wall time; exponent 1.0 = linear):")
+    for tool in next(iter(results.values())):
+        parts = []
+        for small, large in zip(sizes, sizes[1:]):
+            t_small = results[small][tool]['warm'].wall
+            t_large = results[large][tool]['warm'].wall
+            exponent = math.log(t_large / t_small) / math.log(large / small)
+            parts.append(f"{small}->{large}: x{t_large / t_small:.1f} (n^{exponent:.2f})")
+        per_chart = results[sizes[-1]][tool]['warm'].wall / sizes[-1] * 1e6
+        print(f"  {tool:<10} {'  '.join(parts)}  [{per_chart:.0f} µs/chart at {sizes[-1]}]")
+    print()
+
+
+def compare_with_baseline(
+    current: Dict,
+    baseline: Dict,
+    threshold: float,
+    min_delta: float
+) -> List[str]:
+    """Return one line per measurement that regressed against the baseline."""
+    regressions = []
+    for size, tools in current['results'].items():
+        for tool, phases in tools.items():
+            for phase, measurement in phases.items():
+                base = baseline.get('results', {}).get(size, {}).get(tool, {}).get(phase)
+                if not base:
+                    continue
+                wall, base_wall = measurement['wall'], base['wall']
+                if wall > base_wall * threshold and wall - base_wall > min_delta:
+                    regressions.append(
+                        f"{tool} {phase} @ {size} charts: wall {base_wall:.3f}s -> {wall:.3f}s "
+                        f"(x{wall / base_wall:.2f})"
+                    )
+                rss, base_rss = measurement['rss_kb'], base['rss_kb']
+                if rss > base_rss * threshold:
+                    regressions.append(
+                        f"{tool} {phase} @ {size} charts: peak RSS {base_rss / 1024:.1f} MiB -> "
+                        f"{rss / 1024:.1f} MiB (x{rss / base_rss:.2f})"
+                    )
+    return regressions
+
+
+def main():
+    """Main benchmark logic."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark the metadata and docs tools on synthetic repositories'
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=DEFAULT_SIZES,
+        help='Chart counts to benchmark (default: 50 500 5000)'
+    )
+    parser.add_argument(
+        '--tools',
+        nargs='+',
+        choices=list(TOOLS),
+        default=list(TOOLS),
+        help='Tools to benchmark (default: all)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=1,
+        help='Runs per measurement; the fastest is kept (default: 1)'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=str,
+        default=str(DEFAULT_BASELINE.relative_to(REPO_ROOT)),
+        help='Baseline JSON to compare against (default: scripts/benchmark-baseline.json)'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Write this run as the new baseline instead of comparing'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        help='Also write this run as JSON to OUTPUT'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.5,
+        help='Regression ratio against the baseline (default: 1.5)'
+    )
+    parser.add_argument(
+        '--min-delta',
+        type=float,
+        default=0.1,
+        help='Ignore wall time regressions smaller than this many seconds (default: 0.1)'
+    )
+    parser.add_argument(
+        '--workdir',
+        type=str,
+        help='Generate repositories here and keep them (default: temporary directory)'
+    )
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    print("=" * 80)
+    print("Metadata Tooling Benchmark")
+    print("=" * 80)
+    print()
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='chart-bench-'))
+    results = {}
+    all_ok = True
+    try:
+        for size in sorted(set(args.sizes)):
+            root = workdir / f"repo-{size}"
+            shutil.rmtree(root, ignore_errors=True)
+            start = time.perf_counter()
+            generate_repository(root, size)
+            print(f"{size} charts (generated in {time.perf_counter() - start:.1f}s):")
+            results[size], ok = benchmark_size(root, size, args.tools, args.repeat)
+            all_ok &= ok
+            print()
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_scaling(results)
+    current = to_json(results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + '\n', encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+    baseline_file = REPO_ROOT / args.baseline
+    regressions = []
+    if args.save_baseline:
+        baseline_file.write_text(json.dumps(current, indent=2) + '\n', encoding='utf-8')
+        print(f"✅ Baseline written to {baseline_file}")
+    elif baseline_file.exists():
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(current, baseline, args.threshold, args.min_delta)
+        if baseline.get('platform') != current['platform'] or baseline.get('cext') != current['cext']:
+            print(f"⚠️  Baseline was recorded on {baseline.get('platform')} "
+                  f"(libyaml: {baseline.get('cext')}); timings may not be comparable")
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {baseline_file}:")
+            for line in regressions:
+                print(f"  - {line}")
+        else:
+            print(f"✅ No regressions against {baseline_file}")
+    else:
+        print(f"ℹ️  No baseline at {baseline_file}; run with --save-baseline to record one")
+
+    print()
+    print("=" * 80)
+
+    if regressions or not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Incremental Helm Repository Index Builder
+
+This script maintains a Helm repository index.yaml without regenerating it:
+it compares each chart's Chart.yaml version with the versions already in the
+index, runs `helm package` only for versions that are not there yet (on a
+bounded pool of helm processes, hashing each new tarball as it is built),
+and merges the new entries into the existing index. Existing entries are
+kept exactly as they are, so old tarballs are never downloaded, read or
+re-hashed, and an index with nothing to add is left untouched.
+
+With --json, a compact index.json sidecar is written next to index.yaml
+(chart -> latest version and per-version appVersion/digest/url), so clients
+can resolve versions without downloading the full YAML.
+
+Usage:
+    # Package new chart versions into build/helm-repo and update its index
+    python3 scripts/build-helm-index.py
+
+    # Update a gh-pages checkout, with the JSON sidecar
+    python3 scripts/build-helm-index.py --repo-dir ../gh-pages --json
+
+    # Show which charts would be packaged
+    python3 scripts/build-helm-index.py --dry-run
+
+Exit codes:
+    0: Index up to date
+    1: Packaging failed, or the existing index or a Chart.yaml is invalid
+"""
+
+import re
+import sys
+import json
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import yaml
+
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.output import AtomicWriter, file_digest
+from chartlib.parallel import map_ordered
+from chartlib.repository import ChartRepository, find_chart_dirs
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:  # pragma: no cover - libyaml not available
+    from yaml import SafeLoader, SafeDumper
+
+DEFAULT_REPO_DIR = 'build/helm-repo'
+DEFAULT_URL_TEMPLATE = (
+    'https://github.com/ScriptonBasestar-containers/sb-helm-charts/releases/download/'
+    '{name}-{version}/{name}-{version}.tgz'
+)
+INDEX_API_VERSION = 'v1'
+TIMESTAMP_TAG = 'tag:yaml.org,2002:timestamp'
+# Chart.yaml fields copied into an index entry (Helm's chart metadata)
+METADATA_FIELDS = (
+    'apiVersion', 'name', 'version', 'kubeVersion', 'description', 'type', 'keywords', 'home',
+    'sources', 'dependencies', 'maintainers', 'icon', 'appVersion', 'deprecated', 'annotations',
+)
+SEMVER_RE = re.compile(r'^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$')
+
+
+class IndexLoader(SafeLoader):
+    """Loads index.yaml keeping `created` timestamps as the original strings."""
+
+
+IndexLoader.yaml_implicit_resolvers = {
+    first: [(tag, regexp) for tag, regexp in resolvers if tag != TIMESTAMP_TAG]
+    for first, resolvers in SafeLoader.yaml_implicit_resolvers.items()
+}
+
+
+class Package(NamedTuple):
+    name: str
+    version: str
+    chart_dir: Path
+    metadata: Dict[str, Any]
+
+
+class Packaged(NamedTuple):
+    package: Package
+    path: Optional[Path]
+    digest: str
+    error: str
+
+
+def version_key(version: str) -> Tuple:
+    """Sort key ordering versions like semver (releases after their prereleases)."""
+    m = SEMVER_RE.match(str(version))
+    if not m:
+        return (-1, -1, -1, 0, ())
+    major, minor, patch, pre = m.groups()
+    pre_key: Tuple = ()
+    if pre:
+        pre_key = tuple((0, int(p), '') if p.isdigit() else (1, 0, p) for p in pre.split('.'))
+    return (int(major), int(minor or 0), int(patch or 0), 0 if pre else 1, pre_key)
+
+
+def load_index(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {'apiVersion': INDEX_API_VERSION, 'entries': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        index = yaml.load(f, Loader=IndexLoader) or {}
+    if not isinstance(index, dict) or not isinstance(index.get('entries') or {}, dict):
+        raise ValueError(f"{path} is not a Helm repository index")
+    index.setdefault('apiVersion', INDEX_API_VERSION)
+    index['entries'] = index.get('entries') or {}
+    return index
+
+
+def dump_index(index: Dict[str, Any]) -> str:
+    return yaml.dump(index, Dumper=SafeDumper, default_flow_style=False, sort_keys=False,
+                     allow_unicode=True, width=1000)
+
+
+def timestamp() -> str:
+    """RFC 3339 UTC timestamp as Helm writes it."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def package_chart(package: Package, destination: Path, helm: str, extra_args: Sequence[str]) -> Packaged:
+    cmd = [helm, 'package', str(package.chart_dir), '--destination', str(destination)] + list(extra_args)
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    except OSError as e:
+        return Packaged(package, None, '', f"{helm} not available: {e}")
+    path = destination / f"{package.name}-{package.version}.tgz"
+    if proc.returncode != 0 or not path.exists():
+        error = proc.stderr.decode('utf-8', 'replace').strip() or f"{path.name} was not created"
+        return Packaged(package, None, '', error)
+    return Packaged(package, path, file_digest(path), '')
+
+
+def index_entry(packaged: Packaged, url_template: str, created: str) -> Dict[str, Any]:
+    metadata = packaged.package.metadata
+    entry = {field: metadata[field] for field in METADATA_FIELDS if metadata.get(field) not in (None, '', [], {})}
+    # Unquoted versions like 1.10 must not be written back as numbers
+    for field in ('version', 'appVersion'):
+        if field in entry:
+            entry[field] = str(entry[field])
+    url = url_template.format(name=packaged.package.name, version=packaged.package.version)
+    entry.update({'created': created, 'digest': packaged.digest, 'urls': [url]})
+    return entry
+
+
+def sidecar(index: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact version lookup: chart -> latest and version -> appVersion/digest/url."""
+    charts = {}
+    for name, entries in sorted(index['entries'].items()):
+        versions = {}
+        for entry in entries:
+            versions[str(entry.get('version'))] = {
+                'appVersion': entry.get('appVersion', ''),
+                'digest': entry.get('digest', ''),
+                'url': (entry.get('urls') or [''])[0],
+            }
+        releases = [v for v in versions if '-' not in v] or list(versions)
+        charts[name] = {'latest': max(releases, key=version_key), 'versions': versions}
+    return {'apiVersion': INDEX_API_VERSION, 'generated': index.get('generated', ''), 'charts': charts}
+
+
+def main():
+    """Main indexing logic."""
+    parser = argparse.ArgumentParser(
+        description='Package new chart versions and merge them into a Helm repository index.yaml'
+    )
+    parser.add_argument(
+        '--chart',
+        type=str,
+        help='Index specific chart only'
+    )
+    parser.add_argument(
+        '--repo-dir',
+        type=str,
+        default=DEFAULT_REPO_DIR,
+        help=f'Directory holding index.yaml; new packages are written here (default: {DEFAULT_REPO_DIR})'
+    )
+    parser.add_argument(
+        '--url-template',
+        type=str,
+        default=DEFAULT_URL_TEMPLATE,
+        help='Download URL of a package, with {name} and {version} placeholders '
+             '(default: GitHub release asset, as chart-releaser publishes)'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Also write the compact index.json sidecar'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Concurrent helm processes (default: 0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--helm',
+        type=str,
+        default='helm',
+        help='helm binary (default: helm)'
+    )
+    parser.add_argument(
+        '--helm-arg',
+        action='append',
+        default=[],
+        metavar='ARG',
+        help='Extra argument for helm package, e.g. --helm-arg=--dependency-update; repeatable'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='List chart versions that would be packaged without running helm'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+    repo_dir = repo.repo_root / args.repo_dir
+    index_path = repo_dir / 'index.yaml'
+    json_path = repo_dir / 'index.json'
+
+    print("=" * 80)
+    print("Helm Repository Index" + (" (DRY RUN)" if args.dry_run else ""))
+    print("=" * 80)
+    print()
+
+    chart_dirs = find_chart_dirs(repo.charts_dir)
+    if args.chart:
+        chart_dirs = [d for d in chart_dirs if d.name == args.chart]
+        if not chart_dirs:
+            print(f"Error: Chart '{args.chart}' not found in {repo.charts_dir}")
+            sys.exit(1)
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(
+                repo.repo_root, {d.name for d in chart_dirs}, args.changed_since, args.staged
+            )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+
+    try:
+        index = load_index(index_path)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"❌ Error: cannot read {index_path}: {e}")
+        sys.exit(1)
+    indexed = {
+        name: {str(entry.get('version')) for entry in entries or []}
+        for name, entries in index['entries'].items()
+    }
+    print(f"{args.repo_dir}/index.yaml: {len(indexed)} chart(s), "
+          f"{sum(len(v) for v in indexed.values())} version(s)")
+    print()
+
+    pending: List[Package] = []
+    errors: List[str] = []
+    for chart_dir in chart_dirs:
+        try:
+            metadata = repo.chart_yaml(chart_dir.name) or {}
+        except Exception as e:
+            errors.append(f"{chart_dir.name}: cannot read Chart.yaml: {e}")
+            continue
+        name, version = metadata.get('name'), metadata.get('version')
+        if not name or not version:
+            errors.append(f"{chart_dir.name}: Chart.yaml has no name or version")
+            continue
+        if str(version) not in indexed.get(name, set()):
+            pending.append(Package(str(name), str(version), chart_dir, metadata))
+
+    for package in pending:
+        previous = sorted(indexed.get(package.name, ()), key=version_key)
+        since = f" (indexed: {previous[-1]})" if previous else " (new chart)"
+        print(f"📦 {package.name} {package.version}{since}")
+    if not pending:
+        print("✅ Every chart version is already in the index")
+
+    results: List[Packaged] = []
+    if pending and not args.dry_run:
+        repo_dir.mkdir(parents=True, exist_ok=True)
+        results = map_ordered(
+            lambda p: package_chart(p, repo_dir, args.helm, args.helm_arg),
+            pending, jobs=args.jobs, executor='thread'
+        )
+        print()
+        for packaged in results:
+            if packaged.error:
+                errors.append(f"{packaged.package.name} {packaged.package.version}: {packaged.error}")
+            else:
+                print(f"✅ {packaged.path.name}  sha256:{packaged.digest[:12]}")
+
+    added = [p for p in results if not p.error]
+    updated = False
+    if added:
+        created = timestamp()
+        for packaged in added:
+            entries = index['entries'].setdefault(packaged.package.name, [])
+            entries.append(index_entry(packaged, args.url_template, created))
+            entries.sort(key=lambda e: version_key(e.get('version', '')), reverse=True)
+        index['entries'] = dict(sorted(index['entries'].items()))
+        index['generated'] = created
+        with AtomicWriter(index_path) as writer:
+            writer.write(dump_index(index))
+        updated = True
+    if args.json and not args.dry_run and (updated or not json_path.exists()) and index_path.exists():
+        with AtomicWriter(json_path) as writer:
+            writer.write(json.dumps(sidecar(index), separators=(',', ':'), sort_keys=True) + '\n')
+
+    print()
+    print("=" * 80)
+    if args.dry_run:
+        print(f"{len(pending)} chart version(s) would be packaged")
+    else:
+        print(f"Added {len(added)} chart version(s) to {args.repo_dir}/index.yaml"
+              + ("" if updated else " (unchanged)"))
+    if errors:
+        print(f"❌ {len(errors)} error(s):")
+        for error in errors:
+            print(f"  - {error}")
+    print("=" * 80)
+
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
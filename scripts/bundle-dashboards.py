@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Bundle Grafana Dashboards into ConfigMaps
+
+This script packs dashboards/*.json into ConfigMaps for Grafana sidecar
+provisioning (see docs/DASHBOARD_PROVISIONING_GUIDE.md):
+
+- Canonicalizes each dashboard: `id` is nulled, fields Grafana rewrites on
+  every save or load (version, iteration, panel pluginVersion, the resolved
+  current/options of query and datasource variables) are dropped, and keys
+  are sorted
+- Minifies the JSON; with --compress stores it gzip+base64 in binaryData
+  under `<name>.json.gz`. The sidecar writes binaryData as-is and Grafana
+  only loads *.json files, so compressed bundles need a step of your own
+  that gunzips them into the dashboards folder
+- Bin-packs dashboards into ConfigMaps under --budget bytes (default 900KiB
+  of the 1MiB object limit)
+- Records per-dashboard SHA-256 hashes and the ConfigMap each dashboard went
+  to in bundle-manifest.json. The next run keeps dashboards in the same
+  ConfigMap while they fit, so editing one dashboard only changes its own
+  ConfigMap and the sidecar does not reload the others. Unchanged ConfigMap
+  files are not rewritten.
+
+Usage:
+    # Write build/dashboards/grafana-dashboards-<n>.yaml
+    python3 scripts/bundle-dashboards.py
+
+    # Compressed, for a namespace and folder
+    python3 scripts/bundle-dashboards.py --compress --namespace monitoring --folder Observability
+
+    # Show the packing without writing files
+    python3 scripts/bundle-dashboards.py --dry-run
+
+    # Consolidate after dashboards were removed
+    python3 scripts/bundle-dashboards.py --repack
+
+Exit codes:
+    0: Success
+    1: A dashboard is invalid or larger than the budget
+"""
+
+import re
+import sys
+import copy
+import gzip
+import json
+import base64
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from chartlib.monitoring import dashboard_files
+from chartlib.output import AtomicWriter
+from chartlib.yamledit import render_scalar
+
+DEFAULT_OUTPUT_DIR = 'build/dashboards'
+DEFAULT_PREFIX = 'grafana-dashboards'
+DEFAULT_LABEL = 'grafana_dashboard=1'
+MANIFEST_NAME = 'bundle-manifest.json'
+
+CONFIGMAP_LIMIT = 1024 * 1024
+DEFAULT_BUDGET = 900 * 1024
+# Reserved per ConfigMap for metadata, labels and annotations
+METADATA_OVERHEAD = 2048
+
+SIZE_RE = re.compile(r'^(\d+)\s*(Ki|Mi|KiB|MiB|k|M)?$')
+SIZE_UNITS = {None: 1, 'Ki': 1024, 'KiB': 1024, 'k': 1000, 'Mi': 1024 ** 2, 'MiB': 1024 ** 2, 'M': 1000 ** 2}
+
+# Rewritten by Grafana on save/load; they only produce diffs
+VOLATILE_DASHBOARD_KEYS = ('version', 'iteration')
+VOLATILE_PANEL_KEYS = ('pluginVersion',)
+REFRESHED_VARIABLE_TYPES = ('query', 'datasource')
+
+
+class BundleItem(NamedTuple):
+    name: str           # dashboard file stem
+    key: str            # ConfigMap key
+    payload: str        # minified JSON or base64 gzip
+    binary: bool
+    sha256: str         # of the canonical JSON
+    original: int       # bytes on disk
+    minified: int
+
+    @property
+    def size(self) -> int:
+        return len(self.key) + len(self.payload.encode('utf-8'))
+
+
+class Bundle(NamedTuple):
+    name: str
+    items: List[BundleItem]
+
+    @property
+    def size(self) -> int:
+        return METADATA_OVERHEAD + sum(item.size for item in self.items)
+
+
+def parse_size(text: str) -> int:
+    m = SIZE_RE.match(str(text).strip())
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid size {text!r} (e.g. 900Ki, 1Mi, 500000)")
+    return int(m.group(1)) * SIZE_UNITS[m.group(2)]
+
+
+def _iter_panels(panels: List[Dict]) -> Iterator[Dict]:
+    for panel in panels or []:
+        yield panel
+        yield from _iter_panels(panel.get('panels'))
+
+
+def canonicalize(dashboard: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a dashboard without fields that change on every save or load."""
+    dashboard = copy.deepcopy(dashboard)
+    dashboard['id'] = None
+    for key in VOLATILE_DASHBOARD_KEYS:
+        dashboard.pop(key, None)
+    for panel in _iter_panels(dashboard.get('panels')):
+        for key in VOLATILE_PANEL_KEYS:
+            panel.pop(key, None)
+    for variable in (dashboard.get('templating') or {}).get('list') or []:
+        if variable.get('type') in REFRESHED_VARIABLE_TYPES and variable.get('refresh'):
+            variable['current'] = {}
+            variable['options'] = []
+    return dashboard
+
+
+def minify(dashboard: Dict[str, Any]) -> str:
+    return json.dumps(dashboard, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def build_item(path: Path, compress: bool) -> BundleItem:
+    raw = path.read_bytes()
+    text = minify(canonicalize(json.loads(raw)))
+    data = text.encode('utf-8')
+    sha = hashlib.sha256(data).hexdigest()
+    if compress:
+        # mtime=0 keeps the output byte-identical across runs
+        packed = base64.b64encode(gzip.compress(data, compresslevel=9, mtime=0)).decode('ascii')
+        return BundleItem(path.stem, f"{path.stem}.json.gz", packed, True, sha, len(raw), len(data))
+    return BundleItem(path.stem, f"{path.stem}.json", text, False, sha, len(raw), len(data))
+
+
+def load_manifest(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def pack(items: List[BundleItem], budget: int, prefix: str,
+         previous: Dict[str, str]) -> List[Bundle]:
+    """First-fit decreasing, keeping dashboards in their previous ConfigMap while they fit."""
+    bins: Dict[str, List[BundleItem]] = {}
+
+    def fits(name: str, item: BundleItem) -> bool:
+        return Bundle(name, bins.get(name, []) + [item]).size <= budget
+
+    pending = []
+    for item in sorted(items, key=lambda i: (-i.size, i.name)):
+        name = previous.get(item.name)
+        if name and name.startswith(f"{prefix}-") and fits(name, item):
+            bins.setdefault(name, []).append(item)
+        else:
+            pending.append(item)
+
+    for item in pending:
+        target = next((name for name in sorted(bins, key=_bin_index) if fits(name, item)), None)
+        if target is None:
+            index = 1
+            while f"{prefix}-{index}" in bins:
+                index += 1
+            target = f"{prefix}-{index}"
+        bins.setdefault(target, []).append(item)
+
+    return [Bundle(name, sorted(bins[name], key=lambda i: i.key)) for name in sorted(bins, key=_bin_index)]
+
+
+def _bin_index(name: str) -> int:
+    suffix = name.rsplit('-', 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+def render_configmap(bundle: Bundle, namespace: Optional[str], labels: Dict[str, str],
+                     folder: Optional[str]) -> str:
+    checksum = hashlib.sha256(
+        ''.join(f"{item.key}\0{item.sha256}\0" for item in bundle.items).encode('utf-8')
+    ).hexdigest()
+    lines = [
+        "# Generated by scripts/bundle-dashboards.py from dashboards/*.json. Do not edit manually.",
+        "apiVersion: v1",
+        "kind: ConfigMap",
+        "metadata:",
+        f"  name: {bundle.name}",
+    ]
+    if namespace:
+        lines.append(f"  namespace: {render_scalar(namespace)}")
+    lines.append("  labels:")
+    lines.extend(f"    {key}: {render_scalar(value)}" for key, value in labels.items())
+    lines.append("  annotations:")
+    lines.append(f"    checksum/dashboards: {checksum}")
+    if folder:
+        lines.append(f"    grafana_folder: {render_scalar(folder)}")
+
+    text_items = [item for item in bundle.items if not item.binary]
+    binary_items = [item for item in bundle.items if item.binary]
+    if text_items:
+        lines.append("data:")
+        for item in text_items:
+            lines.append(f"  {item.key}: |-")
+            lines.append(f"    {item.payload}")
+    if binary_items:
+        lines.append("binaryData:")
+        lines.extend(f"  {item.key}: {item.payload}" for item in binary_items)
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def main():
+    """Main bundling logic."""
+    parser = argparse.ArgumentParser(
+        description='Bundle Grafana dashboards into size-limited ConfigMaps'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default=DEFAULT_OUTPUT_DIR,
+        help=f'Directory for ConfigMaps and {MANIFEST_NAME} (default: {DEFAULT_OUTPUT_DIR})'
+    )
+    parser.add_argument(
+        '--budget',
+        type=parse_size,
+        default=DEFAULT_BUDGET,
+        help='Maximum ConfigMap size, e.g. 900Ki or 512000 (default: 900Ki)'
+    )
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='Store dashboards gzip+base64 in binaryData (needs a gunzip step before Grafana)'
+    )
+    parser.add_argument(
+        '--prefix',
+        type=str,
+        default=DEFAULT_PREFIX,
+        help=f'ConfigMap name prefix (default: {DEFAULT_PREFIX})'
+    )
+    parser.add_argument(
+        '--namespace',
+        type=str,
+        help='Namespace for the ConfigMaps (default: none, use kubectl -n)'
+    )
+    parser.add_argument(
+        '--label',
+        action='append',
+        metavar='KEY=VALUE',
+        help=f'Label watched by the Grafana sidecar; repeatable (default: {DEFAULT_LABEL})'
+    )
+    parser.add_argument(
+        '--folder',
+        type=str,
+        help='Grafana folder (grafana_folder annotation)'
+    )
+    parser.add_argument(
+        '--repack',
+        action='store_true',
+        help='Ignore previous placements and pack as tightly as possible (changes every ConfigMap)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show the packing without writing files'
+    )
+    args = parser.parse_args()
+
+    if args.budget > CONFIGMAP_LIMIT:
+        parser.error(f'--budget cannot exceed the ConfigMap limit of {CONFIGMAP_LIMIT} bytes')
+    labels = {}
+    for entry in args.label or [DEFAULT_LABEL]:
+        key, sep, value = entry.partition('=')
+        if not sep or not key:
+            parser.error(f'--label expects KEY=VALUE, got {entry!r}')
+        labels[key] = value
+
+    repo_root = Path(__file__).parent.parent
+    output_dir = repo_root / args.output_dir
+    manifest_path = output_dir / MANIFEST_NAME
+
+    print("=" * 80)
+    print("Dashboard ConfigMap Bundling" + (" (DRY RUN)" if args.dry_run else ""))
+    print("=" * 80)
+    print()
+    if args.compress:
+        print("⚠️  --compress: the Grafana sidecar does not decompress <name>.json.gz and")
+        print("   Grafana only loads *.json; gunzip the files before Grafana reads them")
+        print()
+
+    items, errors = [], []
+    for path in dashboard_files(repo_root):
+        try:
+            item = build_item(path, args.compress)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            errors.append(f"{path.name}: invalid JSON: {e}")
+            continue
+        if Bundle('', [item]).size > args.budget:
+            errors.append(f"{path.name}: {item.size:,} bytes does not fit the {args.budget:,} byte budget")
+            continue
+        items.append(item)
+    for error in errors:
+        print(f"❌ {error}")
+    if errors:
+        print()
+        sys.exit(1)
+
+    manifest = load_manifest(manifest_path)
+    previous_hashes = {name: entry.get('sha256') for name, entry in (manifest.get('dashboards') or {}).items()}
+    previous_bins = {name: entry.get('configmap') for name, entry in (manifest.get('dashboards') or {}).items()}
+    if manifest.get('compress') != args.compress:
+        previous_hashes = {}
+    if args.repack:
+        previous_bins = {}
+    bundles = pack(items, args.budget, args.prefix, previous_bins)
+
+    print(f"{'Dashboard':<28} {'Original':>10} {'Minified':>10} {'Stored':>10}  ConfigMap")
+    print("-" * 80)
+    placement = {item.name: bundle.name for bundle in bundles for item in bundle.items}
+    for item in sorted(items, key=lambda i: i.name):
+        status = '' if previous_hashes.get(item.name) == item.sha256 else ' (changed)'
+        print(f"{item.name:<28} {item.original:>10,} {item.minified:>10,} {len(item.payload):>10,}  "
+              f"{placement[item.name]}{status}")
+    original = sum(item.original for item in items)
+    stored = sum(len(item.payload) for item in items)
+    print("-" * 80)
+    if original:
+        print(f"{'Total':<28} {original:>10,} {sum(i.minified for i in items):>10,} {stored:>10,}  "
+              f"({stored / original:.0%} of original)")
+    print()
+
+    stale = sorted(set((manifest.get('configmaps') or {})) - {bundle.name for bundle in bundles})
+    updated = 0
+    for bundle in bundles:
+        text = render_configmap(bundle, args.namespace, labels, args.folder)
+        path = output_dir / f"{bundle.name}.yaml"
+        if args.dry_run:
+            changed = not path.exists() or path.read_text(encoding='utf-8') != text
+        else:
+            with AtomicWriter(path) as writer:
+                writer.write(text)
+            changed = writer.changed
+        updated += changed
+        icon = '✏️ ' if changed else '✅'
+        print(f"{icon} {bundle.name}: {len(bundle.items)} dashboard(s), "
+              f"{bundle.size:,}/{args.budget:,} bytes ({bundle.size / args.budget:.0%})"
+              f"{' - updated' if changed else ' - unchanged'}")
+    for name in stale:
+        print(f"🗑️  {name}: no longer needed - delete it from the cluster")
+        if not args.dry_run:
+            (output_dir / f"{name}.yaml").unlink(missing_ok=True)
+
+    if not args.dry_run:
+        new_manifest = {
+            'budget': args.budget,
+            'compress': args.compress,
+            'configmaps': {
+                bundle.name: {'size': bundle.size, 'dashboards': [item.name for item in bundle.items]}
+                for bundle in bundles
+            },
+            'dashboards': {
+                item.name: {
+                    'configmap': placement[item.name],
+                    'key': item.key,
+                    'sha256': item.sha256,
+                    'original_bytes': item.original,
+                    'stored_bytes': len(item.payload),
+                }
+                for item in sorted(items, key=lambda i: i.name)
+            },
+        }
+        with AtomicWriter(manifest_path) as writer:
+            writer.write(json.dumps(new_manifest, indent=2, ensure_ascii=False) + '\n')
+
+    print()
+    print("=" * 80)
+    print(f"{len(bundles)} ConfigMap(s), {updated} to apply" + (f", {len(stale)} to delete" if stale else ""))
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
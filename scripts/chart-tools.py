@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Chart Tooling CLI
+
+One entry point for the metadata tools, so a make-driven pipeline starts the
+interpreter (and imports PyYAML) once instead of once per tool:
+
+- validate:  validate-chart-metadata.py
+- sync:      sync-chart-keywords.py
+- catalog:   generate-chart-catalog.py
+- dashboard: generate-artifacthub-dashboard.py
+- index:     generate-catalog-index.py
+- docs:      generate-docs.py (catalog, dashboard and index from one model)
+- watch:     watch-charts.py (re-validate and regenerate on every save)
+
+Several subcommands can run in one invocation. Each one takes the same
+arguments as its script, written after the subcommand name; the next
+subcommand name starts the next command. Only the scripts of the requested
+subcommands are imported, and all of them share one ChartRepository, so
+charts-metadata.yaml and every Chart.yaml are parsed at most once per run
+(a Chart.yaml rewritten by sync is re-read by the commands after it).
+
+Usage:
+    # Sync keywords, regenerate the docs, then validate, in one process
+    python3 scripts/chart-tools.py sync docs validate
+
+    # Per-command arguments follow the command name
+    python3 scripts/chart-tools.py sync --dry-run --changed-since origin/master \\
+        validate --changed-since origin/master
+
+    # Run every command even after a failure, with per-phase timings
+    python3 scripts/chart-tools.py --keep-going --timings validate catalog dashboard
+
+    # List the subcommands
+    python3 scripts/chart-tools.py --list
+
+Options given before the first subcommand apply to the whole run
+(--timings, --trace and --profile cover every command).
+
+Exit codes:
+    0: Every command succeeded
+    1: A command failed (the remaining ones are skipped unless --keep-going)
+"""
+
+import sys
+import time
+import argparse
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class Command(NamedTuple):
+    script: str
+    help: str
+
+
+COMMANDS: Dict[str, Command] = {
+    'validate': Command('validate-chart-metadata', 'Validate Chart.yaml files against charts-metadata.yaml'),
+    'sync': Command('sync-chart-keywords', 'Sync Chart.yaml keywords and fields from metadata'),
+    'catalog': Command('generate-chart-catalog', 'Generate docs/CHARTS.md'),
+    'dashboard': Command('generate-artifacthub-dashboard', 'Generate docs/ARTIFACTHUB_DASHBOARD.md'),
+    'index': Command('generate-catalog-index', 'Generate docs/charts-index.json'),
+    'docs': Command('generate-docs', 'Generate catalog, dashboard and index from one model'),
+    'watch': Command('watch-charts', 'Re-validate and regenerate docs on every metadata change'),
+}
+
+
+def split_commands(tokens: List[str]) -> Tuple[List[str], List[Tuple[str, List[str]]]]:
+    """Split argv into global options and (command, arguments) pairs."""
+    global_args: List[str] = []
+    commands: List[Tuple[str, List[str]]] = []
+    for token in tokens:
+        if token in COMMANDS:
+            commands.append((token, []))
+        elif commands:
+            commands[-1][1].append(token)
+        else:
+            global_args.append(token)
+    return global_args, commands
+
+
+def run_command(name: str, argv: List[str], repo) -> int:
+    """Import a command's script and run its main(); returns the exit code."""
+    from chartlib.scripts import load_script
+    from chartlib.timing import span
+
+    with span(f"command {name}"):
+        module = load_script(COMMANDS[name].script)
+        try:
+            module.main(argv, repo=repo)
+        except SystemExit as e:
+            if e.code is None or e.code == 0:
+                return 0
+            if not isinstance(e.code, int):
+                print(e.code)
+                return 1
+            return e.code
+    return 0
+
+
+def main():
+    """Main dispatch logic."""
+    global_args, commands = split_commands(sys.argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description='Run chart metadata tools as subcommands in one process',
+        usage='%(prog)s [options] COMMAND [ARGS...] [COMMAND [ARGS...] ...]',
+        epilog='Commands: ' + ', '.join(COMMANDS)
+               + '. Arguments after a command are passed to its script '
+               '(see python3 scripts/chart-tools.py COMMAND --help).'
+    )
+    parser.add_argument(
+        '--keep-going', '-k',
+        action='store_true',
+        help='Run the remaining commands after one fails'
+    )
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List the available commands and exit'
+    )
+    # Not chartlib.timing.add_timing_arguments(): importing chartlib pulls in
+    # PyYAML, which --help and --list do without
+    group = parser.add_argument_group('instrumentation')
+    group.add_argument('--timings', action='store_true',
+                       help='Print a per-phase timing table when done')
+    group.add_argument('--trace', type=str, metavar='FILE',
+                       help='Write timing spans as a Chrome trace (JSON lines if FILE ends in .jsonl)')
+    group.add_argument('--profile', nargs='?', const='', metavar='FILE',
+                       help='Run under cProfile and print the top functions; FILE also saves the stats')
+    args = parser.parse_args(global_args)
+
+    if args.list:
+        for name, command in COMMANDS.items():
+            print(f"{name:<10} {command.help} (scripts/{command.script}.py)")
+        return
+
+    if not commands:
+        parser.print_usage()
+        print("Error: No command given (use --list to see the commands)")
+        sys.exit(1)
+
+    try:
+        from chartlib import ChartRepository
+        from chartlib.timing import instrument
+    except ImportError as e:
+        print(f"Error: {e}. Install with: pip install -r scripts/requirements.txt")
+        sys.exit(1)
+
+    instrument(args)
+    repo = ChartRepository()
+
+    results: List[Tuple[str, int, float]] = []
+    for name, argv in commands:
+        started = time.perf_counter()
+        code = run_command(name, argv, repo)
+        results.append((name, code, time.perf_counter() - started))
+        print()
+        if code != 0 and not args.keep_going:
+            break
+
+    skipped = [name for name, _ in commands[len(results):]]
+
+    print("=" * 80)
+    print("Chart Tools Summary")
+    print("=" * 80)
+    for name, code, seconds in results:
+        status = "✅" if code == 0 else f"❌ (exit {code})"
+        print(f"  {name:<10} {seconds:>7.2f}s  {status}")
+    for name in skipped:
+        print(f"  {name:<10} {'':>8}  ⏭️  skipped")
+    print("=" * 80)
+
+    if any(code != 0 for _, code, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
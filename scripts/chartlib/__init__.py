@@ -0,0 +1,18 @@
+"""
+Shared helpers for the chart tooling in scripts/
+
+The standalone scripts (validate-chart-metadata.py, sync-chart-keywords.py,
+generate-chart-catalog.py, generate-artifacthub-dashboard.py) import this
+package from the scripts/ directory, which Python puts on sys.path when a
+script is run directly.
+"""
+
+from chartlib.cache import ParseCache
+from chartlib.repository import ChartRepository, find_chart_dirs, load_yaml_file
+
+__all__ = [
+    'ChartRepository',
+    'ParseCache',
+    'find_chart_dirs',
+    'load_yaml_file',
+]
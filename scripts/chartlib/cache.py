@@ -0,0 +1,214 @@
+"""
+On-disk YAML parse cache
+
+Parsed documents are stored by the SHA-256 of the file content, so identical
+content is only ever parsed once. A (mtime_ns, size) fingerprint per path is
+the fast path: when it matches, the file is not even read. When it does not,
+the file is hashed and the content cache is consulted before falling back to
+a real YAML parse.
+
+Values are kept pickled, so every lookup returns a fresh object and callers
+are free to mutate what they get back.
+
+Environment:
+    CHART_TOOLS_CACHE_DIR: Override the cache directory
+    CHART_TOOLS_NO_CACHE:  Set to 1 to disable the on-disk cache
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from chartlib.timing import span
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# Bump when the on-disk layout changes
+CACHE_VERSION = 1
+CACHE_FILENAME = 'parse-cache.pickle'
+# Suffix of the path and digest keys of load_yaml_documents() entries
+DOCUMENTS_KEY = '\0documents'
+
+
+def cache_dir_for(repo_root: Path) -> Path:
+    """Return the cache directory for a repository."""
+    override = os.environ.get('CHART_TOOLS_CACHE_DIR')
+    if override:
+        return Path(override)
+    return repo_root / '.cache' / 'chart-tools'
+
+
+def cache_disabled() -> bool:
+    """Check whether the on-disk cache is disabled via environment."""
+    return os.environ.get('CHART_TOOLS_NO_CACHE', '') not in ('', '0')
+
+
+def parse_yaml(data: bytes) -> Any:
+    """Parse a single YAML document, using libyaml when available."""
+    return yaml.load(data.decode('utf-8'), Loader=SafeLoader)
+
+
+def parse_yaml_documents(data: bytes) -> List[Any]:
+    """Parse every document of a YAML stream, using libyaml when available."""
+    return list(yaml.load_all(data.decode('utf-8'), Loader=SafeLoader))
+
+
+class ParseCache:
+    """Content-hash keyed cache of parsed YAML files."""
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        self.cache_file = cache_file
+        # path -> (mtime_ns, size, digest)
+        self._files: Dict[str, Tuple[int, int, str]] = {}
+        # digest -> pickled document
+        self._values: Dict[str, bytes] = {}
+        # paths re-fingerprinted since the last take_updates()
+        self._updated: Set[str] = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if cache_file is not None:
+            self._read()
+
+    @classmethod
+    def for_repo(cls, repo_root: Path) -> 'ParseCache':
+        """Create the cache for a repository, honouring the environment."""
+        if cache_disabled():
+            return cls(None)
+        return cls(cache_dir_for(repo_root) / CACHE_FILENAME)
+
+    def _signature(self) -> str:
+        return f"{CACHE_VERSION}:{yaml.__version__}:{SafeLoader.__name__}"
+
+    def _read(self) -> None:
+        try:
+            with open(self.cache_file, 'rb') as f:
+                payload = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return
+        if not isinstance(payload, dict) or payload.get('signature') != self._signature():
+            return
+        self._files = payload.get('files', {})
+        self._values = payload.get('values', {})
+
+    def load_yaml(self, path: Path) -> Any:
+        """Return the parsed content of a YAML file.
+
+        Raises OSError or yaml.YAMLError like a plain parse would.
+        """
+        with span(f"parse {Path(path).name}", path=path):
+            return self._load(path, '', parse_yaml)
+
+    def load_yaml_documents(self, path: Path) -> List[Any]:
+        """Return every document of a multi-document YAML file, in order.
+
+        Cached separately from load_yaml(), which rejects such files.
+        """
+        with span(f"parse {Path(path).name}", path=path):
+            return self._load(path, DOCUMENTS_KEY, parse_yaml_documents)
+
+    def _load(self, path: Path, suffix: str, parse: Callable[[bytes], Any]) -> Any:
+        filename = str(Path(path).resolve())
+        key = filename + suffix
+        st = os.stat(filename)
+        entry = self._files.get(key)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            blob = self._values.get(entry[2])
+            if blob is not None:
+                self.hits += 1
+                return pickle.loads(blob)
+
+        with open(filename, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest() + suffix
+        blob = self._values.get(digest)
+        if blob is None:
+            self.misses += 1
+            value = parse(data)
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            self._values[digest] = blob
+        else:
+            self.hits += 1
+            value = pickle.loads(blob)
+
+        self._files[key] = (st.st_mtime_ns, st.st_size, digest)
+        self._updated.add(key)
+        self._dirty = True
+        return value
+
+    def take_updates(self) -> Dict[str, Tuple[int, int, str, bytes]]:
+        """Return entries added since the last call, for merge() elsewhere.
+
+        Worker processes use this to hand their fresh parses back to the
+        parent, which owns the on-disk cache.
+        """
+        updates = {}
+        for key in self._updated:
+            mtime_ns, size, digest = self._files[key]
+            updates[key] = (mtime_ns, size, digest, self._values[digest])
+        self._updated.clear()
+        return updates
+
+    def merge(self, updates: Dict[str, Tuple[int, int, str, bytes]]) -> None:
+        """Adopt entries produced by take_updates() in another cache."""
+        for key, (mtime_ns, size, digest, blob) in updates.items():
+            self._files[key] = (mtime_ns, size, digest)
+            self._values[digest] = blob
+            self._dirty = True
+
+    def invalidate(self, path: Path) -> None:
+        """Forget the fingerprint of a single file."""
+        filename = str(Path(path).resolve())
+        for key in (filename, filename + DOCUMENTS_KEY):
+            self._updated.discard(key)
+            if self._files.pop(key, None) is not None:
+                self._dirty = True
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._files.clear()
+        self._values.clear()
+        self._updated.clear()
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back to disk if anything changed.
+
+        Entries for deleted files and unreferenced documents are pruned. The
+        cache is best-effort: write failures are ignored.
+        """
+        if self.cache_file is None or not self._dirty:
+            return
+
+        self._files = {p: e for p, e in self._files.items() if os.path.exists(p.partition(DOCUMENTS_KEY)[0])}
+        live = {e[2] for e in self._files.values()}
+        self._values = {d: v for d, v in self._values.items() if d in live}
+
+        payload = {
+            'signature': self._signature(),
+            'files': self._files,
+            'values': self._values,
+        }
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=self.cache_file.parent, prefix='.parse-cache-'
+            )
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_name, self.cache_file)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError:
+            return
+        self._dirty = False
@@ -0,0 +1,114 @@
+"""
+Catalog model and generated-docs registry
+
+CatalogModel holds everything the doc generators derive from
+charts-metadata.yaml: the category grouping, the tag and keyword indexes and
+the version info from each chart's Chart.yaml. It is built once and shared
+by every output.
+
+Generators register their outputs with register_output(); a single
+write_outputs() call then renders all of them from the same model.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+from chartlib.output import write_lines
+from chartlib.repository import ChartRepository
+
+
+class CatalogModel:
+    """Grouping and indexes over charts-metadata.yaml."""
+
+    def __init__(self, metadata: Dict, repository: Optional[ChartRepository] = None):
+        self.repository = repository if repository is not None else ChartRepository()
+        self.metadata = metadata or {}
+        self.charts: Dict[str, Dict] = self.metadata.get('charts', {})
+
+        # category -> [(chart_id, chart_meta)] in metadata order
+        self.categories: Dict[str, List[Tuple[str, Dict]]] = defaultdict(list)
+        # tag -> [chart_id], keyword -> {chart_id}
+        self.tags_index: Dict[str, List[str]] = defaultdict(list)
+        self.keywords_index: Dict[str, Set[str]] = defaultdict(set)
+
+        for chart_id, chart_meta in self.charts.items():
+            category = chart_meta.get('category', 'uncategorized')
+            self.categories[category].append((chart_id, chart_meta))
+            for tag in chart_meta.get('tags', []):
+                self.tags_index[tag].append(chart_id)
+            for keyword in chart_meta.get('keywords', []):
+                self.keywords_index[keyword].add(chart_id)
+
+        self._chart_infos: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, repository: ChartRepository) -> 'CatalogModel':
+        """Build the model from a repository's charts-metadata.yaml."""
+        return cls(repository.metadata, repository)
+
+    @property
+    def repo_root(self) -> Path:
+        return self.repository.repo_root
+
+    def chart_info(self, chart_id: str) -> Dict:
+        """Version info from a chart's Chart.yaml ({} when unavailable)."""
+        if chart_id not in self._chart_infos:
+            info = {}
+            chart_yaml = self.repository.charts_dir / chart_id / "Chart.yaml"
+            if chart_yaml.exists():
+                try:
+                    data = self.repository.load_yaml(chart_yaml) or {}
+                    info = {
+                        'version': data.get('version', 'N/A'),
+                        'appVersion': data.get('appVersion', 'N/A'),
+                        'home': data.get('home', ''),
+                    }
+                except Exception:
+                    info = {}
+            self._chart_infos[chart_id] = info
+        return self._chart_infos[chart_id]
+
+    def chart_infos(self) -> Dict[str, Dict]:
+        """Version info for every chart in the metadata."""
+        return {chart_id: self.chart_info(chart_id) for chart_id in self.charts}
+
+
+class DocOutput(NamedTuple):
+    """A generated file: render(model) yields chunks joined by newlines."""
+    name: str
+    path: str
+    render: Callable[[CatalogModel], Iterable[str]]
+    # Lines that differ on every render (timestamps); see AtomicWriter
+    volatile: Optional[Pattern] = None
+
+
+_OUTPUTS: Dict[str, DocOutput] = {}
+
+
+def register_output(name: str, path: str, render: Callable[[CatalogModel], Iterable[str]],
+                    volatile: Optional[Pattern] = None) -> None:
+    """Register a generated file (path is relative to the repository root).
+
+    A file whose lines only differ in lines matching volatile is not
+    rewritten.
+    """
+    _OUTPUTS[name] = DocOutput(name, path, render, volatile)
+
+
+def registered_outputs() -> Dict[str, DocOutput]:
+    """All registered outputs, by name."""
+    return dict(_OUTPUTS)
+
+
+def write_outputs(model: CatalogModel, names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+    """Render and write outputs from one model.
+
+    Returns output name -> whether the file content changed.
+    """
+    selected = list(names) if names is not None else list(_OUTPUTS)
+    results = {}
+    for name in selected:
+        output = _OUTPUTS[name]
+        results[name] = write_lines(model.repo_root / output.path, output.render(model), output.volatile)
+    return results
@@ -0,0 +1,94 @@
+"""
+Persistent per-file index
+
+FileIndex remembers a JSON-serialisable value derived from each file (e.g.
+the values paths a template references), keyed by the file's content hash
+with an mtime/size fast path, so tools only re-extract files that changed.
+`salt` should change whenever the extractor changes.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from chartlib.cache import cache_dir_for, cache_disabled
+from chartlib.output import AtomicWriter
+
+
+class FileIndex:
+    """Persistent map of file path -> (stat, digest, extracted value)."""
+
+    def __init__(self, repo_root: Path, name: str, salt: str = ''):
+        self.repo_root = Path(repo_root)
+        self.salt = salt
+        self.index_file = None if cache_disabled() else cache_dir_for(self.repo_root) / f"{name}.json"
+        self._entries: Dict[str, List] = {}
+        self._pending: Dict[str, Tuple[int, int, str]] = {}
+        self._seen = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.index_file is not None:
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                if payload.get('salt') == salt:
+                    self._entries = payload.get('files', {})
+            except (OSError, ValueError):
+                pass
+
+    def _key(self, path: Path) -> str:
+        try:
+            return str(Path(path).relative_to(self.repo_root))
+        except ValueError:
+            return str(path)
+
+    def get(self, path: Path) -> Optional[Any]:
+        """Return the stored value for path, or None if it must be re-extracted."""
+        key = self._key(path)
+        self._seen.add(key)
+        st = os.stat(path)
+        entry = self._entries.get(key)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self.hits += 1
+            return entry[3]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if entry and entry[2] == digest:
+            entry[0], entry[1] = st.st_mtime_ns, st.st_size
+            self._dirty = True
+            self.hits += 1
+            return entry[3]
+
+        self._pending[key] = (st.st_mtime_ns, st.st_size, digest)
+        self.misses += 1
+        return None
+
+    def put(self, path: Path, value: Any) -> None:
+        """Store the value extracted for a path previously missed by get()."""
+        key = self._key(path)
+        mtime_ns, size, digest = self._pending.pop(key)
+        self._entries[key] = [mtime_ns, size, digest, value]
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist the index, dropping files that no longer exist (best-effort)."""
+        if self.index_file is None:
+            return
+        # Entries for files outside this run's scope are kept while they exist
+        for key in [k for k in self._entries if k not in self._seen]:
+            if not (self.repo_root / key).exists():
+                del self._entries[key]
+                self._dirty = True
+        if not self._dirty:
+            return
+        try:
+            with AtomicWriter(self.index_file) as writer:
+                writer.write(json.dumps({'salt': self.salt, 'files': self._entries},
+                                        separators=(',', ':')))
+        except OSError:
+            return
+        self._dirty = False
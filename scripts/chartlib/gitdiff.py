@@ -0,0 +1,139 @@
+"""
+Map a git diff onto the set of affected charts
+
+Files under charts/<name>/ affect that chart. An edit to
+charts/charts-metadata.yaml only affects the entries whose content actually
+changed between the two revisions, so touching one chart's keywords does not
+force a full re-check of the repository.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from chartlib.cache import parse_yaml
+
+METADATA_PATH = 'charts/charts-metadata.yaml'
+
+
+class GitError(Exception):
+    """Raised when a git command fails."""
+
+
+def _git(repo_root: Path, *args: str) -> bytes:
+    try:
+        result = subprocess.run(
+            ['git', *args],
+            cwd=repo_root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+    except OSError as e:
+        raise GitError(f"git not available: {e}")
+    if result.returncode != 0:
+        raise GitError(result.stderr.decode('utf-8', 'replace').strip())
+    return result.stdout
+
+
+def changed_files(repo_root: Path, since: Optional[str] = None, staged: bool = False) -> List[str]:
+    """List repo-relative paths changed since a ref, or staged in the index.
+
+    With `since`, the ref is compared against the working tree, so both
+    committed and uncommitted edits count, and so do untracked files that
+    are not ignored (e.g. a new chart directory that was never added).
+    """
+    if staged:
+        out = _git(repo_root, 'diff', '--name-only', '--cached', '--no-renames')
+    else:
+        out = _git(repo_root, 'diff', '--name-only', '--no-renames', since, '--')
+        out += _git(repo_root, 'ls-files', '--others', '--exclude-standard', '--full-name')
+    return [line for line in out.decode('utf-8').splitlines() if line]
+
+
+def _metadata_charts(repo_root: Path, revision: Optional[str]) -> Optional[Dict]:
+    """charts mapping of charts-metadata.yaml at a revision.
+
+    revision None reads the working tree, '' the index; returns None when
+    the file does not exist there.
+    """
+    if revision is None:
+        path = repo_root / METADATA_PATH
+        if not path.exists():
+            return None
+        data = path.read_bytes()
+    else:
+        try:
+            data = _git(repo_root, 'show', f"{revision}:{METADATA_PATH}")
+        except GitError:
+            return None
+    return (parse_yaml(data) or {}).get('charts', {})
+
+
+def changed_metadata_entries(
+    repo_root: Path,
+    since: Optional[str] = None,
+    staged: bool = False
+) -> Optional[Set[str]]:
+    """Chart ids whose charts-metadata.yaml entry differs between revisions.
+
+    Returns None when either side has no metadata file at all, meaning every
+    chart has to be treated as affected.
+    """
+    if staged:
+        old, new = _metadata_charts(repo_root, 'HEAD'), _metadata_charts(repo_root, '')
+    else:
+        old, new = _metadata_charts(repo_root, since), _metadata_charts(repo_root, None)
+    if old is None or new is None:
+        return None
+    return {
+        chart_id
+        for chart_id in set(old) | set(new)
+        if old.get(chart_id) != new.get(chart_id)
+    }
+
+
+def affected_charts(
+    repo_root: Path,
+    all_charts: Set[str],
+    since: Optional[str] = None,
+    staged: bool = False
+) -> Set[str]:
+    """Chart ids touched by the diff.
+
+    all_charts is the full set of known chart ids (directories plus metadata
+    entries), used when the metadata file itself appeared or disappeared.
+    Metadata entries for charts without a directory are still reported so
+    callers can flag them.
+    """
+    affected = set()
+    for path in changed_files(repo_root, since, staged):
+        parts = path.split('/')
+        if path == METADATA_PATH:
+            entries = changed_metadata_entries(repo_root, since, staged)
+            if entries is None:
+                return set(all_charts)
+            affected |= entries
+        elif len(parts) > 2 and parts[0] == 'charts':
+            affected.add(parts[1])
+    return affected
+
+
+def add_diff_arguments(parser) -> None:
+    """Add the --changed-since/--staged options to an argparse parser."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        '--changed-since',
+        metavar='REF',
+        help='Only process charts changed between REF and the working tree'
+    )
+    group.add_argument(
+        '--staged',
+        action='store_true',
+        help='Only process charts with staged changes (for pre-commit)'
+    )
+
+
+def diff_requested(args) -> bool:
+    """Whether --changed-since or --staged was given."""
+    return bool(args.changed_since or args.staged)
@@ -0,0 +1,140 @@
+"""
+Container image references in chart values and templates
+
+Finds the images a chart scenario runs without rendering it: the scenario
+file is merged over values.yaml the way helm coalesces values, then every
+`image:` mapping (registry/repository/tag/digest) or plain `image: ref`
+string is collected, skipping subtrees switched off with `enabled: false`.
+An empty tag falls back to the chart's appVersion, as the templates do.
+Images written literally in templates (init containers and the like) are
+picked up separately by template_images().
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+DOCKER_HUB = 'docker.io'
+DEFAULT_TAG = 'latest'
+
+TEMPLATE_IMAGE_RE = re.compile(r'^\s*(?:-\s+)?image:\s*["\']?([^\s"\'{}#]+)["\']?\s*(?:#.*)?$')
+
+
+class ImageRef(NamedTuple):
+    registry: str
+    repository: str
+    tag: str = ''
+    digest: str = ''
+
+    @property
+    def canonical(self) -> str:
+        """Fully qualified reference, e.g. docker.io/library/busybox:latest."""
+        registry = self.registry or DOCKER_HUB
+        repository = self.repository
+        if registry == DOCKER_HUB and '/' not in repository:
+            repository = f"library/{repository}"
+        tag = self.tag or ('' if self.digest else DEFAULT_TAG)
+        return (f"{registry}/{repository}"
+                + (f":{tag}" if tag else '')
+                + (f"@{self.digest}" if self.digest else ''))
+
+    def mirrored(self, mirror: str) -> str:
+        """The same image under a mirror registry, keeping the upstream path."""
+        return f"{mirror.rstrip('/')}/{self.canonical}"
+
+
+def parse_image(ref: str) -> ImageRef:
+    """Split a reference like ghcr.io/org/app:1.2@sha256:... into its parts."""
+    ref = ref.strip()
+    digest = ''
+    if '@' in ref:
+        ref, digest = ref.split('@', 1)
+    tag = ''
+    name = ref
+    if ':' in ref.rsplit('/', 1)[-1]:
+        name, tag = ref.rsplit(':', 1)
+    registry = ''
+    first, _, rest = name.partition('/')
+    if rest and ('.' in first or ':' in first or first == 'localhost'):
+        registry, name = first, rest
+    return ImageRef(registry, name, tag, digest)
+
+
+def image_from_mapping(image: Dict[str, Any], app_version: str = '') -> Optional[ImageRef]:
+    """ImageRef for an `image:` values mapping, or None without a repository."""
+    repository = image.get('repository')
+    if not isinstance(repository, str) or not repository or '{{' in repository:
+        return None
+    ref = parse_image(repository)
+    registry = image.get('registry')
+    if isinstance(registry, str) and registry:
+        # Templates join registry and repository with a slash
+        ref = ref._replace(registry=registry,
+                           repository=f"{ref.registry}/{ref.repository}" if ref.registry else ref.repository)
+    tag = image.get('tag')
+    tag = str(tag) if tag not in (None, '') else (ref.tag or str(app_version or ''))
+    digest = image.get('digest')
+    digest = str(digest) if digest else ref.digest
+    return ref._replace(tag=tag, digest=digest)
+
+
+def merge_values(base: Any, override: Any) -> Any:
+    """Overlay a values file on another the way helm does.
+
+    Mappings merge recursively, anything else replaces, and null deletes the
+    key from the result.
+    """
+    if not isinstance(base, dict) or not isinstance(override, dict):
+        return override
+    merged = dict(base)
+    for key, value in override.items():
+        if value is None:
+            merged.pop(key, None)
+        elif key in merged:
+            merged[key] = merge_values(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def find_images(values: Any, app_version: str = '', path: str = '') -> Iterator[Tuple[str, ImageRef]]:
+    """(values path, image) for every enabled image in a values tree."""
+    if isinstance(values, dict):
+        if values.get('enabled') is False:
+            return
+        for key, value in values.items():
+            child = f"{path}.{key}" if path else str(key)
+            if isinstance(key, str) and key.lower().endswith('image'):
+                if isinstance(value, dict):
+                    ref = image_from_mapping(value, app_version)
+                    if ref is not None:
+                        yield child, ref
+                        continue
+                elif isinstance(value, str) and value and '{{' not in value:
+                    yield child, parse_image(value)
+                    continue
+            yield from find_images(value, app_version, child)
+    elif isinstance(values, list):
+        for i, item in enumerate(values):
+            yield from find_images(item, app_version, f"{path}[{i}]")
+
+
+def template_images(chart_dir: Path) -> List[Tuple[str, ImageRef]]:
+    """Images written literally (not templated) in a chart's templates.
+
+    Helm test hooks (templates/tests/) are skipped; they do not run on install.
+    """
+    found = []
+    templates = Path(chart_dir) / 'templates'
+    for path in sorted(templates.rglob('*')):
+        if not path.is_file() or path.suffix not in ('.yaml', '.yml', '.tpl'):
+            continue
+        if 'tests' in path.relative_to(templates).parts[:-1]:
+            continue
+        for lineno, line in enumerate(path.read_text(encoding='utf-8').splitlines(), 1):
+            if line.lstrip().startswith('#') or '{{' in line:
+                continue
+            m = TEMPLATE_IMAGE_RE.match(line)
+            if m:
+                found.append((f"{path.relative_to(chart_dir)}:{lineno}", parse_image(m.group(1))))
+    return found
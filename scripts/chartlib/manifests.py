@@ -0,0 +1,159 @@
+"""
+Kubernetes manifest helpers
+
+Parses rendered multi-document manifests and resource quantities, and pulls
+out what capacity planning needs from workloads: pod templates, replicas and
+the effective requests/limits of a pod (the larger of the sum of its
+containers and its biggest init container, as the scheduler computes it).
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import yaml
+
+QUANTITY_RE = re.compile(r'^([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(Ki|Mi|Gi|Ti|Pi|Ei|n|u|m|k|M|G|T|P|E)?$')
+QUANTITY_SUFFIXES = {
+    None: 1.0, 'n': 1e-9, 'u': 1e-6, 'm': 1e-3,
+    'k': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12, 'P': 1e15, 'E': 1e18,
+    'Ki': 2.0 ** 10, 'Mi': 2.0 ** 20, 'Gi': 2.0 ** 30, 'Ti': 2.0 ** 40, 'Pi': 2.0 ** 50, 'Ei': 2.0 ** 60,
+}
+
+# Kinds that replicate a pod template, and where the template lives
+POD_TEMPLATE_PATHS = {
+    'Deployment': ('spec', 'template', 'spec'),
+    'StatefulSet': ('spec', 'template', 'spec'),
+    'DaemonSet': ('spec', 'template', 'spec'),
+    'ReplicaSet': ('spec', 'template', 'spec'),
+    'Job': ('spec', 'template', 'spec'),
+    'CronJob': ('spec', 'jobTemplate', 'spec', 'template', 'spec'),
+    'Pod': ('spec',),
+}
+REPLICATED_KINDS = {'Deployment', 'StatefulSet', 'ReplicaSet'}
+BATCH_KINDS = {'Job', 'CronJob'}
+
+
+class PodResources(NamedTuple):
+    cpu_request: float = 0.0        # cores
+    cpu_limit: float = 0.0
+    memory_request: float = 0.0     # bytes
+    memory_limit: float = 0.0
+    # Containers missing a request or limit (unbounded for planning)
+    missing_requests: int = 0
+    missing_limits: int = 0
+
+
+def parse_quantity(value: Any) -> float:
+    """Kubernetes resource quantity ('250m', '1.5', '512Mi', '10G') as a float."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    m = QUANTITY_RE.match(str(value).strip())
+    if not m:
+        raise ValueError(f"invalid quantity {value!r}")
+    return float(m.group(1)) * QUANTITY_SUFFIXES[m.group(2)]
+
+
+def format_cpu(cores: float) -> str:
+    if cores == 0:
+        return '0'
+    if cores < 1:
+        return f"{cores * 1000:.0f}m"
+    return f"{cores:.2f}".rstrip('0').rstrip('.')
+
+
+def format_bytes(value: float) -> str:
+    for suffix, size in (('Ti', 2 ** 40), ('Gi', 2 ** 30), ('Mi', 2 ** 20), ('Ki', 2 ** 10)):
+        if value >= size:
+            return f"{value / size:.1f}".rstrip('0').rstrip('.') + suffix
+    return f"{value:.0f}"
+
+
+def load_manifests(text: str) -> List[Dict[str, Any]]:
+    """Objects in a multi-document manifest, with `kind: List` expanded."""
+    objects = []
+    for doc in yaml.safe_load_all(text):
+        if not isinstance(doc, dict):
+            continue
+        if doc.get('kind') == 'List':
+            objects.extend(item for item in doc.get('items') or [] if isinstance(item, dict))
+        else:
+            objects.append(doc)
+    return objects
+
+
+def _get(obj: Any, path: tuple) -> Any:
+    for key in path:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def pod_spec(obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The pod spec a workload runs, or None for other kinds."""
+    path = POD_TEMPLATE_PATHS.get(obj.get('kind'))
+    spec = _get(obj, path) if path else None
+    return spec if isinstance(spec, dict) else None
+
+
+def iter_containers(spec: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Every container of a pod spec, init and ephemeral ones included."""
+    for key in ('initContainers', 'containers', 'ephemeralContainers'):
+        for container in spec.get(key) or []:
+            if isinstance(container, dict):
+                yield container
+
+
+def _container_resources(container: Dict[str, Any]) -> PodResources:
+    resources = container.get('resources') or {}
+    requests = resources.get('requests') or {}
+    limits = resources.get('limits') or {}
+    # Kubernetes defaults a missing request to the limit
+    cpu_request = requests.get('cpu', limits.get('cpu'))
+    memory_request = requests.get('memory', limits.get('memory'))
+    return PodResources(
+        cpu_request=parse_quantity(cpu_request) if cpu_request is not None else 0.0,
+        cpu_limit=parse_quantity(limits['cpu']) if 'cpu' in limits else 0.0,
+        memory_request=parse_quantity(memory_request) if memory_request is not None else 0.0,
+        memory_limit=parse_quantity(limits['memory']) if 'memory' in limits else 0.0,
+        missing_requests=int(cpu_request is None or memory_request is None),
+        missing_limits=int('memory' not in limits),
+    )
+
+
+def _add(a: PodResources, b: PodResources) -> PodResources:
+    return PodResources(*(x + y for x, y in zip(a, b)))
+
+
+def pod_resources(spec: Dict[str, Any]) -> PodResources:
+    """Effective requests/limits of one pod.
+
+    Regular init containers run one at a time before the app containers, so
+    the pod needs the larger of their maximum and the containers' sum.
+    Restartable init containers (native sidecars) run alongside and add up.
+    Every container missing a request or limit is counted, init ones too.
+    """
+    total = PodResources()
+    for container in spec.get('containers') or []:
+        total = _add(total, _container_resources(container))
+    sidecars = PodResources()
+    init_peak = PodResources()
+    for container in spec.get('initContainers') or []:
+        resources = _container_resources(container)
+        if container.get('restartPolicy') == 'Always':
+            sidecars = _add(sidecars, resources)
+        else:
+            init_peak = PodResources(*(max(x, y) for x, y in zip(init_peak[:4], resources[:4])),
+                                     init_peak.missing_requests + resources.missing_requests,
+                                     init_peak.missing_limits + resources.missing_limits)
+    total = _add(total, sidecars)
+    return PodResources(
+        *(max(x, y) for x, y in zip(total[:4], init_peak[:4])),
+        total.missing_requests + init_peak.missing_requests,
+        total.missing_limits + init_peak.missing_limits,
+    )
+
+
+def object_key(obj: Dict[str, Any]) -> tuple:
+    """(kind, name) of an object."""
+    return obj.get('kind'), (obj.get('metadata') or {}).get('name')
@@ -0,0 +1,97 @@
+"""
+Markdown headings, anchors and links
+
+slugify() turns heading text into the anchor GitHub generates for it, so
+generators can link to their own headings. extract_links() reads a file's
+anchors (heading slugs, numbered like GitHub on duplicates, plus explicit
+id/name attributes) and the targets of its inline links, reference
+definitions and <a href> tags, skipping fenced code blocks and inline code.
+The result is JSON-serialisable for FileIndex.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ATX_HEADING_RE = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+SETEXT_UNDERLINE_RE = re.compile(r'^ {0,3}(=+|-+)[ \t]*$')
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+INLINE_CODE_RE = re.compile(r'(`+)(?:(?!\1).)+?\1')
+INLINE_LINK_RE = re.compile(r'!?\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*(<[^>]*>|[^)\s]+)(?:\s+(?:"[^"]*"|\'[^\']*\'|\([^)]*\)))?\s*\)')
+REFERENCE_RE = re.compile(r'^ {0,3}\[[^\]]+\]:\s*(<[^>]*>|\S+)')
+HREF_RE = re.compile(r'<a\s[^>]*?href\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+ANCHOR_ATTR_RE = re.compile(r'<[a-z][^>]*?\s(?:id|name)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+# Lines that cannot be the text of a setext heading
+NOT_PARAGRAPH_RE = re.compile(r'^ {0,3}(?:[-*+>|#]|\d+[.)]\s|<!--)')
+
+
+def heading_text(markdown: str) -> str:
+    """Plain text of inline heading markdown (links and images keep their text)."""
+    text = re.sub(r'!?\[([^\]]*)\]\([^)]*\)', r'\1', markdown)
+    return re.sub(r'<[^>]+>', '', text)
+
+
+def slugify(text: str) -> str:
+    """GitHub's anchor for a heading: lowercase, punctuation dropped, spaces to hyphens."""
+    return re.sub(r'[^\w\- ]', '', heading_text(text).strip().lower()).replace(' ', '-')
+
+
+def extract_links(text: str) -> Dict[str, List]:
+    """{'anchors': [...], 'links': [[line, target], ...]} of a markdown document."""
+    anchors: List[str] = []
+    links: List[List] = []
+    counts: Dict[str, int] = {}
+    fence = None
+    previous = ''
+
+    def add_heading(title: str) -> None:
+        slug = slugify(title)
+        count = counts.get(slug, 0)
+        counts[slug] = count + 1
+        anchors.append(f"{slug}-{count}" if count else slug)
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        m = FENCE_RE.match(line)
+        if fence is not None:
+            if m and line.strip() == m.group(1) and m.group(1)[0] == fence[0] and len(m.group(1)) >= len(fence):
+                fence = None
+            previous = ''
+            continue
+        if m:
+            fence = m.group(1)
+            previous = ''
+            continue
+
+        heading = ATX_HEADING_RE.match(line)
+        if heading:
+            add_heading(heading.group(2) or '')
+        elif SETEXT_UNDERLINE_RE.match(line) and previous.strip() and not NOT_PARAGRAPH_RE.match(previous):
+            add_heading(previous.strip())
+
+        anchors.extend(ANCHOR_ATTR_RE.findall(line))
+        code_free = INLINE_CODE_RE.sub('', line)
+        reference = REFERENCE_RE.match(code_free)
+        targets = [reference.group(1)] if reference else []
+        targets += INLINE_LINK_RE.findall(code_free) + HREF_RE.findall(code_free)
+        for target in targets:
+            links.append([lineno, target[1:-1] if target.startswith('<') else target])
+        previous = '' if heading else line
+
+    return {'anchors': anchors, 'links': links}
+
+
+def extract_file(path: str) -> Dict[str, List]:
+    """extract_links() of a file (module-level so process pools can run it)."""
+    return extract_links(Path(path).read_text(encoding='utf-8', errors='replace'))
+
+
+def split_target(target: str) -> Tuple[str, str]:
+    """('path', 'fragment') of a link target; either may be empty."""
+    path, _, fragment = target.partition('#')
+    path = path.split('?', 1)[0]
+    return path, fragment
+
+
+def is_external(target: str) -> bool:
+    """True for URLs with a scheme (https:, mailto:, ...) or protocol-relative ones."""
+    return target.startswith('//') or re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*:', target) is not None
@@ -0,0 +1,164 @@
+"""
+PromQL sources: alerting rules and Grafana dashboards
+
+Collects every PromQL expression from alerting-rules/*.yaml (PrometheusRule
+manifests or plain Prometheus rule files) and dashboards/*.json (panel
+targets, including panels nested in rows), together with where it lives and
+how often it is evaluated. Targets on non-Prometheus datasources (e.g. Loki)
+are skipped.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from chartlib.promql import PromQLError, parse_duration
+
+RULES_DIR = 'alerting-rules'
+DASHBOARDS_DIR = 'dashboards'
+
+# Prometheus' default global evaluation_interval
+DEFAULT_EVALUATION_INTERVAL = 60.0
+# Dashboards without auto-refresh are assumed to be reloaded this often
+DEFAULT_DASHBOARD_REFRESH = 300.0
+DEFAULT_DASHBOARD_RANGE = 6 * 3600.0
+
+NON_PROMETHEUS_DATASOURCES = {'loki', 'tempo', 'elasticsearch', 'jaeger', 'zipkin'}
+RELATIVE_TIME_RE = re.compile(r'^now-(\w+)$')
+
+
+class ExprSource(NamedTuple):
+    """One PromQL expression and where it came from."""
+    file: Path
+    kind: str           # 'alert', 'record' or 'panel'
+    name: str           # alert/record name or panel title
+    group: str          # rule group name or dashboard title
+    expr: str
+    interval: float     # seconds between evaluations (rule interval / dashboard refresh)
+    range: float = 0.0  # dashboard time range in seconds (0 for rules)
+    # Keys leading to the `expr` field inside the parsed file
+    pointer: Tuple = ()
+    rule: Optional[Dict] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.file.name}: {self.name}" if self.name else self.file.name
+
+
+def _duration(value: Any, default: float) -> float:
+    if not value:
+        return default
+    try:
+        return parse_duration(str(value))
+    except PromQLError:
+        return default
+
+
+def load_rule_documents(path: Path) -> List[Any]:
+    """All YAML documents in a rule file (empty documents dropped)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [doc for doc in yaml.safe_load_all(f) if doc]
+
+
+def rule_groups(doc: Dict) -> Tuple[List[Dict], Tuple]:
+    """Rule groups of a PrometheusRule manifest or plain rule file, and their pointer."""
+    if isinstance(doc.get('spec'), dict) and 'groups' in doc['spec']:
+        return doc['spec']['groups'] or [], ('spec', 'groups')
+    return doc.get('groups') or [], ('groups',)
+
+
+def rule_expressions(path: Path) -> Iterator[ExprSource]:
+    for doc_index, doc in enumerate(load_rule_documents(path)):
+        if not isinstance(doc, dict):
+            continue
+        groups, groups_pointer = rule_groups(doc)
+        for group_index, group in enumerate(groups):
+            interval = _duration(group.get('interval'), DEFAULT_EVALUATION_INTERVAL)
+            for rule_index, rule in enumerate(group.get('rules') or []):
+                if 'expr' not in rule:
+                    continue
+                kind = 'alert' if 'alert' in rule else 'record'
+                yield ExprSource(
+                    file=path,
+                    kind=kind,
+                    name=str(rule.get(kind, '')),
+                    group=str(group.get('name', '')),
+                    expr=str(rule['expr']),
+                    interval=interval,
+                    pointer=(doc_index,) + groups_pointer + (group_index, 'rules', rule_index, 'expr'),
+                    rule=rule,
+                )
+
+
+def _datasource_type(datasource: Any) -> Optional[str]:
+    if isinstance(datasource, dict):
+        return datasource.get('type')
+    return None
+
+
+def _iter_panels(panels: List[Dict], pointer: Tuple) -> Iterator[Tuple[Dict, Tuple]]:
+    for i, panel in enumerate(panels or []):
+        yield panel, pointer + (i,)
+        if panel.get('panels'):
+            yield from _iter_panels(panel['panels'], pointer + (i, 'panels'))
+
+
+def dashboard_expressions(path: Path) -> Iterator[ExprSource]:
+    with open(path, 'r', encoding='utf-8') as f:
+        dashboard = json.load(f)
+    refresh = _duration(dashboard.get('refresh'), DEFAULT_DASHBOARD_REFRESH)
+    time_from = str((dashboard.get('time') or {}).get('from', ''))
+    m = RELATIVE_TIME_RE.match(time_from)
+    time_range = _duration(m.group(1), DEFAULT_DASHBOARD_RANGE) if m else DEFAULT_DASHBOARD_RANGE
+    title = str(dashboard.get('title', path.stem))
+
+    for panel, pointer in _iter_panels(dashboard.get('panels'), ('panels',)):
+        panel_type = _datasource_type(panel.get('datasource'))
+        for t, target in enumerate(panel.get('targets') or []):
+            expr = target.get('expr')
+            if not isinstance(expr, str) or not expr.strip():
+                continue
+            ds_type = _datasource_type(target.get('datasource')) or panel_type
+            if ds_type in NON_PROMETHEUS_DATASOURCES:
+                continue
+            name = str(panel.get('title', ''))
+            if len(panel.get('targets')) > 1:
+                name += f" [{target.get('refId', t)}]"
+            yield ExprSource(
+                file=path,
+                kind='panel',
+                name=name,
+                group=title,
+                expr=expr,
+                interval=refresh,
+                range=time_range,
+                pointer=pointer + ('targets', t, 'expr'),
+            )
+
+
+def rule_files(repo_root: Path) -> List[Path]:
+    rules_dir = Path(repo_root) / RULES_DIR
+    return sorted(list(rules_dir.glob('*.yaml')) + list(rules_dir.glob('*.yml')))
+
+
+def dashboard_files(repo_root: Path) -> List[Path]:
+    return sorted((Path(repo_root) / DASHBOARDS_DIR).glob('*.json'))
+
+
+def collect_expressions(
+    repo_root: Path,
+    rules: bool = True,
+    dashboards: bool = True
+) -> List[ExprSource]:
+    """Every PromQL expression in the repository's rule files and dashboards."""
+    sources = []
+    if rules:
+        for path in rule_files(repo_root):
+            sources.extend(rule_expressions(path))
+    if dashboards:
+        for path in dashboard_files(repo_root):
+            sources.extend(dashboard_expressions(path))
+    return sources
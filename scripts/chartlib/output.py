@@ -0,0 +1,171 @@
+"""
+Output helpers for generated files
+
+AtomicWriter streams text to a temporary file next to the target and only
+replaces the target when the content actually changed, so unchanged docs
+keep their mtime and make-style dependencies do not cascade. Lines that
+change on every render (e.g. a "Generated: <time>" stamp) can be excluded
+from that comparison with a `volatile` pattern.
+
+SectionCache remembers rendered sections by a hash of their inputs so
+generators only re-render what changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern
+
+from chartlib.cache import cache_dir_for, cache_disabled
+from chartlib.timing import span
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable SHA-256 of JSON-serialisable inputs."""
+    data = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """SHA-256 of a file's bytes, or None if it does not exist."""
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+def _stable_lines(path: Path, volatile: Pattern) -> Optional[List[str]]:
+    """Lines of a file without those matching volatile, or None if missing."""
+    try:
+        text = Path(path).read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return None
+    return [line for line in text.split('\n') if not volatile.match(line)]
+
+
+class AtomicWriter:
+    """Context manager writing text to a file atomically, skipping no-op writes.
+
+    With `volatile`, lines matching that pattern (re.match) do not count as
+    a change: the target is only replaced when other lines differ. After the
+    block, `changed` tells whether the target was replaced.
+    """
+
+    def __init__(self, path: Path, volatile: Optional[Pattern] = None):
+        self.path = Path(path)
+        self.volatile = re.compile(volatile) if isinstance(volatile, str) else volatile
+        self.changed = False
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._tmp_name = None
+
+    def __enter__(self) -> 'AtomicWriter':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_name = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}."
+        )
+        self._file = os.fdopen(fd, 'w', encoding='utf-8')
+        return self
+
+    def write(self, text: str) -> None:
+        self._file.write(text)
+        self._hash.update(text.encode('utf-8'))
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._file.close()
+        if exc_type is not None or self._unchanged():
+            os.unlink(self._tmp_name)
+            return False
+
+        try:
+            mode = os.stat(self.path).st_mode & 0o777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(self._tmp_name, mode)
+        os.replace(self._tmp_name, self.path)
+        self.changed = True
+        return False
+
+    def _unchanged(self) -> bool:
+        if self._hash.hexdigest() == file_digest(self.path):
+            return True
+        if self.volatile is None:
+            return False
+        current = _stable_lines(self.path, self.volatile)
+        return current is not None and current == _stable_lines(Path(self._tmp_name), self.volatile)
+
+
+def write_lines(path: Path, chunks: Iterable[str], volatile: Optional[Pattern] = None) -> bool:
+    """Write chunks joined by newlines (like '\\n'.join) atomically.
+
+    Returns True when the file content changed (ignoring volatile lines,
+    see AtomicWriter).
+    """
+    with span('write', path=path), AtomicWriter(path, volatile) as writer:
+        first = True
+        for chunk in chunks:
+            if not first:
+                writer.write('\n')
+            writer.write(chunk)
+            first = False
+    return writer.changed
+
+
+class SectionCache:
+    """Persistent map of section id -> (input hash, rendered text).
+
+    `salt` should change whenever the renderer changes (e.g. a hash of the
+    generator source) so stale renders are never reused.
+    """
+
+    def __init__(self, repo_root: Path, name: str, salt: str = ''):
+        self.salt = salt
+        self.cache_file = None if cache_disabled() else cache_dir_for(repo_root) / f"{name}.json"
+        self._sections: Dict[str, List[str]] = {}
+        self._seen = set()
+        self._dirty = False
+        self.rendered = 0
+        self.reused = 0
+        if self.cache_file is not None:
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                if payload.get('salt') == salt:
+                    self._sections = payload.get('sections', {})
+            except (OSError, ValueError):
+                pass
+
+    def get(self, section_id: str, key: str, render: Callable[[], str]) -> str:
+        """Return the cached text for section_id if key matches, else render it."""
+        self._seen.add(section_id)
+        entry = self._sections.get(section_id)
+        if entry and entry[0] == key:
+            self.reused += 1
+            return entry[1]
+        text = render()
+        self._sections[section_id] = [key, text]
+        self._dirty = True
+        self.rendered += 1
+        return text
+
+    def save(self) -> None:
+        """Persist sections used in this run (best-effort)."""
+        if self.cache_file is None:
+            return
+        if set(self._sections) != self._seen:
+            self._sections = {k: v for k, v in self._sections.items() if k in self._seen}
+            self._dirty = True
+        if not self._dirty:
+            return
+        try:
+            with AtomicWriter(self.cache_file) as writer:
+                writer.write(json.dumps({'salt': self.salt, 'sections': self._sections}))
+        except OSError:
+            return
+        self._dirty = False
@@ -0,0 +1,99 @@
+"""
+Structural diff of scenario values files against a chart's values.yaml
+
+A scenario file (values-<scenario>.yaml) is an overlay that helm merges over
+values.yaml (see chartlib.images.merge_values). Scenario files often repeat
+parts of values.yaml verbatim, and those keys change nothing.
+minimal_overlay() computes the smallest overlay with the same merged result
+and lists the keys it dropped.
+
+Values compare strictly by type, so `replicas: 1` over `replicas: 1.0` or
+`enabled: 1` over `enabled: true` are kept. Templates can tell them apart.
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from chartlib.images import merge_values
+
+
+class Overlay(NamedTuple):
+    minimal: Dict[str, Any]
+    # Dotted paths of overlay keys that do not change the merged values
+    redundant: List[str]
+
+
+def same_value(a: Any, b: Any) -> bool:
+    """Deep equality that also requires equal types (True != 1 != 1.0)."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_value(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same_value(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _child(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _diff(base: Dict, overlay: Dict, path: str, redundant: List[str]) -> Dict:
+    minimal = {}
+    for key, value in overlay.items():
+        child = _child(path, key)
+        if key not in base:
+            if value is None:
+                # Deletes a key values.yaml does not have
+                redundant.append(child)
+            else:
+                minimal[key] = value
+            continue
+        current = base[key]
+        if value is None:
+            minimal[key] = None
+        elif isinstance(value, dict) and isinstance(current, dict):
+            nested = _diff(current, value, child, redundant)
+            if nested:
+                minimal[key] = nested
+            elif not value:
+                redundant.append(child)
+        elif same_value(value, current):
+            redundant.append(child)
+        else:
+            minimal[key] = value
+    return minimal
+
+
+def minimal_overlay(base: Dict, overlay: Dict) -> Overlay:
+    """The smallest overlay merging over base to the same values as overlay."""
+    redundant: List[str] = []
+    minimal = _diff(base or {}, overlay or {}, '', redundant)
+    return Overlay(minimal, redundant)
+
+
+def effective_values(base: Dict, overlay: Dict) -> Dict:
+    """Values a chart sees with overlay merged over base."""
+    return merge_values(base or {}, overlay or {})
+
+
+def flatten(values: Any, path: str = '') -> Dict[str, Any]:
+    """Leaf path -> value; lists and empty mappings are leaves."""
+    if isinstance(values, dict) and values:
+        leaves = {}
+        for key, value in values.items():
+            leaves.update(flatten(value, _child(path, key)))
+        return leaves
+    return {path: values}
+
+
+def common_overrides(overlays: Iterable[Dict]) -> List[Tuple[str, Any]]:
+    """Leaf overrides set to the same value in every one of overlays."""
+    flattened = [flatten(overlay) for overlay in overlays]
+    if len(flattened) < 2:
+        return []
+    first, rest = flattened[0], flattened[1:]
+    return [
+        (path, value)
+        for path, value in first.items()
+        if path and all(path in other and same_value(other[path], value) for other in rest)
+    ]
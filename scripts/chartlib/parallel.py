@@ -0,0 +1,91 @@
+"""
+Worker pool helpers
+
+Fan a function out over a list of items and gather the results in input
+order, so tool output stays deterministic regardless of which worker
+finishes first.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, List, TypeVar
+
+from chartlib.repository import ChartRepository
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+EXECUTORS = ('process', 'thread')
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Turn a --jobs value into a worker count (0 means one per CPU)."""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def map_ordered(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    jobs: int = 1,
+    executor: str = 'process'
+) -> List[R]:
+    """Apply func to every item, returning results in input order.
+
+    With a single job (or a single item) everything runs in-process; the
+    process executor requires func and items to be picklable.
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), max(len(items), 1))
+    if jobs == 1:
+        return [func(item) for item in items]
+
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+    pool_cls = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_cls(max_workers=jobs) as pool:
+        return list(pool.map(func, items))
+
+
+# Repository used by _run_repository_task; set by map_repository() before
+# the pool starts so in-process and forked workers share it, and created on
+# first use in spawned workers
+_worker_repo = None
+
+
+def _run_repository_task(payload):
+    global _worker_repo
+    func, repo_root, item, parent_pid = payload
+    if _worker_repo is None or _worker_repo.repo_root != repo_root:
+        _worker_repo = ChartRepository(repo_root)
+    result = func(_worker_repo, item)
+    if os.getpid() == parent_pid:
+        # Serial runs and threads parse straight into repo.cache; nothing to
+        # hand back, and draining the shared cache here would race with
+        # sibling threads still adding to it
+        return result, {}
+    return result, _worker_repo.cache.take_updates()
+
+
+def map_repository(
+    repo: ChartRepository,
+    func: Callable[..., R],
+    items: Iterable[T],
+    jobs: int = 1,
+    executor: str = 'process'
+) -> List[R]:
+    """Apply func(repository, item) to every item, returning results in order.
+
+    Worker processes parse files through their own ChartRepository; the
+    parse-cache entries they produce are merged back into repo.cache so the
+    parent can persist them. Threads share repo and its cache directly.
+    """
+    global _worker_repo
+    _worker_repo = repo
+    payloads = [(func, repo.repo_root, item, os.getpid()) for item in items]
+    results = []
+    for result, cache_updates in map_ordered(_run_repository_task, payloads, jobs, executor):
+        repo.cache.merge(cache_updates)
+        results.append(result)
+    return results
@@ -0,0 +1,779 @@
+"""
+Offline PromQL evaluation over synthetic series
+
+Evaluates an expression at every step of a time grid in one pass instead of
+once per timestamp: every series is a column holding one value per step,
+range functions slide a window along the sorted samples (counter resets and
+changes come from prefix arrays, so rate/increase cost O(1) per step), and
+operators and aggregations combine whole columns.
+
+Follows Prometheus semantics for the 5m lookback, staleness markers, counter
+resets and rate extrapolation, vector matching (on/ignoring,
+group_left/group_right), set operators and metric-name dropping, and the
+`for:` hold of alerting rules. Functions outside the subset used by
+alerting rules raise EvaluationError.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from chartlib.promql import (
+    COMPARISON_OPS, SET_OPS, Aggregate, Binary, Call, MatrixSelector, Matcher, Node,
+    NumberLiteral, Subquery, Unary, VectorMatching, VectorSelector,
+)
+
+LOOKBACK = 300.0
+
+Labels = Tuple[Tuple[str, str], ...]
+Column = List[Optional[float]]
+# Instant vector: one column per series; absent samples are None
+Vector = Dict[Labels, Column]
+# Scalar: one value per step
+Scalar = List[float]
+Value = Union[Vector, Scalar]
+
+
+class EvaluationError(ValueError):
+    """Raised for expressions outside the supported subset or invalid at runtime."""
+
+
+class Series(NamedTuple):
+    labels: Labels
+    times: List[float]
+    # None marks a staleness marker
+    values: List[Optional[float]]
+
+
+def make_labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, v) for k, v in labels.items() if v != ''))
+
+
+def format_labels(labels: Labels) -> str:
+    name = dict(labels).get('__name__', '')
+    rest = ', '.join(f'{k}="{v}"' for k, v in labels if k != '__name__')
+    return f"{name}{{{rest}}}"
+
+
+def _without_name(labels: Labels) -> Labels:
+    return tuple(item for item in labels if item[0] != '__name__')
+
+
+@lru_cache(maxsize=None)
+def _regex(pattern: str) -> 're.Pattern':
+    return re.compile(pattern)
+
+
+def matches(labels: Dict[str, str], matcher: Matcher) -> bool:
+    value = labels.get(matcher.name, '')
+    if matcher.op == '=':
+        return value == matcher.value
+    if matcher.op == '!=':
+        return value != matcher.value
+    found = _regex(matcher.value).fullmatch(value) is not None
+    return found if matcher.op == '=~' else not found
+
+
+class Storage:
+    """In-memory series store."""
+
+    def __init__(self):
+        self.series: Dict[Labels, Series] = {}
+
+    def add(self, labels: Dict[str, str], samples: Iterable[Tuple[float, Optional[float]]]):
+        key = make_labels(labels)
+        existing = self.series.get(key)
+        merged = dict(zip(existing.times, existing.values)) if existing else {}
+        merged.update(samples)
+        times = sorted(merged)
+        self.series[key] = Series(key, times, [merged[t] for t in times])
+
+    def select(self, selector: VectorSelector) -> List[Series]:
+        matchers = list(selector.matchers)
+        if selector.name:
+            matchers.append(Matcher('__name__', '=', selector.name))
+        result = []
+        for series in self.series.values():
+            labels = dict(series.labels)
+            if all(matches(labels, m) for m in matchers):
+                result.append(series)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+
+# ---------------------------------------------------------------------------
+# Element-wise operators (Go float semantics: no exceptions)
+# ---------------------------------------------------------------------------
+
+def _div(a: float, b: float) -> float:
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _mod(a: float, b: float) -> float:
+    if b == 0 or math.isinf(a):
+        return math.nan
+    return math.fmod(a, b)
+
+
+def _pow(a: float, b: float) -> float:
+    try:
+        return math.pow(a, b)
+    except OverflowError:
+        return math.inf
+    except ValueError:
+        return math.nan
+
+
+ARITHMETIC: Dict[str, Callable[[float, float], float]] = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': _div,
+    '%': _mod,
+    '^': _pow,
+    'atan2': math.atan2,
+}
+
+COMPARISON: Dict[str, Callable[[float, float], bool]] = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+ELEMENTWISE: Dict[str, Callable[[float], float]] = {
+    'abs': abs,
+    'ceil': lambda v: float(math.ceil(v)) if math.isfinite(v) else v,
+    'floor': lambda v: float(math.floor(v)) if math.isfinite(v) else v,
+    'exp': lambda v: _pow(math.e, v),
+    'sqrt': lambda v: math.sqrt(v) if v >= 0 else math.nan,
+    'ln': lambda v: math.log(v) if v > 0 else (-math.inf if v == 0 else math.nan),
+    'log2': lambda v: math.log2(v) if v > 0 else (-math.inf if v == 0 else math.nan),
+    'log10': lambda v: math.log10(v) if v > 0 else (-math.inf if v == 0 else math.nan),
+}
+
+
+def _binop(op: str, a: float, b: float) -> Tuple[float, bool]:
+    """Value and whether to keep the sample (comparisons filter)."""
+    if op in COMPARISON:
+        return a, COMPARISON[op](a, b)
+    return ARITHMETIC[op](a, b), True
+
+
+# ---------------------------------------------------------------------------
+# Range-vector kernels
+# ---------------------------------------------------------------------------
+
+class Window(NamedTuple):
+    """Samples ts[lo:hi] of one series fall in (start, end]."""
+    ts: List[float]
+    vs: List[float]
+    lo: int
+    hi: int
+    start: float
+    end: float
+
+
+def _counter_prefix(vs: List[float]) -> List[float]:
+    """Values with counter resets added back, so adj[j] - adj[i] is the increase."""
+    adj, correction = [], 0.0
+    for i, v in enumerate(vs):
+        if i and v < vs[i - 1]:
+            correction += vs[i - 1]
+        adj.append(v + correction)
+    return adj
+
+
+def _change_prefix(vs: List[float], reset_only: bool) -> List[int]:
+    prefix, count = [], 0
+    for i, v in enumerate(vs):
+        if i:
+            prev = vs[i - 1]
+            if reset_only:
+                count += v < prev
+            elif v != prev and not (math.isnan(v) and math.isnan(prev)):
+                count += 1
+        prefix.append(count)
+    return prefix
+
+
+def _extrapolated(w: Window, adj: Optional[List[float]], is_rate: bool) -> Optional[float]:
+    """Prometheus' extrapolatedRate for rate/increase (adj given) and delta."""
+    if w.hi - w.lo < 2:
+        return None
+    first_t, last_t = w.ts[w.lo], w.ts[w.hi - 1]
+    if adj is not None:
+        result = adj[w.hi - 1] - adj[w.lo]
+    else:
+        result = w.vs[w.hi - 1] - w.vs[w.lo]
+    duration_to_start = first_t - w.start
+    duration_to_end = w.end - last_t
+    sampled = last_t - first_t
+    average = sampled / (w.hi - w.lo - 1)
+
+    if adj is not None and result > 0 and w.vs[w.lo] >= 0:
+        # Counters don't extrapolate below zero
+        duration_to_zero = sampled * (w.vs[w.lo] / result)
+        duration_to_start = min(duration_to_start, duration_to_zero)
+
+    threshold = average * 1.1
+    interval = sampled
+    interval += duration_to_start if duration_to_start < threshold else average / 2
+    interval += duration_to_end if duration_to_end < threshold else average / 2
+
+    result *= interval / sampled
+    if is_rate:
+        result /= w.end - w.start
+    return result
+
+
+def _instant_delta(w: Window, is_rate: bool, counter: bool) -> Optional[float]:
+    if w.hi - w.lo < 2:
+        return None
+    prev, last = w.vs[w.hi - 2], w.vs[w.hi - 1]
+    result = last if counter and last < prev else last - prev
+    if is_rate:
+        elapsed = w.ts[w.hi - 1] - w.ts[w.hi - 2]
+        result = _div(result, elapsed)
+    return result
+
+
+def _over_time(reduce: Callable[[List[float]], float]) -> Callable[[Window], Optional[float]]:
+    def kernel(w: Window) -> Optional[float]:
+        if w.hi == w.lo:
+            return None
+        return reduce(w.vs[w.lo:w.hi])
+    return kernel
+
+
+def _stdvar(values: List[float]) -> float:
+    mean = sum(values) / len(values)
+    return sum((v - mean) ** 2 for v in values) / len(values)
+
+
+def _quantile(q: float, values: List[float]) -> float:
+    if not values:
+        return math.nan
+    if q < 0:
+        return -math.inf
+    if q > 1:
+        return math.inf
+    ordered = sorted(values)
+    rank = q * (len(ordered) - 1)
+    lower = int(math.floor(rank))
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = rank - lower
+    return ordered[lower] * (1 - weight) + ordered[upper] * weight
+
+
+OVER_TIME: Dict[str, Callable[[Window], Optional[float]]] = {
+    'sum_over_time': _over_time(sum),
+    'avg_over_time': _over_time(lambda vs: sum(vs) / len(vs)),
+    'min_over_time': _over_time(min),
+    'max_over_time': _over_time(max),
+    'count_over_time': _over_time(lambda vs: float(len(vs))),
+    'last_over_time': _over_time(lambda vs: vs[-1]),
+    'present_over_time': _over_time(lambda vs: 1.0),
+    'stddev_over_time': _over_time(lambda vs: math.sqrt(_stdvar(vs))),
+    'stdvar_over_time': _over_time(_stdvar),
+}
+
+COUNTER_FUNCTIONS = {'rate', 'increase', 'delta', 'irate', 'idelta', 'changes', 'resets'}
+
+
+# ---------------------------------------------------------------------------
+# Histograms
+# ---------------------------------------------------------------------------
+
+def bucket_quantile(q: float, buckets: List[Tuple[float, float]]) -> float:
+    """Prometheus' bucketQuantile over (upper bound, cumulative count) pairs."""
+    if math.isnan(q):
+        return math.nan
+    if q < 0:
+        return -math.inf
+    if q > 1:
+        return math.inf
+    buckets = sorted(buckets)
+    if len(buckets) < 2 or not math.isinf(buckets[-1][0]):
+        return math.nan
+    # Counts must be monotonic; scrapes of different buckets can race
+    counts, highest = [], 0.0
+    for _, count in buckets:
+        highest = max(highest, count)
+        counts.append(highest)
+    observations = counts[-1]
+    if observations == 0:
+        return math.nan
+    rank = q * observations
+    b = next(i for i, count in enumerate(counts) if count >= rank)
+    if b == len(buckets) - 1:
+        return buckets[-2][0]
+    if b == 0 and buckets[0][0] <= 0:
+        return buckets[0][0]
+    bucket_start, bucket_end, count = 0.0, buckets[b][0], counts[b]
+    if b > 0:
+        bucket_start = buckets[b - 1][0]
+        count -= counts[b - 1]
+        rank -= counts[b - 1]
+    return bucket_start + (bucket_end - bucket_start) * (rank / count)
+
+
+# ---------------------------------------------------------------------------
+# Evaluator
+# ---------------------------------------------------------------------------
+
+def _signature(labels: Labels, matching: Optional[VectorMatching]) -> Labels:
+    if matching is not None and matching.on:
+        return tuple(item for item in labels if item[0] in matching.labels)
+    ignored = set(matching.labels) if matching is not None else set()
+    return tuple(item for item in labels if item[0] != '__name__' and item[0] not in ignored)
+
+
+class Evaluator:
+    """Evaluates expressions at every timestamp of a grid at once."""
+
+    def __init__(self, storage: Storage, times: Sequence[float], lookback: float = LOOKBACK):
+        if any(b <= a for a, b in zip(times, times[1:])):
+            raise EvaluationError("evaluation timestamps must be strictly increasing")
+        self.storage = storage
+        self.times = list(times)
+        self.steps = len(self.times)
+        self.lookback = lookback
+
+    # -- entry point ---------------------------------------------------------
+
+    def eval(self, node: Node) -> Value:
+        if isinstance(node, NumberLiteral):
+            return [node.value] * self.steps
+        if isinstance(node, VectorSelector):
+            return self._selector(node)
+        if isinstance(node, Call):
+            return self._call(node)
+        if isinstance(node, Aggregate):
+            return self._aggregate(node)
+        if isinstance(node, Binary):
+            return self._binary(node)
+        if isinstance(node, Unary):
+            value = self.eval(node.expr)
+            if node.op == '+':
+                return value
+            if isinstance(value, dict):
+                return {_without_name(k): [None if v is None else -v for v in col] for k, col in value.items()}
+            return [-v for v in value]
+        if isinstance(node, MatrixSelector):
+            raise EvaluationError("range vector must be passed to a function")
+        if isinstance(node, Subquery):
+            raise EvaluationError("subqueries are not supported")
+        raise EvaluationError(f"cannot evaluate {type(node).__name__}")
+
+    def eval_vector(self, node: Node) -> Vector:
+        value = self.eval(node)
+        if not isinstance(value, dict):
+            raise EvaluationError("expected instant vector, got scalar")
+        return value
+
+    def eval_scalar(self, node: Node) -> Scalar:
+        value = self.eval(node)
+        if isinstance(value, dict):
+            raise EvaluationError("expected scalar, got instant vector")
+        return value
+
+    # -- selectors -----------------------------------------------------------
+
+    def _selector(self, node: VectorSelector) -> Vector:
+        result = {}
+        for series in self.storage.select(node):
+            column: Column = [None] * self.steps
+            i, n = 0, len(series.times)
+            for k, t in enumerate(self.times):
+                t -= node.offset
+                while i < n and series.times[i] <= t:
+                    i += 1
+                if i and series.times[i - 1] > t - self.lookback:
+                    column[k] = series.values[i - 1]
+            if any(v is not None for v in column):
+                result[series.labels] = column
+        return result
+
+    def _windows(self, node: Node) -> Iterable[Tuple[Labels, List[float], List[float], List[Window]]]:
+        """Per series: samples without stale markers and the window of every step."""
+        if isinstance(node, Subquery):
+            raise EvaluationError("subqueries are not supported")
+        if not isinstance(node, MatrixSelector):
+            raise EvaluationError("expected range vector")
+        offset = node.vector.offset
+        # Synthetic series usually share sample times; compute their bounds once
+        bounds_cache: Dict[Tuple[float, ...], List[Tuple[int, int]]] = {}
+        for series in self.storage.select(node.vector):
+            pairs = [(t, v) for t, v in zip(series.times, series.values) if v is not None]
+            ts = [t for t, _ in pairs]
+            vs = [v for _, v in pairs]
+            key = tuple(ts)
+            bounds = bounds_cache.get(key)
+            if bounds is None:
+                bounds, lo, hi, n = [], 0, 0, len(ts)
+                for t in self.times:
+                    end = t - offset
+                    while hi < n and ts[hi] <= end:
+                        hi += 1
+                    while lo < hi and ts[lo] <= end - node.range:
+                        lo += 1
+                    bounds.append((lo, hi))
+                bounds_cache[key] = bounds
+            windows = [Window(ts, vs, lo, hi, t - offset - node.range, t - offset)
+                       for t, (lo, hi) in zip(self.times, bounds)]
+            yield series.labels, ts, vs, windows
+
+    def _range_function(self, func: str, arg: Node, extra: Tuple[Node, ...]) -> Vector:
+        result = {}
+        quantile = self.eval_scalar(extra[0]) if func == 'quantile_over_time' else None
+        for labels, ts, vs, windows in self._windows(arg):
+            if func in ('rate', 'increase'):
+                adj = _counter_prefix(vs)
+                column = [_extrapolated(w, adj, func == 'rate') for w in windows]
+            elif func == 'delta':
+                column = [_extrapolated(w, None, False) for w in windows]
+            elif func in ('irate', 'idelta'):
+                column = [_instant_delta(w, func == 'irate', func == 'irate') for w in windows]
+            elif func in ('changes', 'resets'):
+                prefix = _change_prefix(vs, func == 'resets')
+                column = [float(prefix[w.hi - 1] - prefix[w.lo]) if w.hi > w.lo else None for w in windows]
+            elif func == 'quantile_over_time':
+                column = [_quantile(quantile[k], w.vs[w.lo:w.hi]) if w.hi > w.lo else None
+                          for k, w in enumerate(windows)]
+            elif func in OVER_TIME:
+                column = [OVER_TIME[func](w) for w in windows]
+            else:
+                raise EvaluationError(f"function {func}() is not supported")
+            if any(v is not None for v in column):
+                key = labels if func == 'last_over_time' else _without_name(labels)
+                result[key] = column
+        return result
+
+    # -- functions -----------------------------------------------------------
+
+    def _call(self, node: Call) -> Value:
+        func, args = node.func, node.args
+        if func in COUNTER_FUNCTIONS or func in OVER_TIME or func == 'quantile_over_time':
+            if func == 'quantile_over_time':
+                return self._range_function(func, args[1], args[:1])
+            return self._range_function(func, args[0], args[1:])
+        if func == 'time':
+            return list(self.times)
+        if func == 'vector':
+            return {(): list(self.eval_scalar(args[0]))}
+        if func == 'scalar':
+            vector = self.eval_vector(args[0])
+            result = []
+            for k in range(self.steps):
+                present = [col[k] for col in vector.values() if col[k] is not None]
+                result.append(present[0] if len(present) == 1 else math.nan)
+            return result
+        if func in ('absent', 'absent_over_time'):
+            return self._absent(func, args[0])
+        if func in ELEMENTWISE:
+            fn = ELEMENTWISE[func]
+            return self._map(self.eval_vector(args[0]), lambda v, k: fn(v))
+        if func in ('clamp_min', 'clamp_max', 'clamp'):
+            bounds = [self.eval_scalar(a) for a in args[1:]]
+            lower = bounds[0] if func != 'clamp_max' else None
+            upper = bounds[-1] if func != 'clamp_min' else None
+
+            def clamp(v: float, k: int) -> float:
+                if lower is not None:
+                    v = max(v, lower[k])
+                if upper is not None:
+                    v = min(v, upper[k])
+                return v
+            return self._map(self.eval_vector(args[0]), clamp)
+        if func == 'round':
+            to_nearest = self.eval_scalar(args[1]) if len(args) > 1 else [1.0] * self.steps
+            return self._map(self.eval_vector(args[0]),
+                             lambda v, k: math.floor(v / to_nearest[k] + 0.5) * to_nearest[k])
+        if func in ('sort', 'sort_desc'):
+            return self.eval_vector(args[0])
+        if func == 'histogram_quantile':
+            return self._histogram_quantile(self.eval_scalar(args[0]), self.eval_vector(args[1]))
+        raise EvaluationError(f"function {func}() is not supported")
+
+    def _map(self, vector: Vector, fn: Callable[[float, int], float]) -> Vector:
+        return {
+            _without_name(labels): [None if v is None else fn(v, k) for k, v in enumerate(col)]
+            for labels, col in vector.items()
+        }
+
+    def _absent(self, func: str, arg: Node) -> Vector:
+        if func == 'absent':
+            present = self.eval_vector(arg)
+        else:
+            present = self._range_function('present_over_time', arg, ())
+        selector = arg.vector if isinstance(arg, MatrixSelector) else arg
+        labels: Dict[str, str] = {}
+        if isinstance(selector, VectorSelector):
+            equal = [m for m in selector.matchers if m.op == '=']
+            names = [m.name for m in equal]
+            labels = {m.name: m.value for m in equal if names.count(m.name) == 1}
+            labels.pop('__name__', None)
+        column = [None if any(col[k] is not None for col in present.values()) else 1.0
+                  for k in range(self.steps)]
+        return {make_labels(labels): column} if any(v is not None for v in column) else {}
+
+    def _histogram_quantile(self, q: Scalar, vector: Vector) -> Vector:
+        groups: Dict[Labels, List[Tuple[float, Column]]] = {}
+        for labels, col in vector.items():
+            le = dict(labels).get('le')
+            if le is None:
+                continue
+            try:
+                upper = float(le)
+            except ValueError:
+                continue
+            key = tuple(item for item in labels if item[0] not in ('le', '__name__'))
+            groups.setdefault(key, []).append((upper, col))
+        result = {}
+        for key, buckets in groups.items():
+            column: Column = []
+            for k in range(self.steps):
+                present = [(upper, col[k]) for upper, col in buckets if col[k] is not None]
+                column.append(bucket_quantile(q[k], present) if present else None)
+            if any(v is not None for v in column):
+                result[key] = column
+        return result
+
+    # -- aggregations --------------------------------------------------------
+
+    def _aggregate(self, node: Aggregate) -> Vector:
+        vector = self.eval_vector(node.expr)
+        param = self.eval_scalar(node.param) if node.param is not None else None
+        grouping = set(node.grouping)
+
+        groups: Dict[Labels, List[Labels]] = {}
+        for labels in vector:
+            if node.without:
+                key = tuple(i for i in labels if i[0] not in grouping and i[0] != '__name__')
+            else:
+                key = tuple(i for i in labels if i[0] in grouping)
+            groups.setdefault(key, []).append(labels)
+
+        if node.op in ('topk', 'bottomk'):
+            return self._topk(node.op == 'topk', param, vector, groups)
+
+        reducers: Dict[str, Callable[[List[float], int], float]] = {
+            'sum': lambda vs, k: sum(vs),
+            'avg': lambda vs, k: sum(vs) / len(vs),
+            'min': lambda vs, k: min(vs, key=lambda v: (math.isnan(v), v)),
+            'max': lambda vs, k: max(vs, key=lambda v: (not math.isnan(v), v)),
+            'count': lambda vs, k: float(len(vs)),
+            'group': lambda vs, k: 1.0,
+            'stdvar': lambda vs, k: _stdvar(vs),
+            'stddev': lambda vs, k: math.sqrt(_stdvar(vs)),
+            'quantile': lambda vs, k: _quantile(param[k], vs),
+        }
+        if node.op not in reducers:
+            raise EvaluationError(f"aggregation {node.op} is not supported")
+        reduce = reducers[node.op]
+
+        result = {}
+        for key, members in groups.items():
+            columns = [vector[labels] for labels in members]
+            column: Column = []
+            for k in range(self.steps):
+                present = [col[k] for col in columns if col[k] is not None]
+                column.append(reduce(present, k) if present else None)
+            if any(v is not None for v in column):
+                result[key] = column
+        return result
+
+    def _topk(self, top: bool, param: Optional[Scalar], vector: Vector,
+              groups: Dict[Labels, List[Labels]]) -> Vector:
+        if param is None:
+            raise EvaluationError("topk/bottomk need a parameter")
+        result: Vector = {}
+        for members in groups.values():
+            for k in range(self.steps):
+                present = [(vector[labels][k], labels) for labels in members if vector[labels][k] is not None]
+                present.sort(key=lambda item: item[0], reverse=top)
+                for value, labels in present[:max(int(param[k]), 0)]:
+                    result.setdefault(labels, [None] * self.steps)[k] = value
+        return result
+
+    # -- binary operators ----------------------------------------------------
+
+    def _binary(self, node: Binary) -> Value:
+        lhs, rhs = self.eval(node.lhs), self.eval(node.rhs)
+        if node.op in SET_OPS:
+            if not isinstance(lhs, dict) or not isinstance(rhs, dict):
+                raise EvaluationError(f"set operator {node.op} needs instant vectors on both sides")
+            return self._set_op(node.op, lhs, rhs, node.matching)
+
+        comparison = node.op in COMPARISON_OPS
+        drop_name = not comparison or node.return_bool
+
+        if not isinstance(lhs, dict) and not isinstance(rhs, dict):
+            if comparison and not node.return_bool:
+                raise EvaluationError("comparisons between scalars must use bool")
+            if comparison:
+                return [float(COMPARISON[node.op](a, b)) for a, b in zip(lhs, rhs)]
+            return [ARITHMETIC[node.op](a, b) for a, b in zip(lhs, rhs)]
+
+        if not isinstance(lhs, dict) or not isinstance(rhs, dict):
+            scalar_left = not isinstance(lhs, dict)
+            vector, scalar = (rhs, lhs) if scalar_left else (lhs, rhs)
+            result = {}
+            for labels, col in vector.items():
+                column: Column = [None] * self.steps
+                for k, v in enumerate(col):
+                    if v is None:
+                        continue
+                    a, b = (scalar[k], v) if scalar_left else (v, scalar[k])
+                    value, keep = _binop(node.op, a, b)
+                    if comparison:
+                        # The vector's value is kept whichever side it is on
+                        value = float(keep) if node.return_bool else v
+                        keep = keep or node.return_bool
+                    if keep:
+                        column[k] = value
+                if any(v is not None for v in column):
+                    result[_without_name(labels) if drop_name else labels] = column
+            return result
+
+        return self._vector_binop(node, lhs, rhs, drop_name)
+
+    def _vector_binop(self, node: Binary, lhs: Vector, rhs: Vector, drop_name: bool) -> Vector:
+        matching = node.matching
+        card = matching.group if matching is not None else None
+        swapped = card == 'right'
+        many, one = (rhs, lhs) if swapped else (lhs, rhs)
+
+        one_index: Dict[Labels, List[Labels]] = {}
+        for labels in one:
+            one_index.setdefault(_signature(labels, matching), []).append(labels)
+        many_index: Dict[Labels, List[Labels]] = {}
+        for labels in many:
+            many_index.setdefault(_signature(labels, matching), []).append(labels)
+
+        side = 'right' if not swapped else 'left'
+        result: Vector = {}
+        for sig, many_members in many_index.items():
+            one_members = one_index.get(sig)
+            if not one_members:
+                continue
+            for k in range(self.steps):
+                present_one = [labels for labels in one_members if one[labels][k] is not None]
+                if not present_one:
+                    continue
+                if len(present_one) > 1:
+                    raise EvaluationError(
+                        f"found duplicate series for the match group {dict(sig)} on the "
+                        f"{side} hand-side of the operation: many-to-many matching not allowed"
+                    )
+                present_many = [labels for labels in many_members if many[labels][k] is not None]
+                if card is None and len(present_many) > 1:
+                    raise EvaluationError(
+                        f"found duplicate series for the match group {dict(sig)} on the left "
+                        f"hand-side of the operation; many-to-one matching must be explicit (group_left/group_right)"
+                    )
+                one_labels = present_one[0]
+                for many_labels in present_many:
+                    vl, vr = many[many_labels][k], one[one_labels][k]
+                    if swapped:
+                        vl, vr = vr, vl
+                    value, keep = _binop(node.op, vl, vr)
+                    if node.return_bool:
+                        value, keep = float(keep), True
+                    if not keep:
+                        continue
+                    out = self._result_labels(many_labels, one_labels, matching, drop_name)
+                    column = result.setdefault(out, [None] * self.steps)
+                    if column[k] is not None:
+                        raise EvaluationError(f"multiple matches for labels {format_labels(out)}")
+                    column[k] = value
+        return result
+
+    @staticmethod
+    def _result_labels(many: Labels, one: Labels, matching: Optional[VectorMatching],
+                       drop_name: bool) -> Labels:
+        labels = dict(many)
+        if drop_name:
+            labels.pop('__name__', None)
+        if matching is None or matching.group is None:
+            if matching is not None and matching.on:
+                labels = {k: v for k, v in labels.items() if k in matching.labels}
+            elif matching is not None:
+                for name in matching.labels:
+                    labels.pop(name, None)
+        if matching is not None:
+            one_labels = dict(one)
+            for name in matching.include:
+                if one_labels.get(name):
+                    labels[name] = one_labels[name]
+                else:
+                    labels.pop(name, None)
+        return make_labels(labels)
+
+    def _set_op(self, op: str, lhs: Vector, rhs: Vector, matching: Optional[VectorMatching]) -> Vector:
+        rhs_groups: Dict[Labels, List[Column]] = {}
+        for labels, col in rhs.items():
+            rhs_groups.setdefault(_signature(labels, matching), []).append(col)
+
+        def present_in(groups: Dict[Labels, List[Column]], sig: Labels, k: int) -> bool:
+            return any(col[k] is not None for col in groups.get(sig, ()))
+
+        result: Vector = {}
+        if op in ('and', 'unless'):
+            want = op == 'and'
+            for labels, col in lhs.items():
+                sig = _signature(labels, matching)
+                column = [v if v is not None and present_in(rhs_groups, sig, k) == want else None
+                          for k, v in enumerate(col)]
+                if any(v is not None for v in column):
+                    result[labels] = column
+            return result
+
+        lhs_groups: Dict[Labels, List[Column]] = {}
+        for labels, col in lhs.items():
+            lhs_groups.setdefault(_signature(labels, matching), []).append(col)
+            result[labels] = list(col)
+        for labels, col in rhs.items():
+            sig = _signature(labels, matching)
+            column = [v if v is not None and not present_in(lhs_groups, sig, k) else None
+                      for k, v in enumerate(col)]
+            if any(v is not None for v in column):
+                existing = result.setdefault(labels, [None] * self.steps)
+                result[labels] = [a if a is not None else b for a, b in zip(existing, column)]
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Alerting rules
+# ---------------------------------------------------------------------------
+
+def alert_states(vector: Vector, times: Sequence[float], hold: float) -> Dict[Labels, List[Optional[str]]]:
+    """'pending'/'firing'/None per series and step for an alert with `for: hold`.
+
+    Assumes the rule was evaluated at every timestamp in `times`; an alert
+    resets as soon as one evaluation returns no sample for its series.
+    """
+    states = {}
+    for labels, column in vector.items():
+        active_at: Optional[float] = None
+        row: List[Optional[str]] = []
+        for t, value in zip(times, column):
+            if value is None:
+                active_at = None
+                row.append(None)
+                continue
+            if active_at is None:
+                active_at = t
+            row.append('firing' if t - active_at >= hold else 'pending')
+        states[_without_name(labels)] = row
+    return states
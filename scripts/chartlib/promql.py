@@ -0,0 +1,569 @@
+"""
+PromQL parser and formatter
+
+parse() turns an expression into a tree of NamedTuple nodes; format_expr()
+prints a tree back in a canonical form (sorted label matchers and grouping
+labels, minimal parentheses), so two spellings of the same query format to
+the same string. Nodes are hashable, which lets tools deduplicate
+sub-expressions directly.
+
+Covers the PromQL used by alerting rules and dashboards: selectors, range
+vectors, subqueries, offset, functions, aggregations (by/without, with a
+parameter for topk/quantile/...), arithmetic/comparison/set operators with
+bool, on/ignoring and group_left/group_right.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+
+class PromQLError(ValueError):
+    """Raised for expressions that cannot be parsed."""
+
+
+class Matcher(NamedTuple):
+    name: str
+    op: str
+    value: str
+
+
+class NumberLiteral(NamedTuple):
+    value: float
+
+
+class StringLiteral(NamedTuple):
+    value: str
+
+
+class VectorSelector(NamedTuple):
+    name: Optional[str]
+    matchers: Tuple[Matcher, ...]
+    offset: float = 0.0
+
+
+class MatrixSelector(NamedTuple):
+    vector: VectorSelector
+    range: float
+
+
+class Subquery(NamedTuple):
+    expr: 'Node'
+    range: float
+    step: Optional[float]
+    offset: float = 0.0
+
+
+class Call(NamedTuple):
+    func: str
+    args: Tuple['Node', ...]
+
+
+class Aggregate(NamedTuple):
+    op: str
+    expr: 'Node'
+    param: Optional['Node'] = None
+    grouping: Tuple[str, ...] = ()
+    without: bool = False
+    # True when written with `by ()`/`without ()`, even if empty
+    grouped: bool = False
+
+
+class VectorMatching(NamedTuple):
+    on: bool
+    labels: Tuple[str, ...]
+    group: Optional[str] = None
+    include: Tuple[str, ...] = ()
+
+
+class Binary(NamedTuple):
+    op: str
+    lhs: 'Node'
+    rhs: 'Node'
+    return_bool: bool = False
+    matching: Optional[VectorMatching] = None
+
+
+class Unary(NamedTuple):
+    op: str
+    expr: 'Node'
+
+
+Node = Union[NumberLiteral, StringLiteral, VectorSelector, MatrixSelector, Subquery,
+             Call, Aggregate, Binary, Unary]
+
+AGGREGATIONS = {
+    'sum', 'avg', 'min', 'max', 'count', 'group', 'stddev', 'stdvar',
+    'topk', 'bottomk', 'quantile', 'count_values', 'limitk', 'limit_ratio',
+}
+PARAM_AGGREGATIONS = {'topk', 'bottomk', 'quantile', 'count_values', 'limitk', 'limit_ratio'}
+
+# Functions that take a range vector
+RANGE_FUNCTIONS = {
+    'rate', 'irate', 'increase', 'delta', 'idelta', 'deriv', 'changes', 'resets',
+    'avg_over_time', 'min_over_time', 'max_over_time', 'sum_over_time',
+    'count_over_time', 'quantile_over_time', 'stddev_over_time', 'stdvar_over_time',
+    'last_over_time', 'present_over_time', 'absent_over_time', 'holt_winters',
+    'predict_linear', 'mad_over_time',
+}
+
+COMPARISON_OPS = ('==', '!=', '<=', '>=', '<', '>')
+SET_OPS = ('and', 'or', 'unless')
+
+# Binary operator precedence, lowest first; ^ is right-associative
+PRECEDENCE = {
+    'or': 1,
+    'and': 2, 'unless': 2,
+    '==': 3, '!=': 3, '<=': 3, '<': 3, '>=': 3, '>': 3,
+    '+': 4, '-': 4,
+    '*': 5, '/': 5, '%': 5, 'atan2': 5,
+    '^': 7,
+}
+UNARY_PRECEDENCE = 6
+
+DURATION_UNITS = (('y', 365 * 86400), ('w', 7 * 86400), ('d', 86400),
+                  ('h', 3600), ('m', 60), ('s', 1), ('ms', 0.001))
+_UNIT_SECONDS = dict(DURATION_UNITS)
+
+TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+|\#[^\n]*)
+  | (?P<duration>(?:\d+(?:ms|[smhdwy]))+)
+  | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|(?:[Ii]nf|NaN)(?![\w:]))
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`[^`]*`)
+  | (?P<ident>:?[a-zA-Z_][a-zA-Z0-9_:]*)
+  | (?P<op>==|!=|<=|>=|=~|!~|[-+*/%^<>=(){}\[\],:@])
+''', re.VERBOSE)
+DURATION_PART_RE = re.compile(r'(\d+)(ms|[smhdwy])')
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    pos: int
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in a PromQL duration such as 5m or 1h30m."""
+    parts = DURATION_PART_RE.findall(text)
+    if not parts or ''.join(n + u for n, u in parts) != text:
+        raise PromQLError(f"Invalid duration: {text}")
+    return float(sum(int(n) * _UNIT_SECONDS[u] for n, u in parts))
+
+
+def format_duration(seconds: float) -> str:
+    """Shortest PromQL duration for a number of seconds."""
+    if seconds <= 0:
+        return '0s'
+    millis = int(round(seconds * 1000))
+    out = []
+    for unit, size in DURATION_UNITS:
+        size_ms = int(size * 1000)
+        if millis >= size_ms:
+            count, millis = divmod(millis, size_ms)
+            out.append(f"{count}{unit}")
+    return ''.join(out)
+
+
+def tokenize(text: str) -> List[Token]:
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if not m:
+            raise PromQLError(f"Unexpected character {text[pos]!r} at {pos}")
+        kind = m.lastgroup
+        if kind != 'ws':
+            tokens.append(Token(kind, m.group(kind), pos))
+        pos = m.end()
+    return tokens
+
+
+def _unquote(text: str) -> str:
+    if text[0] == '`':
+        return text[1:-1]
+    body = text[1:-1]
+    return re.sub(r'\\(.)', lambda m: {'n': '\n', 't': '\t'}.get(m.group(1), m.group(1)), body)
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.i = 0
+        # (node, start, end) source spans, recorded as nodes are built
+        self.spans: List[Tuple[Node, int, int]] = []
+        self.last_end = 0
+
+    def start(self) -> int:
+        tok = self.peek()
+        return tok.pos if tok is not None else len(self.text)
+
+    def span(self, node: Node, start: int) -> Node:
+        self.spans.append((node, start, self.last_end))
+        return node
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        j = self.i + offset
+        return self.tokens[j] if j < len(self.tokens) else None
+
+    def at(self, *texts: str) -> bool:
+        tok = self.peek()
+        return tok is not None and tok.text in texts and tok.kind in ('op', 'ident')
+
+    def next(self) -> Token:
+        tok = self.peek()
+        if tok is None:
+            raise PromQLError("Unexpected end of expression")
+        self.i += 1
+        self.last_end = tok.pos + len(tok.text)
+        return tok
+
+    def expect(self, text: str) -> Token:
+        tok = self.next()
+        if tok.text != text:
+            raise PromQLError(f"Expected {text!r} at {tok.pos}, got {tok.text!r}")
+        return tok
+
+    def parse(self) -> Node:
+        node = self.expr(1)
+        tok = self.peek()
+        if tok is not None:
+            raise PromQLError(f"Unexpected {tok.text!r} at {tok.pos}")
+        return node
+
+    def binary_op(self) -> Optional[str]:
+        tok = self.peek()
+        if tok is None:
+            return None
+        if tok.kind == 'op' and tok.text in PRECEDENCE:
+            return tok.text
+        if tok.kind == 'ident' and tok.text in ('and', 'or', 'unless', 'atan2'):
+            return tok.text
+        return None
+
+    def expr(self, min_prec: int) -> Node:
+        start = self.start()
+        lhs = self.unary()
+        while True:
+            op = self.binary_op()
+            if op is None or PRECEDENCE[op] < min_prec:
+                return lhs
+            self.next()
+            return_bool = False
+            if self.at('bool'):
+                if op not in COMPARISON_OPS:
+                    raise PromQLError(f"bool modifier on non-comparison operator {op}")
+                self.next()
+                return_bool = True
+            matching = self.vector_matching()
+            next_prec = PRECEDENCE[op] if op == '^' else PRECEDENCE[op] + 1
+            rhs = self.expr(next_prec)
+            lhs = self.span(Binary(op, lhs, rhs, return_bool, matching), start)
+
+    def vector_matching(self) -> Optional[VectorMatching]:
+        if not self.at('on', 'ignoring'):
+            return None
+        on = self.next().text == 'on'
+        labels = self.label_list()
+        group, include = None, ()
+        if self.at('group_left', 'group_right'):
+            group = self.next().text[len('group_'):]
+            if self.at('('):
+                include = self.label_list()
+        return VectorMatching(on, labels, group, include)
+
+    def label_list(self) -> Tuple[str, ...]:
+        self.expect('(')
+        labels = []
+        while not self.at(')'):
+            tok = self.next()
+            if tok.kind != 'ident':
+                raise PromQLError(f"Expected label name at {tok.pos}, got {tok.text!r}")
+            labels.append(tok.text)
+            if not self.at(')'):
+                self.expect(',')
+        self.expect(')')
+        return tuple(labels)
+
+    def unary(self) -> Node:
+        start = self.start()
+        if self.at('-', '+'):
+            op = self.next().text
+            operand = self.expr(UNARY_PRECEDENCE)
+            if op == '+':
+                return operand
+            if isinstance(operand, NumberLiteral):
+                return self.span(NumberLiteral(-operand.value), start)
+            return self.span(Unary('-', operand), start)
+        return self.postfix(self.primary(), start)
+
+    def postfix(self, node: Node, start: int) -> Node:
+        while True:
+            self.span(node, start)
+            if self.at('['):
+                self.next()
+                range_ = self.duration()
+                if self.at(':'):
+                    self.next()
+                    step = None if self.at(']') else self.duration()
+                    self.expect(']')
+                    node = Subquery(node, range_, step)
+                else:
+                    self.expect(']')
+                    if not isinstance(node, VectorSelector):
+                        raise PromQLError("Range can only be applied to a vector selector")
+                    node = MatrixSelector(node, range_)
+            elif self.at('offset'):
+                self.next()
+                negative = False
+                if self.at('-'):
+                    self.next()
+                    negative = True
+                offset = self.duration() * (-1 if negative else 1)
+                node = self.with_offset(node, offset)
+            elif self.at('@'):
+                # @ modifiers are accepted but not modelled
+                self.next()
+                if self.at('start', 'end'):
+                    self.next()
+                    self.expect('(')
+                    self.expect(')')
+                else:
+                    self.next()
+            else:
+                return node
+
+    @staticmethod
+    def with_offset(node: Node, offset: float) -> Node:
+        if isinstance(node, VectorSelector):
+            return node._replace(offset=offset)
+        if isinstance(node, MatrixSelector):
+            return node._replace(vector=node.vector._replace(offset=offset))
+        if isinstance(node, Subquery):
+            return node._replace(offset=offset)
+        raise PromQLError("offset can only follow a selector or subquery")
+
+    def duration(self) -> float:
+        tok = self.next()
+        if tok.kind == 'duration':
+            return parse_duration(tok.text)
+        if tok.kind == 'number':
+            return float(tok.text)
+        raise PromQLError(f"Expected duration at {tok.pos}, got {tok.text!r}")
+
+    def primary(self) -> Node:
+        start = self.start()
+        return self.span(self._primary(), start)
+
+    def _primary(self) -> Node:
+        tok = self.next()
+        if tok.kind == 'number':
+            return NumberLiteral(float(int(tok.text, 16)) if tok.text[:2] in ('0x', '0X') else float(tok.text))
+        if tok.kind == 'duration':
+            # Durations as numbers (e.g. `time() - 5m`) are seconds
+            return NumberLiteral(parse_duration(tok.text))
+        if tok.kind == 'string':
+            return StringLiteral(_unquote(tok.text))
+        if tok.text == '(':
+            node = self.expr(1)
+            self.expect(')')
+            return node
+        if tok.text == '{':
+            return VectorSelector(None, self.matchers())
+        if tok.kind == 'ident':
+            if tok.text in AGGREGATIONS and self.at('(', 'by', 'without'):
+                return self.aggregate(tok.text)
+            if self.at('('):
+                return self.call(tok.text)
+            matchers = ()
+            if self.at('{'):
+                self.next()
+                matchers = self.matchers()
+            return VectorSelector(tok.text, matchers)
+        raise PromQLError(f"Unexpected {tok.text!r} at {tok.pos}")
+
+    def matchers(self) -> Tuple[Matcher, ...]:
+        matchers = []
+        while not self.at('}'):
+            name = self.next()
+            if name.kind not in ('ident', 'string'):
+                raise PromQLError(f"Expected label name at {name.pos}, got {name.text!r}")
+            label = _unquote(name.text) if name.kind == 'string' else name.text
+            op = self.next()
+            if op.text not in ('=', '!=', '=~', '!~'):
+                raise PromQLError(f"Expected matcher operator at {op.pos}, got {op.text!r}")
+            value = self.next()
+            if value.kind != 'string':
+                raise PromQLError(f"Expected string at {value.pos}, got {value.text!r}")
+            matchers.append(Matcher(label, op.text, _unquote(value.text)))
+            if not self.at('}'):
+                self.expect(',')
+        self.expect('}')
+        return tuple(matchers)
+
+    def call(self, func: str) -> Node:
+        self.expect('(')
+        args = []
+        while not self.at(')'):
+            args.append(self.expr(1))
+            if not self.at(')'):
+                self.expect(',')
+        self.expect(')')
+        return Call(func, tuple(args))
+
+    def aggregate(self, op: str) -> Node:
+        grouping, without, grouped = (), False, False
+        if self.at('by', 'without'):
+            without = self.next().text == 'without'
+            grouping, grouped = self.label_list(), True
+        self.expect('(')
+        param = None
+        if op in PARAM_AGGREGATIONS:
+            param = self.expr(1)
+            self.expect(',')
+        expr = self.expr(1)
+        self.expect(')')
+        if not grouped and self.at('by', 'without'):
+            without = self.next().text == 'without'
+            grouping, grouped = self.label_list(), True
+        return Aggregate(op, expr, param, grouping, without, grouped)
+
+
+def parse(text: str) -> Node:
+    """Parse a PromQL expression."""
+    return _Parser(text).parse()
+
+
+def parse_with_spans(text: str) -> Tuple[Node, List[Tuple[Node, int, int]]]:
+    """Parse an expression and return (node, [(sub-node, start, end), ...]).
+
+    Spans index into text, so replacing one with another expression keeps
+    the rest of the text as written. A parenthesised sub-expression has a
+    span with and one without its parentheses.
+    """
+    parser = _Parser(text)
+    node = parser.parse()
+    return node, parser.spans
+
+
+def _format_number(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return 'Inf' if value > 0 else '-Inf'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_string(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def _format_selector(node: VectorSelector) -> str:
+    matchers = sorted(node.matchers)
+    body = ','.join(f"{m.name}{m.op}{_format_string(m.value)}" for m in matchers)
+    text = (node.name or '') + (f"{{{body}}}" if body or not node.name else '')
+    return text
+
+
+def _offset(offset: float) -> str:
+    if not offset:
+        return ''
+    sign = '-' if offset < 0 else ''
+    return f" offset {sign}{format_duration(abs(offset))}"
+
+
+def _precedence(node: Node) -> int:
+    if isinstance(node, Binary):
+        return PRECEDENCE[node.op]
+    if isinstance(node, Unary) or (isinstance(node, NumberLiteral) and node.value < 0):
+        return UNARY_PRECEDENCE
+    return 100
+
+
+def format_expr(node: Node) -> str:
+    """Canonical single-line PromQL for a parsed expression."""
+    if isinstance(node, NumberLiteral):
+        return _format_number(node.value)
+    if isinstance(node, StringLiteral):
+        return _format_string(node.value)
+    if isinstance(node, VectorSelector):
+        return _format_selector(node) + _offset(node.offset)
+    if isinstance(node, MatrixSelector):
+        return (f"{_format_selector(node.vector)}[{format_duration(node.range)}]"
+                + _offset(node.vector.offset))
+    if isinstance(node, Subquery):
+        inner = format_expr(node.expr)
+        if _precedence(node.expr) < 100:
+            inner = f"({inner})"
+        step = format_duration(node.step) if node.step else ''
+        return f"{inner}[{format_duration(node.range)}:{step}]" + _offset(node.offset)
+    if isinstance(node, Call):
+        return f"{node.func}({', '.join(format_expr(a) for a in node.args)})"
+    if isinstance(node, Aggregate):
+        grouping = ''
+        if node.grouped or node.grouping:
+            keyword = 'without' if node.without else 'by'
+            grouping = f" {keyword} ({', '.join(sorted(node.grouping))})"
+        args = format_expr(node.expr)
+        if node.param is not None:
+            args = f"{format_expr(node.param)}, {args}"
+        return f"{node.op}{grouping} ({args})"
+    if isinstance(node, Unary):
+        inner = format_expr(node.expr)
+        if _precedence(node.expr) <= UNARY_PRECEDENCE:
+            inner = f"({inner})"
+        return f"-{inner}"
+    if isinstance(node, Binary):
+        prec = PRECEDENCE[node.op]
+        lhs, rhs = format_expr(node.lhs), format_expr(node.rhs)
+        right_assoc = node.op == '^'
+        if _precedence(node.lhs) < prec or (right_assoc and _precedence(node.lhs) == prec):
+            lhs = f"({lhs})"
+        if _precedence(node.rhs) < prec or (not right_assoc and _precedence(node.rhs) == prec):
+            rhs = f"({rhs})"
+        op = node.op + (' bool' if node.return_bool else '')
+        if node.matching is not None:
+            m = node.matching
+            op += f" {'on' if m.on else 'ignoring'}({', '.join(sorted(m.labels))})"
+            if m.group:
+                op += f" group_{m.group}({', '.join(sorted(m.include))})"
+        return f"{lhs} {op} {rhs}"
+    raise TypeError(f"Not a PromQL node: {node!r}")
+
+
+def children(node: Node) -> Tuple[Node, ...]:
+    """Direct sub-expressions of a node."""
+    if isinstance(node, MatrixSelector):
+        return (node.vector,)
+    if isinstance(node, Subquery):
+        return (node.expr,)
+    if isinstance(node, Call):
+        return node.args
+    if isinstance(node, Aggregate):
+        return (node.expr,) if node.param is None else (node.param, node.expr)
+    if isinstance(node, Binary):
+        return (node.lhs, node.rhs)
+    if isinstance(node, Unary):
+        return (node.expr,)
+    return ()
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """Yield node and every sub-expression, parents first."""
+    yield node
+    for child in children(node):
+        yield from walk(child)
+
+
+def is_scalar(node: Node) -> bool:
+    """Whether an expression evaluates to a scalar (no series)."""
+    if isinstance(node, NumberLiteral):
+        return True
+    if isinstance(node, Unary):
+        return is_scalar(node.expr)
+    if isinstance(node, Binary):
+        return is_scalar(node.lhs) and is_scalar(node.rhs)
+    if isinstance(node, Call):
+        return node.func in ('time', 'scalar', 'pi')
+    return False
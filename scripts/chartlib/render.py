@@ -0,0 +1,227 @@
+"""
+Cached `helm template` rendering of chart scenarios
+
+A scenario is a chart rendered with its values.yaml alone ("default") or
+with one of its values-*.yaml files on top. Renders are cached by the helm
+version, a digest of the chart's files (everything except the values-*.yaml
+scenario files), the scenario file and the template options, so editing one
+scenario only re-renders that scenario and editing a template re-renders
+that chart. Failures are cached too, so a warm run reports them instantly.
+
+Environment:
+    CHART_TOOLS_CACHE_DIR: Override the cache directory
+    CHART_TOOLS_NO_CACHE:  Set to 1 to disable the render cache
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+from chartlib.cache import cache_dir_for, cache_disabled
+from chartlib.output import AtomicWriter
+from chartlib.repository import ChartRepository
+
+RENDER_CACHE_DIR = 'renders'
+DEFAULT_SCENARIO = 'default'
+SCENARIO_GLOB = 'values-*.yaml'
+# Bump when the cached entry layout changes
+RENDER_CACHE_VERSION = 1
+
+
+class HelmError(Exception):
+    """Raised when helm cannot be run at all."""
+
+
+class Scenario(NamedTuple):
+    chart: str
+    chart_dir: Path
+    values_file: Optional[Path] = None
+
+    @property
+    def name(self) -> str:
+        if self.values_file is None:
+            return DEFAULT_SCENARIO
+        return self.values_file.stem[len('values-'):]
+
+    @property
+    def label(self) -> str:
+        return f"{self.chart}/{self.name}"
+
+
+class RenderResult(NamedTuple):
+    scenario: Scenario
+    ok: bool
+    manifest: str
+    error: str
+    seconds: float      # helm run time (of the original run when cached)
+    cached: bool
+
+
+def chart_scenarios(chart_dir: Path) -> List[Scenario]:
+    """The default scenario plus one per values-*.yaml file."""
+    chart_dir = Path(chart_dir)
+    files = sorted(chart_dir.glob(SCENARIO_GLOB))
+    return [Scenario(chart_dir.name, chart_dir)] + [Scenario(chart_dir.name, chart_dir, f) for f in files]
+
+
+class ScenarioValues(NamedTuple):
+    """One values document of a scenario file."""
+    scenario: Scenario
+    values: Any
+    # 1-based position among the documents of a multi-document file, else 0
+    document: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.scenario.name}#{self.document}" if self.document else self.scenario.name
+
+    @property
+    def label(self) -> str:
+        return f"{self.scenario.chart}/{self.name}"
+
+    @property
+    def source(self) -> str:
+        """The values file name, with #<n> for one document of several."""
+        name = self.scenario.values_file.name if self.scenario.values_file is not None else 'values.yaml'
+        return f"{name}#{self.document}" if self.document else name
+
+
+def scenario_values(repo: ChartRepository, scenario: Scenario) -> List[ScenarioValues]:
+    """The values documents of a scenario file (none for the default scenario).
+
+    Scenario files hold one document, but values-example.yaml files may list
+    several alternative examples separated by `---`. Each non-empty document
+    of such a file is returned separately, numbered from 1, so tools check
+    every example on its own instead of failing to parse the file.
+    Raises like ChartRepository.load_yaml() on unreadable files.
+    """
+    if scenario.values_file is None:
+        return []
+    documents = [d for d in repo.load_yaml_documents(scenario.values_file) if d is not None]
+    if len(documents) <= 1:
+        return [ScenarioValues(scenario, documents[0] if documents else None)]
+    return [ScenarioValues(scenario, values, index) for index, values in enumerate(documents, 1)]
+
+
+def chart_digest(chart_dir: Path) -> str:
+    """SHA-256 over a chart's files, excluding the scenario values files."""
+    chart_dir = Path(chart_dir)
+    scenario_files = set(chart_dir.glob(SCENARIO_GLOB))
+    digest = hashlib.sha256()
+    for path in sorted(p for p in chart_dir.rglob('*') if p.is_file()):
+        if path in scenario_files:
+            continue
+        digest.update(str(path.relative_to(chart_dir)).encode('utf-8') + b'\0')
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def helm_version(helm: str = 'helm') -> str:
+    try:
+        result = subprocess.run([helm, 'version', '--short'], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, check=False)
+    except OSError as e:
+        raise HelmError(f"{helm} not available: {e}")
+    if result.returncode != 0:
+        raise HelmError(result.stderr.decode('utf-8', 'replace').strip())
+    return result.stdout.decode('utf-8').strip()
+
+
+class Renderer:
+    """Runs `helm template` for scenarios, caching the results on disk.
+
+    Safe to share between threads; each render is a separate helm process.
+    """
+
+    def __init__(
+        self,
+        repo_root: Path,
+        helm: str = 'helm',
+        namespace: str = 'default',
+        extra_args: Sequence[str] = (),
+        use_cache: bool = True
+    ):
+        self.repo_root = Path(repo_root)
+        self.helm = helm
+        self.namespace = namespace
+        self.extra_args = list(extra_args)
+        self.version = helm_version(helm)
+        if use_cache and not cache_disabled():
+            self.cache_dir: Optional[Path] = cache_dir_for(self.repo_root) / RENDER_CACHE_DIR
+        else:
+            self.cache_dir = None
+        self._digests: Dict[Path, str] = {}
+        self._lock = threading.Lock()
+        self.used_keys: Set[str] = set()
+
+    def _chart_digest(self, chart_dir: Path) -> str:
+        with self._lock:
+            if chart_dir not in self._digests:
+                self._digests[chart_dir] = chart_digest(chart_dir)
+            return self._digests[chart_dir]
+
+    def key(self, scenario: Scenario) -> str:
+        values_digest = ''
+        if scenario.values_file is not None:
+            values_digest = hashlib.sha256(scenario.values_file.read_bytes()).hexdigest()
+        parts = [
+            RENDER_CACHE_VERSION, self.version, self._chart_digest(scenario.chart_dir),
+            scenario.chart, scenario.name, values_digest, self.namespace, self.extra_args,
+        ]
+        return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def command(self, scenario: Scenario) -> List[str]:
+        cmd = [self.helm, 'template', scenario.chart, str(scenario.chart_dir), '--namespace', self.namespace]
+        if scenario.values_file is not None:
+            cmd += ['-f', str(scenario.values_file)]
+        return cmd + self.extra_args
+
+    def render(self, scenario: Scenario) -> RenderResult:
+        key = self.key(scenario)
+        with self._lock:
+            self.used_keys.add(key)
+        if self.cache_dir is not None:
+            try:
+                with open(self._cache_path(key), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                return RenderResult(scenario, entry['ok'], entry['manifest'], entry['error'],
+                                    entry['seconds'], True)
+            except (OSError, ValueError, KeyError):
+                pass
+
+        started = time.perf_counter()
+        try:
+            proc = subprocess.run(self.command(scenario), cwd=self.repo_root, stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE, check=False)
+        except OSError as e:
+            raise HelmError(f"{self.helm} not available: {e}")
+        seconds = time.perf_counter() - started
+        ok = proc.returncode == 0
+        manifest = proc.stdout.decode('utf-8', 'replace') if ok else ''
+        error = '' if ok else proc.stderr.decode('utf-8', 'replace').strip()
+
+        if self.cache_dir is not None:
+            entry = {'ok': ok, 'manifest': manifest, 'error': error, 'seconds': seconds}
+            with AtomicWriter(self._cache_path(key)) as writer:
+                writer.write(json.dumps(entry))
+        return RenderResult(scenario, ok, manifest, error, seconds, False)
+
+    def prune(self, keep: Optional[Iterable[str]] = None) -> int:
+        """Delete cached renders not in keep (default: the ones used so far)."""
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+        keep = set(self.used_keys if keep is None else keep)
+        removed = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            if path.stem not in keep:
+                os.unlink(path)
+                removed += 1
+        return removed
@@ -0,0 +1,94 @@
+"""
+Chart repository model
+
+Gives the scripts/ tools one place to find charts, charts-metadata.yaml and
+each chart's Chart.yaml, with every parse going through the shared
+ParseCache.
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from chartlib.cache import ParseCache
+from chartlib.timing import span
+
+# scripts/chartlib/repository.py -> repository root
+DEFAULT_REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def find_chart_dirs(charts_dir: Path) -> List[Path]:
+    """Find all chart directories."""
+    chart_dirs = []
+    with span('discover charts'):
+        for item in charts_dir.iterdir():
+            if item.is_dir() and (item / "Chart.yaml").exists():
+                chart_dirs.append(item)
+    return sorted(chart_dirs)
+
+
+class ChartRepository:
+    """Lazily loaded view of charts/ and charts-metadata.yaml."""
+
+    def __init__(self, repo_root: Optional[Path] = None, cache: Optional[ParseCache] = None):
+        self.repo_root = Path(repo_root) if repo_root else DEFAULT_REPO_ROOT
+        self.charts_dir = self.repo_root / "charts"
+        self.metadata_file = self.charts_dir / "charts-metadata.yaml"
+        self.cache = cache if cache is not None else ParseCache.for_repo(self.repo_root)
+        self._metadata: Optional[Dict] = None
+        self._chart_dirs: Optional[List[Path]] = None
+
+    def load_yaml(self, path: Path) -> Any:
+        """Parse a YAML file through the cache (raises on error)."""
+        return self.cache.load_yaml(path)
+
+    def load_yaml_documents(self, path: Path) -> List[Any]:
+        """Parse every document of a YAML file through the cache (raises on error)."""
+        return self.cache.load_yaml_documents(path)
+
+    @property
+    def metadata(self) -> Dict:
+        """Parsed charts-metadata.yaml (loaded once)."""
+        if self._metadata is None:
+            self._metadata = self.load_yaml(self.metadata_file) or {}
+        return self._metadata
+
+    @property
+    def charts_metadata(self) -> Dict:
+        """The `charts` mapping from charts-metadata.yaml."""
+        return self.metadata.get('charts', {})
+
+    def chart_dirs(self) -> List[Path]:
+        """Chart directories under charts/ (scanned once)."""
+        if self._chart_dirs is None:
+            self._chart_dirs = find_chart_dirs(self.charts_dir)
+        return self._chart_dirs
+
+    def chart_yaml_path(self, chart_name: str) -> Path:
+        """Path of a chart's Chart.yaml."""
+        return self.charts_dir / chart_name / "Chart.yaml"
+
+    def chart_yaml(self, chart_name: str) -> Dict:
+        """Parsed Chart.yaml of a chart (a fresh copy on every call)."""
+        return self.load_yaml(self.chart_yaml_path(chart_name)) or {}
+
+    def reload(self) -> None:
+        """Forget in-memory state so the next access re-checks the disk."""
+        self._metadata = None
+        self._chart_dirs = None
+
+    def save_cache(self) -> None:
+        """Persist the parse cache."""
+        with span('save parse cache'):
+            self.cache.save()
+
+
+def load_yaml_file(file_path: Path, repository: Optional[ChartRepository] = None) -> Dict:
+    """Load and parse YAML file, exiting with an error message on failure."""
+    try:
+        if repository is not None:
+            return repository.load_yaml(file_path)
+        return ParseCache().load_yaml(file_path)
+    except Exception as e:
+        print(f"Error loading {file_path}: {e}")
+        sys.exit(1)
@@ -0,0 +1,34 @@
+"""
+Import the hyphenated scripts/*.py tools as modules
+
+The generators and validators keep their logic in their own script files
+(e.g. generate-chart-catalog.py); load_script() imports one by name so other
+tools can reuse its functions without spawning a new interpreter.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_script(name: str) -> ModuleType:
+    """Import scripts/<name>.py once and return the module."""
+    module_name = f"chart_script_{name.replace('-', '_')}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    path = SCRIPTS_DIR / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load script {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
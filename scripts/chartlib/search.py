@@ -0,0 +1,419 @@
+"""
+Inverted search index over charts-metadata.yaml
+
+The index is a single binary file that is memory-mapped for queries, so a
+lookup touches only the header, a binary search over the sorted term table
+and the postings it needs; charts-metadata.yaml is not parsed again until it
+changes.
+
+File layout (little-endian):
+    header    magic, version, counts, section offsets, avg doc length,
+              source fingerprint (mtime_ns, size, sha256)
+    docs      per chart: offsets/lengths of id, name, description in the
+              string blob and the indexed token count
+    terms     sorted by key "<field>:<token>": key offset/length in the
+              string blob, first posting, posting count
+    postings  (doc number, term frequency) pairs
+    strings   UTF-8 blob
+
+Fields: n = name, d = description, t = tags, k = keywords, c = category.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from chartlib.cache import parse_yaml
+
+MAGIC = b'SBCI'
+INDEX_VERSION = 1
+
+HEADER = struct.Struct('<4sIIIQQQQdqq32s')
+DOC = struct.Struct('<IIIIIII')
+TERM = struct.Struct('<IIII')
+POSTING = struct.Struct('<IH')
+
+FIELDS = ('n', 'd', 't', 'k', 'c')
+FIELD_ALIASES = {
+    'name': 'n',
+    'desc': 'd',
+    'description': 'd',
+    'tag': 't',
+    'tags': 't',
+    'keyword': 'k',
+    'keywords': 'k',
+    'kw': 'k',
+    'category': 'c',
+    'cat': 'c',
+}
+# Ranking weight per field
+FIELD_WEIGHTS = {'n': 3.0, 'd': 1.0, 't': 2.0, 'k': 2.0, 'c': 0.5}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+class SearchResult(NamedTuple):
+    chart_id: str
+    name: str
+    description: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens."""
+    return WORD_RE.findall(str(text).lower())
+
+
+def label_tokens(label: str) -> List[str]:
+    """Tokens for a tag/keyword: the whole label plus its word parts."""
+    whole = str(label).lower().strip()
+    parts = tokenize(whole)
+    return [whole] + [p for p in parts if p != whole]
+
+
+def _fingerprint(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def build_index(metadata_file: Path, index_file: Path) -> None:
+    """Parse charts-metadata.yaml and write the binary index."""
+    data = Path(metadata_file).read_bytes()
+    mtime_ns, size = _fingerprint(metadata_file)
+    charts = (parse_yaml(data) or {}).get('charts', {})
+
+    strings = bytearray()
+
+    def add_string(text: str) -> Tuple[int, int]:
+        encoded = str(text).encode('utf-8')
+        offset = len(strings)
+        strings.extend(encoded)
+        return offset, len(encoded)
+
+    docs = []
+    postings: Dict[bytes, Dict[int, int]] = defaultdict(dict)
+    total_length = 0
+
+    for doc_no, chart_id in enumerate(sorted(charts)):
+        meta = charts[chart_id] or {}
+        field_tokens = {
+            'n': tokenize(meta.get('name', chart_id)) + tokenize(chart_id),
+            'd': tokenize(meta.get('description', '')),
+            't': [tok for tag in meta.get('tags', []) for tok in label_tokens(tag)],
+            'k': [tok for kw in meta.get('keywords', []) for tok in label_tokens(kw)],
+            'c': label_tokens(meta.get('category', 'uncategorized')),
+        }
+        length = 0
+        for field, tokens in field_tokens.items():
+            length += len(tokens)
+            for token in tokens:
+                key = f"{field}:{token}".encode('utf-8')
+                postings[key][doc_no] = postings[key].get(doc_no, 0) + 1
+        total_length += length
+
+        id_ref = add_string(chart_id)
+        name_ref = add_string(meta.get('name', chart_id))
+        desc_ref = add_string(' '.join(str(meta.get('description', '')).split()))
+        docs.append(DOC.pack(*id_ref, *name_ref, *desc_ref, length))
+
+    terms = []
+    posting_blob = bytearray()
+    posting_count = 0
+    for key in sorted(postings):
+        key_off, key_len = len(strings), len(key)
+        strings.extend(key)
+        entries = sorted(postings[key].items())
+        terms.append(TERM.pack(key_off, key_len, posting_count, len(entries)))
+        for doc_no, tf in entries:
+            posting_blob.extend(POSTING.pack(doc_no, min(tf, 0xFFFF)))
+        posting_count += len(entries)
+
+    docs_off = HEADER.size
+    terms_off = docs_off + DOC.size * len(docs)
+    postings_off = terms_off + TERM.size * len(terms)
+    strings_off = postings_off + len(posting_blob)
+    avg_length = total_length / len(docs) if docs else 0.0
+
+    header = HEADER.pack(
+        MAGIC, INDEX_VERSION, len(docs), len(terms),
+        docs_off, terms_off, postings_off, strings_off,
+        avg_length, mtime_ns, size, hashlib.sha256(data).digest(),
+    )
+
+    index_file = Path(index_file)
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = index_file.with_name(f".{index_file.name}.{os.getpid()}")
+    with open(tmp_file, 'wb') as f:
+        f.write(header)
+        f.write(b''.join(docs))
+        f.write(b''.join(terms))
+        f.write(posting_blob)
+        f.write(strings)
+    os.replace(tmp_file, index_file)
+
+
+class SearchIndex:
+    """Read-only view of a memory-mapped index file."""
+
+    def __init__(self, index_file: Path):
+        self._file = open(index_file, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Invalid search index: {index_file}")
+        fields = HEADER.unpack_from(self._mm, 0)
+        (magic, version, self.n_docs, self.n_terms,
+         self._docs_off, self._terms_off, self._postings_off, self._strings_off,
+         self.avg_length, self.source_mtime_ns, self.source_size, self.source_digest) = fields
+        if magic != MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"Invalid search index: {index_file}")
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> 'SearchIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def is_fresh(self, metadata_file: Path) -> bool:
+        """Whether the index was built from the current metadata file."""
+        try:
+            mtime_ns, size = _fingerprint(metadata_file)
+        except OSError:
+            return False
+        if (mtime_ns, size) == (self.source_mtime_ns, self.source_size):
+            return True
+        digest = hashlib.sha256(Path(metadata_file).read_bytes()).digest()
+        return digest == self.source_digest
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings_off + offset
+        return self._mm[start:start + length]
+
+    def _term_key(self, i: int) -> bytes:
+        key_off, key_len, _, _ = TERM.unpack_from(self._mm, self._terms_off + i * TERM.size)
+        return self._string(key_off, key_len)
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _postings(self, i: int) -> Dict[int, int]:
+        _, _, first, count = TERM.unpack_from(self._mm, self._terms_off + i * TERM.size)
+        base = self._postings_off + first * POSTING.size
+        return dict(POSTING.iter_unpack(self._mm[base:base + count * POSTING.size]))
+
+    def terms(self, field: str, token: str, prefix: bool = False) -> Iterator[Dict[int, int]]:
+        """Postings (doc -> tf) of the exact term, or every term with the prefix."""
+        key = f"{field}:{token}".encode('utf-8')
+        i = self._lower_bound(key)
+        while i < self.n_terms:
+            term_key = self._term_key(i)
+            if term_key == key or (prefix and term_key.startswith(key)):
+                yield self._postings(i)
+                i += 1
+                if not prefix:
+                    return
+            else:
+                return
+
+    def doc_length(self, doc_no: int) -> int:
+        return DOC.unpack_from(self._mm, self._docs_off + doc_no * DOC.size)[6]
+
+    def doc(self, doc_no: int) -> Tuple[str, str, str]:
+        """(chart id, name, description) of a document."""
+        id_off, id_len, name_off, name_len, desc_off, desc_len, _ = DOC.unpack_from(
+            self._mm, self._docs_off + doc_no * DOC.size
+        )
+        return (
+            self._string(id_off, id_len).decode('utf-8'),
+            self._string(name_off, name_len).decode('utf-8'),
+            self._string(desc_off, desc_len).decode('utf-8'),
+        )
+
+
+def open_index(metadata_file: Path, index_file: Path, rebuild: bool = False) -> SearchIndex:
+    """Open the index, (re)building it when missing or stale."""
+    if not rebuild:
+        try:
+            index = SearchIndex(index_file)
+        except (OSError, ValueError, struct.error):
+            index = None
+        if index is not None:
+            if index.is_fresh(metadata_file):
+                return index
+            index.close()
+    build_index(metadata_file, index_file)
+    return SearchIndex(index_file)
+
+
+# Query language:
+#   term              any field; `term*` for prefix match
+#   field:term        name/desc/tag/keyword/category
+#   a b / a AND b     both
+#   a OR b            either
+#   NOT a / -a        exclude
+#   ( ... )           grouping
+
+TOKEN_RE = re.compile(r'\(|\)|"[^"]*"|[^\s()]+')
+
+
+class QueryError(ValueError):
+    """Raised for malformed queries."""
+
+
+class _Matches(NamedTuple):
+    docs: Set[int]
+    scores: Dict[int, float]
+
+
+class QueryEngine:
+    """Evaluate boolean queries against a SearchIndex with BM25 ranking."""
+
+    def __init__(self, index: SearchIndex, default_or: bool = False):
+        self.index = index
+        self.default_or = default_or
+        self._tokens: List[str] = []
+        self._pos = 0
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[SearchResult]:
+        self._tokens = TOKEN_RE.findall(query)
+        self._pos = 0
+        if not self._tokens:
+            raise QueryError("Empty query")
+        matches = self._parse_or()
+        if self._pos != len(self._tokens):
+            raise QueryError(f"Unexpected token: {self._tokens[self._pos]}")
+
+        ranked = sorted(
+            matches.docs,
+            key=lambda d: (-matches.scores.get(d, 0.0), self.index.doc(d)[0]),
+        )
+        results = []
+        for doc_no in ranked[:limit] if limit else ranked:
+            chart_id, name, description = self.index.doc(doc_no)
+            results.append(SearchResult(chart_id, name, description, matches.scores.get(doc_no, 0.0)))
+        return results
+
+    def _peek(self) -> Optional[str]:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _parse_or(self) -> _Matches:
+        left = self._parse_and()
+        while True:
+            if self._peek() == 'OR':
+                self._pos += 1
+                left = self._union(left, self._parse_and())
+            elif self.default_or and self._peek() not in (None, ')'):
+                left = self._union(left, self._parse_and())
+            else:
+                return left
+
+    def _parse_and(self) -> _Matches:
+        left = self._parse_unary()
+        while True:
+            token = self._peek()
+            if token == 'AND':
+                self._pos += 1
+                left = self._intersect(left, self._parse_unary())
+            elif token not in (None, ')', 'OR') and not self.default_or:
+                left = self._intersect(left, self._parse_unary())
+            else:
+                return left
+
+    def _parse_unary(self) -> _Matches:
+        token = self._peek()
+        if token is None:
+            raise QueryError("Unexpected end of query")
+        if token == 'NOT' or (token.startswith('-') and len(token) > 1):
+            if token == 'NOT':
+                self._pos += 1
+            else:
+                self._tokens[self._pos] = token[1:]
+            excluded = self._parse_unary()
+            return _Matches(set(range(self.index.n_docs)) - excluded.docs, {})
+        if token == '(':
+            self._pos += 1
+            inner = self._parse_or()
+            if self._peek() != ')':
+                raise QueryError("Missing closing parenthesis")
+            self._pos += 1
+            return inner
+        if token == ')':
+            raise QueryError("Unexpected closing parenthesis")
+        self._pos += 1
+        return self._term(token)
+
+    def _term(self, token: str) -> _Matches:
+        fields = FIELDS
+        if ':' in token and not token.startswith('"'):
+            name, token = token.split(':', 1)
+            if name.lower() not in FIELD_ALIASES:
+                raise QueryError(f"Unknown field: {name}")
+            fields = (FIELD_ALIASES[name.lower()],)
+        token = token.strip('"').lower()
+        prefix = token.endswith('*')
+        token = token.rstrip('*')
+        if not token:
+            raise QueryError("Empty term")
+
+        if fields in (('t',), ('k',)) or WORD_RE.fullmatch(token):
+            return self._lookup(fields, token, prefix)
+
+        # Multi-word terms ("object-storage", quoted phrases) match the exact
+        # tag/keyword label or all of their words
+        result: Optional[_Matches] = None
+        for part in tokenize(token):
+            part_matches = self._lookup(fields, part, prefix)
+            result = part_matches if result is None else self._intersect(result, part_matches)
+        exact = self._lookup(tuple(f for f in fields if f in ('t', 'k', 'c')), token, prefix)
+        return exact if result is None else self._union(result, exact)
+
+    def _lookup(self, fields, token: str, prefix: bool) -> _Matches:
+        docs: Set[int] = set()
+        scores: Dict[int, float] = defaultdict(float)
+        n_docs = self.index.n_docs
+        avg = self.index.avg_length or 1.0
+        for field in fields:
+            for postings in self.index.terms(field, token, prefix):
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_no, tf in postings.items():
+                    norm = 1 - BM25_B + BM25_B * self.index.doc_length(doc_no) / avg
+                    scores[doc_no] += FIELD_WEIGHTS[field] * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+                    docs.add(doc_no)
+        return _Matches(docs, dict(scores))
+
+    @staticmethod
+    def _union(a: _Matches, b: _Matches) -> _Matches:
+        scores = dict(a.scores)
+        for doc_no, score in b.scores.items():
+            scores[doc_no] = scores.get(doc_no, 0.0) + score
+        return _Matches(a.docs | b.docs, scores)
+
+    @staticmethod
+    def _intersect(a: _Matches, b: _Matches) -> _Matches:
+        docs = a.docs & b.docs
+        scores = {d: a.scores.get(d, 0.0) + b.scores.get(d, 0.0) for d in docs}
+        return _Matches(docs, scores)
@@ -0,0 +1,198 @@
+"""
+Named timing spans, traces and profiling for the scripts/ tools
+
+Library code and scripts mark their phases with span():
+
+    with span('load metadata'):
+        metadata = load_yaml_file(metadata_file, repo)
+
+Spans cost next to nothing until a script enables them with the options
+from add_timing_arguments(), and nest: a span's self time excludes the
+spans opened inside it. instrument(args), called after parse_args(),
+reports when the script exits (also through sys.exit): --timings prints
+the per-phase table, --trace writes the spans as Chrome trace JSON
+(chrome://tracing, Perfetto) or JSON lines when the file ends in .jsonl,
+and --profile prints cProfile statistics, optionally saving them for
+pstats/snakeviz.
+
+Spans opened in --executor process worker processes are not collected;
+thread workers are.
+"""
+
+import atexit
+import cProfile
+import contextlib
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+PROFILE_LINES = 25
+
+
+class Event(NamedTuple):
+    name: str
+    start: float        # seconds since the tracer started
+    duration: float     # seconds
+    self_time: float    # duration minus directly nested spans
+    thread: int
+    args: Dict[str, Any]
+
+
+class Tracer:
+    """Collects completed spans; disabled until enable() is called."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Event] = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def _stack(self) -> List[List[float]]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        stack = self._stack()
+        # [children time] accumulated by nested spans
+        frame = [0.0]
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += duration
+            self.events.append(Event(name, started - self.origin, duration, duration - frame[0],
+                                     threading.get_ident(), args))
+
+    def phases(self) -> List[Dict[str, Any]]:
+        """Per-name totals, slowest self time first."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for event in self.events:
+            entry = totals.setdefault(event.name, {'name': event.name, 'calls': 0, 'total': 0.0,
+                                                   'self': 0.0, 'max': 0.0})
+            entry['calls'] += 1
+            entry['total'] += event.duration
+            entry['self'] += event.self_time
+            entry['max'] = max(entry['max'], event.duration)
+        return sorted(totals.values(), key=lambda e: e['self'], reverse=True)
+
+    def write_trace(self, path: str) -> None:
+        pid = os.getpid()
+        records = [
+            {
+                'name': event.name,
+                'ph': 'X',
+                'ts': round(event.start * 1e6, 1),
+                'dur': round(event.duration * 1e6, 1),
+                'pid': pid,
+                'tid': event.thread,
+                'args': {key: str(value) for key, value in event.args.items()},
+            }
+            for event in sorted(self.events, key=lambda e: e.start)
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+            else:
+                json.dump({'traceEvents': records, 'displayTimeUnit': 'ms'}, f)
+
+
+TRACER = Tracer()
+_NO_SPAN = contextlib.nullcontext()
+
+
+def span(name: str, **args: Any):
+    """Context manager timing a named phase (a no-op unless tracing is on)."""
+    if not TRACER.enabled:
+        return _NO_SPAN
+    return TRACER.span(name, **args)
+
+
+def add_timing_arguments(parser) -> None:
+    """Add --timings, --trace and --profile to an argparse parser."""
+    group = parser.add_argument_group('instrumentation')
+    group.add_argument(
+        '--timings',
+        action='store_true',
+        help='Print a per-phase timing table when done'
+    )
+    group.add_argument(
+        '--trace',
+        type=str,
+        metavar='FILE',
+        help='Write timing spans as a Chrome trace (JSON lines if FILE ends in .jsonl)'
+    )
+    group.add_argument(
+        '--profile',
+        nargs='?',
+        const='',
+        metavar='FILE',
+        help=f'Run under cProfile and print the top {PROFILE_LINES} functions; '
+             'FILE also saves the stats for pstats/snakeviz'
+    )
+
+
+def print_phase_table(tracer: Tracer, wall_time: float) -> None:
+    print("Timings:")
+    print(f"  {'Phase':<32} {'Calls':>6} {'Total ms':>10} {'Self ms':>10} {'Max ms':>10} {'Self %':>7}")
+    for phase in tracer.phases():
+        share = phase['self'] / wall_time if wall_time else 0.0
+        print(f"  {phase['name']:<32} {phase['calls']:>6} {phase['total'] * 1000:>10.1f} "
+              f"{phase['self'] * 1000:>10.1f} {phase['max'] * 1000:>10.1f} {share:>7.1%}")
+    print(f"  {'wall time':<32} {'':>6} {wall_time * 1000:>10.1f}")
+    print()
+
+
+def instrument(args) -> None:
+    """Apply the add_timing_arguments() options for the rest of the run.
+
+    Call right after parse_args(); the reports are produced when the
+    interpreter exits, including through sys.exit().
+    """
+    timings = getattr(args, 'timings', False)
+    trace: Optional[str] = getattr(args, 'trace', None)
+    profile: Optional[str] = getattr(args, 'profile', None)
+    if not (timings or trace or profile is not None):
+        return
+    if timings or trace:
+        TRACER.enable()
+    profiler = cProfile.Profile() if profile is not None else None
+    started = time.perf_counter()
+
+    def report() -> None:
+        if profiler is not None:
+            profiler.disable()
+        wall_time = time.perf_counter() - started
+        if timings:
+            print()
+            print_phase_table(TRACER, wall_time)
+        if trace:
+            TRACER.write_trace(trace)
+            print(f"Trace: {len(TRACER.events)} span(s) written to {trace}")
+        if profiler is not None:
+            stats = pstats.Stats(profiler, stream=sys.stdout)
+            if profile:
+                stats.dump_stats(profile)
+                print(f"Profile: stats saved to {profile}")
+            stats.sort_stats('cumulative').print_stats(PROFILE_LINES)
+        sys.stdout.flush()
+
+    atexit.register(report)
+    if profiler is not None:
+        profiler.enable()
@@ -0,0 +1,83 @@
+"""
+`.Values` references in chart templates
+
+extract_references() finds every values path a template reads:
+`.Values.a.b` (also through `$` and `$root`), `index .Values "a" "b"` and
+`hasKey .Values.a "b"`, with the line it appears on. A reference covers
+everything below it, so `toYaml .Values.resources` reads all of
+`resources`; is_used() applies that rule to a values key.
+"""
+
+import bisect
+import re
+from pathlib import Path
+from typing import List, Set, Tuple
+
+TEMPLATE_SUFFIXES = ('.yaml', '.yml', '.tpl', '.txt')
+
+ACTION_RE = re.compile(r'\{\{(.*?)\}\}', re.DOTALL)
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+IDENT = r'[A-Za-z_][A-Za-z0-9_]*'
+# .Values.a.b, $.Values.a.b, $root.Values.a.b
+VALUES_REF_RE = re.compile(r'(?<![\w.])\$?\w*\.Values((?:\.' + IDENT + r')+)')
+# index .Values "a" "b" / index .Values.a "b"
+INDEX_REF_RE = re.compile(r'\bindex\s+\$?\w*\.Values((?:\.' + IDENT + r')*)((?:\s+"[^"]+")+)')
+# hasKey .Values.a "b"
+HASKEY_REF_RE = re.compile(r'\bhasKey\s+\$?\w*\.Values((?:\.' + IDENT + r')*)\s+"([^"]+)"')
+STRING_RE = re.compile(r'"([^"]+)"')
+
+Path_ = Tuple[str, ...]
+
+
+def line_starts(text: str) -> List[int]:
+    return [0] + [i + 1 for i, ch in enumerate(text) if ch == '\n']
+
+
+def extract_references(text: str) -> List[List]:
+    """Return [[path, line], ...] for every values path a template reads."""
+    starts = line_starts(text)
+    refs = []
+
+    def add(path: List[str], offset: int) -> None:
+        if path:
+            refs.append([path, bisect.bisect_right(starts, offset)])
+
+    for action in ACTION_RE.finditer(text):
+        body = COMMENT_RE.sub(lambda m: ' ' * len(m.group(0)), action.group(1))
+        base = action.start(1)
+        for m in VALUES_REF_RE.finditer(body):
+            add(m.group(1).split('.')[1:], base + m.start())
+        for m in INDEX_REF_RE.finditer(body):
+            prefix = m.group(1).split('.')[1:]
+            add(prefix + STRING_RE.findall(m.group(2)), base + m.start())
+        for m in HASKEY_REF_RE.finditer(body):
+            add(m.group(1).split('.')[1:] + [m.group(2)], base + m.start())
+    return refs
+
+
+def template_files(chart_dir: Path) -> List[Path]:
+    templates_dir = chart_dir / 'templates'
+    if not templates_dir.is_dir():
+        return []
+    return sorted(p for p in templates_dir.rglob('*') if p.is_file() and p.suffix in TEMPLATE_SUFFIXES)
+
+
+def template_references(chart_dir: Path) -> Set[Path_]:
+    """Every values path the chart's templates read."""
+    refs = set()
+    for path in template_files(chart_dir):
+        text = path.read_text(encoding='utf-8', errors='replace')
+        refs.update(tuple(ref) for ref, _ in extract_references(text))
+    return refs
+
+
+def reference_prefixes(refs: Set[Path_]) -> Set[Path_]:
+    """All leading parts of refs, for is_used()."""
+    return {ref[:i] for ref in refs for i in range(1, len(ref) + 1)}
+
+
+def is_used(path: Path_, ref_prefixes: Set[Path_], refs: Set[Path_]) -> bool:
+    """A key is used if a reference points at it, below it, or at an ancestor."""
+    if path in ref_prefixes:
+        return True
+    return any(path[:i] in refs for i in range(1, len(path)))
@@ -0,0 +1,194 @@
+"""
+File change notification for long-running tools
+
+open_watcher() returns an inotify watcher on Linux (through libc, no extra
+dependency) and falls back to polling directory listings elsewhere or when
+inotify is unavailable (e.g. the watch limit is exhausted, or network and
+container filesystems that do not deliver events).
+
+Directories are watched non-recursively; wait() returns the paths of
+entries created, written, renamed or deleted in them. When the kernel
+queue overflows, every watched directory is returned instead, so callers
+should treat a directory path as "rescan everything below it".
+batches() groups a burst of saves (editors often write several files or
+write-and-rename) into one set once no event arrived for `debounce`
+seconds.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+# struct inotify_event: wd, mask, cookie, len, then len bytes of name
+_EVENT = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+class InotifyWatcher:
+    """Watches directories through Linux inotify."""
+
+    kind = 'inotify'
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError(f"inotify is not available on {sys.platform}")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self._dirs: Dict[int, Path] = {}
+
+    def watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch: {os.strerror(err)}", str(directory))
+        self._dirs[wd] = Path(directory)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Changed paths, or an empty set when timeout seconds pass first."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    changed.update(self._dirs.values())
+                elif mask & IN_IGNORED:
+                    # The directory was removed (or unmounted)
+                    self._dirs.pop(wd, None)
+                elif name and wd in self._dirs:
+                    changed.add(self._dirs[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Watches directories by comparing (mtime, size) listings."""
+
+    kind = 'polling'
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        # directory -> {entry path: (mtime_ns, size)}; subdirectories as (0, 0)
+        self._listings: Dict[Path, Dict[Path, Tuple[int, int]]] = {}
+
+    @staticmethod
+    def _list(directory: Path) -> Optional[Dict[Path, Tuple[int, int]]]:
+        entries = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            entries[Path(entry.path)] = (0, 0)
+                        else:
+                            st = entry.stat(follow_symlinks=False)
+                            entries[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+                    except FileNotFoundError:
+                        continue
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return entries
+
+    def watch(self, directory: Path) -> None:
+        self._listings[Path(directory)] = self._list(directory) or {}
+
+    def _poll(self) -> Set[Path]:
+        changed: Set[Path] = set()
+        for directory, old in list(self._listings.items()):
+            new = self._list(directory)
+            if new is None:
+                # Removed; its parent's listing reports the deletion
+                del self._listings[directory]
+                changed.update(old)
+                continue
+            if new != old:
+                changed.update(p for p in set(old) | set(new) if old.get(p) != new.get(p))
+                self._listings[directory] = new
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Changed paths, or an empty set when timeout seconds pass first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+            changed = self._poll()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        self._listings.clear()
+
+
+def open_watcher(directories: Iterable[Path], polling: bool = False, interval: float = 0.5):
+    """Watch directories with inotify, or by polling if requested or inotify fails."""
+    directories = list(directories)
+    if not polling:
+        try:
+            watcher = InotifyWatcher()
+        except (OSError, AttributeError):
+            # AttributeError: libc without inotify_init1
+            watcher = None
+        if watcher is not None:
+            try:
+                for directory in directories:
+                    watcher.watch(directory)
+                return watcher
+            except OSError:
+                # e.g. fs.inotify.max_user_watches exhausted
+                watcher.close()
+    watcher = PollingWatcher(interval)
+    for directory in directories:
+        watcher.watch(directory)
+    return watcher
+
+
+def batches(watcher, debounce: float) -> Iterator[Set[Path]]:
+    """Yield changed paths, merging events until debounce seconds are quiet."""
+    while True:
+        changed = watcher.wait(None)
+        if not changed:
+            continue
+        while True:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        yield changed
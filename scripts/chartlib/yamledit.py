@@ -0,0 +1,278 @@
+"""
+Format-preserving YAML editing
+
+Edits are applied to the original text using the source positions PyYAML's
+composer records for every node: only the span of the value being replaced
+changes, so comments, key order, blank lines and quoting elsewhere in the
+file survive untouched. Block and flow sequences, nested mappings and block
+scalars are all handled, which the old line-based keyword rewriter could not
+do.
+"""
+
+import difflib
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import yaml
+from yaml.nodes import MappingNode, Node, ScalarNode, SequenceNode
+
+from chartlib.output import AtomicWriter
+
+INDENT = 2
+
+
+class YamlEditError(ValueError):
+    """Raised when an edit cannot be applied."""
+
+
+def render_scalar(value: Any, style: Optional[str] = None) -> str:
+    """Render a scalar on one line, keeping quote style for strings when given."""
+    if isinstance(value, str) and style in ('"', "'"):
+        text = yaml.safe_dump(value, default_style=style, width=float('inf'))
+    else:
+        text = yaml.safe_dump(value, default_flow_style=True, width=float('inf'))
+    text = text.rstrip('\n')
+    if text.endswith('\n...'):
+        text = text[:-4]
+    if style is None and text.startswith("'"):
+        # Quoting is needed; the charts use double quotes
+        return render_scalar(value, '"')
+    return text.rstrip('\n')
+
+
+def render_value(value: Any, indent: int, flow: bool = False) -> str:
+    """Render a value that follows `key:` for a key at column `indent`.
+
+    Block collections start on the next line; the result never ends with a
+    newline.
+    """
+    if isinstance(value, str) and '\n' in value:
+        pad = ' ' * (indent + INDENT)
+        lines = [pad + line if line else '' for line in value.rstrip('\n').split('\n')]
+        indicator = '|' if value.endswith('\n') else '|-'
+        return f" {indicator}\n" + '\n'.join(lines)
+    if isinstance(value, (list, tuple)):
+        if flow or not value:
+            return ' [' + ', '.join(render_scalar(v) for v in value) + ']'
+        pad = ' ' * (indent + INDENT)
+        return '\n' + '\n'.join(f"{pad}- {render_scalar(v)}" for v in value)
+    if isinstance(value, dict):
+        if not value:
+            return ' {}'
+        pad = ' ' * (indent + INDENT)
+        return '\n' + '\n'.join(
+            f"{pad}{render_scalar(k)}:{render_value(v, indent + INDENT)}" for k, v in value.items()
+        )
+    return ' ' + render_scalar(value)
+
+
+def node_end(node: Node, text: str) -> int:
+    """Index just past a node's content, excluding trailing comments/blank lines."""
+    if isinstance(node, SequenceNode) and not node.flow_style and node.value:
+        return node_end(node.value[-1], text)
+    if isinstance(node, MappingNode) and not node.flow_style and node.value:
+        return node_end(node.value[-1][1], text)
+    # Block scalars end after their trailing line breaks
+    start = node.start_mark.index
+    return start + len(text[start:node.end_mark.index].rstrip())
+
+
+class YamlEditor:
+    r"""Apply targeted edits to a YAML document's text.
+
+    New keys go into block mappings as indented lines and into flow
+    mappings inside the braces (cd scripts && python3 -m doctest
+    chartlib/yamledit.py runs these examples):
+
+    >>> editor = YamlEditor("name: demo  # keep\nannotations:\n  a: b\n")
+    >>> editor.set(['annotations', 'k'], 'v')
+    >>> print(editor.text, end='')
+    name: demo  # keep
+    annotations:
+      a: b
+      k: v
+    >>> editor = YamlEditor("annotations: {}\nlabels: {a: b}\nversion: 1.0.0\n")
+    >>> editor.set(['annotations', 'k'], 'v')
+    >>> editor.set(['labels', 'tier', 'name'], 'db')
+    >>> print(editor.text, end='')
+    annotations: {k: v}
+    labels: {a: b, tier: {name: db}}
+    version: 1.0.0
+    """
+
+    def __init__(self, text: str):
+        self.original = text
+        self.text = text
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'YamlEditor':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    @property
+    def changed(self) -> bool:
+        return self.text != self.original
+
+    def _root(self) -> MappingNode:
+        root = yaml.compose(self.text, Loader=yaml.SafeLoader)
+        if root is None:
+            return None
+        if not isinstance(root, MappingNode):
+            raise YamlEditError("Document root is not a mapping")
+        return root
+
+    def _find(self, path: Sequence[Union[str, int]]) -> Tuple[Optional[MappingNode], Optional[Node], Optional[Node], int]:
+        """Walk path; returns (parent mapping, key node, value node, depth reached).
+
+        Integer path elements index into existing block or flow sequences.
+        """
+        parent = self._root()
+        for depth, key in enumerate(path):
+            if parent is None:
+                return None, None, None, depth
+            where = '.'.join(str(k) for k in path[:depth + 1])
+            if isinstance(key, int):
+                if not isinstance(parent, SequenceNode) or not 0 <= key < len(parent.value):
+                    raise YamlEditError(f"{where} is not an existing sequence item")
+                if depth == len(path) - 1:
+                    raise YamlEditError(f"{where}: sequence items cannot be replaced")
+                parent = parent.value[key]
+                if not isinstance(parent, MappingNode):
+                    raise YamlEditError(f"{where} is not a mapping")
+                continue
+            for key_node, value_node in parent.value:
+                if isinstance(key_node, ScalarNode) and key_node.value == key:
+                    if depth == len(path) - 1:
+                        return parent, key_node, value_node, depth + 1
+                    expected = SequenceNode if isinstance(path[depth + 1], int) else MappingNode
+                    if not isinstance(value_node, expected):
+                        raise YamlEditError(f"{where} is not a {'sequence' if expected is SequenceNode else 'mapping'}")
+                    parent = value_node
+                    break
+            else:
+                if any(isinstance(k, int) for k in path[depth:]):
+                    raise YamlEditError(f"{where} does not exist")
+                return parent, None, None, depth
+        return parent, None, None, len(path)
+
+    def get(self, path: Sequence[Union[str, int]]) -> Any:
+        """Current value at path (None if missing)."""
+        _, _, value_node, _ = self._find(path)
+        if value_node is None:
+            return None
+        return yaml.SafeLoader(self.text).construct_document(value_node)
+
+    def set(self, path: Sequence[Union[str, int]], value: Any) -> None:
+        """Set the value at path, creating missing mappings along the way."""
+        parent, key_node, value_node, depth = self._find(path)
+        if value_node is not None:
+            self._replace(key_node, value_node, value, bool(parent.flow_style))
+        else:
+            self._insert(parent, list(path[depth:]), value)
+
+    def _replace(self, key_node: Node, value_node: Node, value: Any, in_flow: bool = False) -> None:
+        start = key_node.end_mark.index
+        end = node_end(value_node, self.text)
+        indent = key_node.start_mark.column
+
+        if in_flow:
+            # Block syntax is not allowed inside {...}
+            style = value_node.style if isinstance(value_node, ScalarNode) else None
+            rendered = ': ' + render_scalar(value, style)
+        elif (isinstance(value, (list, tuple)) and isinstance(value_node, SequenceNode)
+                and not value_node.flow_style and value):
+            # Keep the existing item indentation of block sequences
+            item_col = value_node.value[0].start_mark.column - 2 if value_node.value else indent
+            pad = ' ' * item_col
+            rendered = ':\n' + '\n'.join(f"{pad}- {render_scalar(v)}" for v in value)
+        elif isinstance(value_node, ScalarNode) and not isinstance(value, (list, tuple, dict)) \
+                and not (isinstance(value, str) and '\n' in value):
+            rendered = ': ' + render_scalar(value, value_node.style)
+        else:
+            flow = isinstance(value_node, SequenceNode) and bool(value_node.flow_style)
+            rendered = ':' + render_value(value, indent, flow)
+
+        # key_node.end_mark is just before the ':'; keep a trailing comment on
+        # the key line when the old value started on a later line
+        colon = self.text.index(':', start)
+        line_end = self.text.find('\n', colon)
+        if rendered.startswith(':\n') and line_end != -1 and value_node.start_mark.index > line_end:
+            rendered = ':' + self.text[colon + 1:line_end].rstrip() + rendered[1:]
+        self.text = self.text[:start] + self.text[start:colon] + rendered + self.text[end:]
+
+    def _insert(self, parent: Optional[MappingNode], keys: List[str], value: Any) -> None:
+        nested = value
+        for key in reversed(keys[1:]):
+            nested = {key: nested}
+
+        if parent is not None and parent.flow_style:
+            # Splice the entry inside the braces of {} / {a: b}
+            entry = f"{render_scalar(keys[0])}: {render_scalar(nested)}"
+            if parent.value:
+                end = node_end(parent.value[-1][1], self.text)
+                self.text = self.text[:end] + ', ' + entry + self.text[end:]
+            else:
+                start = parent.start_mark.index
+                self.text = self.text[:start] + '{' + entry + '}' + self.text[parent.end_mark.index:]
+            return
+
+        if parent is None or not parent.value:
+            indent = 0 if parent is None else parent.start_mark.column
+            prefix = self.text if self.text.endswith('\n') or not self.text else self.text + '\n'
+            self.text = f"{prefix}{' ' * indent}{render_scalar(keys[0])}:{render_value(nested, indent)}\n"
+            return
+
+        indent = parent.value[0][0].start_mark.column
+        end = node_end(parent.value[-1][1], self.text)
+        # Insert after the end of the line holding the last value
+        line_end = self.text.find('\n', end)
+        if line_end == -1:
+            self.text += '\n'
+            line_end = len(self.text) - 1
+        entry = f"{' ' * indent}{render_scalar(keys[0])}:{render_value(nested, indent)}\n"
+        self.text = self.text[:line_end + 1] + entry + self.text[line_end + 1:]
+
+    def diff(self, path: str) -> str:
+        """Unified diff of the pending changes."""
+        return ''.join(difflib.unified_diff(
+            self.original.splitlines(keepends=True),
+            self.text.splitlines(keepends=True),
+            fromfile=f"a/{path}",
+            tofile=f"b/{path}",
+        ))
+
+    def validate(self) -> None:
+        """Raise YamlEditError unless the edited text still parses."""
+        try:
+            yaml.compose(self.text, Loader=yaml.SafeLoader)
+        except yaml.YAMLError as e:
+            problem = getattr(e, 'problem', None) or str(e).splitlines()[0]
+            raise YamlEditError(f"Edit would produce invalid YAML: {problem}")
+
+    def save(self, path: Path) -> bool:
+        """Write atomically if changed; returns whether the file was rewritten.
+
+        Raises YamlEditError instead of writing text that no longer parses.
+        """
+        if not self.changed:
+            return False
+        self.validate()
+        with AtomicWriter(path) as writer:
+            writer.write(self.text)
+        return writer.changed
+
+
+def bump_version(version: str, part: str) -> str:
+    """Bump a MAJOR.MINOR.PATCH version; pre-release/build suffixes are dropped."""
+    core = str(version).split('-', 1)[0].split('+', 1)[0]
+    try:
+        major, minor, patch = (int(p) for p in core.split('.'))
+    except ValueError:
+        raise YamlEditError(f"Not a semantic version: {version}")
+    if part == 'major':
+        return f"{major + 1}.0.0"
+    if part == 'minor':
+        return f"{major}.{minor + 1}.0"
+    if part == 'patch':
+        return f"{major}.{minor}.{patch + 1}"
+    raise YamlEditError(f"Unknown version part: {part}")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Offline Link and Anchor Checker for Markdown Docs
+
+This script checks every relative link in the repository's Markdown without
+network access:
+- The target file or directory must exist (case-sensitively, as on GitHub)
+- A #fragment into a Markdown file must match one of its headings (slugged
+  like GitHub, duplicates numbered -1, -2, ...) or an explicit id/name anchor
+- Same-file #fragments are checked against the file's own headings
+
+External URLs (https:, mailto:, ...) are counted but not fetched.
+
+Headings and links are extracted once per file content: results are kept in
+.cache/chart-tools/doc-links.json by content hash, and only new or edited
+files are re-read, in parallel. Links are then resolved against the
+in-memory index of all files and headings, so a renamed heading is caught
+in every file linking to it even when those files did not change.
+
+Usage:
+    # docs/, charts/ and top-level Markdown
+    python3 scripts/check-doc-links.py
+
+    # Only some files or directories
+    python3 scripts/check-doc-links.py docs/CHARTS.md charts/redis
+
+Exit codes:
+    0: All links resolve
+    1: Broken links or anchors found
+"""
+
+import os
+import sys
+import time
+import argparse
+import hashlib
+import posixpath
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Set
+from urllib.parse import unquote
+
+from chartlib.fileindex import FileIndex
+from chartlib.markdown import extract_file, is_external, split_target
+from chartlib.parallel import map_ordered, resolve_jobs
+from chartlib.repository import DEFAULT_REPO_ROOT
+
+# Default set of documents to check
+DEFAULT_PATHS = ['docs', 'charts', '*.md']
+SKIP_DIRS = {'.git', '.cache', 'build', 'node_modules', '__pycache__', '.venv'}
+MARKDOWN_SUFFIXES = ('.md', '.markdown')
+# Extracted results are invalidated whenever the extractor changes
+EXTRACTOR_VERSION = hashlib.sha256(
+    (Path(__file__).resolve().parent / 'chartlib' / 'markdown.py').read_bytes()
+).hexdigest()
+
+
+class Problem(NamedTuple):
+    path: str
+    line: int
+    message: str
+
+
+def walk_repository(repo_root: Path) -> Set[str]:
+    """Every file and directory below repo_root as a relative posix path."""
+    paths: Set[str] = set()
+    for dirpath, dirnames, filenames in os.walk(repo_root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        rel = Path(dirpath).relative_to(repo_root).as_posix()
+        prefix = '' if rel == '.' else f"{rel}/"
+        paths.update(prefix + d for d in dirnames)
+        paths.update(prefix + f for f in filenames)
+    return paths
+
+
+def select_documents(markdown: List[str], patterns: List[str]) -> List[str]:
+    """Markdown files under the given directories/files/top-level globs."""
+    selected = set()
+    for pattern in patterns:
+        pattern = pattern.rstrip('/')
+        for path in markdown:
+            if path == pattern or path.startswith(pattern + '/') or (
+                    '/' not in path and Path(path).match(pattern)):
+                selected.add(path)
+    return sorted(selected)
+
+
+def check_document(path: str, links: List, anchors: Dict[str, Set[str]], files: Set[str]) -> List[Problem]:
+    problems = []
+    base_dir = posixpath.dirname(path)
+    for line, target in links:
+        if is_external(target):
+            continue
+        target_path, fragment = split_target(target)
+        target_path = unquote(target_path)
+        if not target_path:
+            resolved = path
+        else:
+            joined = target_path.lstrip('/') if target_path.startswith('/') else posixpath.join(base_dir, target_path)
+            resolved = posixpath.normpath(joined)
+            if resolved == '.':
+                continue
+            if resolved.startswith('../'):
+                problems.append(Problem(path, line, f"link outside the repository: {target}"))
+                continue
+            if resolved not in files:
+                problems.append(Problem(path, line, f"broken link: {target} (no such file)"))
+                continue
+        if fragment and resolved in anchors:
+            fragment = unquote(fragment).lower()
+            if fragment not in anchors[resolved]:
+                where = 'this file' if resolved == path else resolved
+                problems.append(Problem(path, line, f"missing anchor: #{fragment} in {where}"))
+    return problems
+
+
+def main():
+    """Main checking logic."""
+    parser = argparse.ArgumentParser(
+        description='Check relative links and anchors in Markdown docs offline'
+    )
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        help=f"Files or directories to check (default: {' '.join(DEFAULT_PATHS)})"
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Extract changed files in N worker processes (0 = one per CPU, default: 0)'
+    )
+    args = parser.parse_args()
+
+    repo_root = DEFAULT_REPO_ROOT
+    started = time.perf_counter()
+
+    print("=" * 80)
+    print("Markdown Link Check")
+    print("=" * 80)
+    print()
+
+    files = walk_repository(repo_root)
+    markdown = sorted(p for p in files if p.lower().endswith(MARKDOWN_SUFFIXES)
+                      and (repo_root / p).is_file())
+    patterns = [str(Path(p).resolve().relative_to(repo_root)) if Path(p).exists() else p
+                for p in args.paths] or DEFAULT_PATHS
+    documents = select_documents(markdown, patterns)
+    if not documents:
+        print(f"Error: No Markdown files match {' '.join(patterns)}")
+        sys.exit(1)
+
+    # Every Markdown file is indexed, checked or not: links may point into any of them
+    index = FileIndex(repo_root, 'doc-links', EXTRACTOR_VERSION)
+    extracted: Dict[str, Dict] = {}
+    misses: List[str] = []
+    for path in markdown:
+        value = index.get(repo_root / path)
+        if value is None:
+            misses.append(path)
+        else:
+            extracted[path] = value
+    results = map_ordered(extract_file, [str(repo_root / p) for p in misses], args.jobs, 'process')
+    for path, value in zip(misses, results):
+        index.put(repo_root / path, value)
+        extracted[path] = value
+    index.save()
+
+    anchors = {path: {a.lower() for a in value['anchors']} for path, value in extracted.items()}
+
+    problems: List[Problem] = []
+    link_count = 0
+    external = 0
+    for path in documents:
+        links = extracted[path]['links']
+        link_count += len(links)
+        external += sum(1 for _, target in links if is_external(target))
+        problems.extend(check_document(path, links, anchors, files))
+
+    current = None
+    for problem in problems:
+        if problem.path != current:
+            if current is not None:
+                print()
+            print(f"{problem.path}:")
+            current = problem.path
+        print(f"  ❌ line {problem.line}: {problem.message}")
+    if problems:
+        print()
+
+    elapsed = time.perf_counter() - started
+    workers = min(resolve_jobs(args.jobs), max(len(misses), 1))
+    print("=" * 80)
+    print(f"{len(documents)} file(s), {link_count} link(s) ({external} external, not fetched)")
+    print(f"   Indexed {len(markdown)} Markdown file(s): {len(misses)} re-read"
+          + (f" with {workers} worker(s)" if misses else "")
+          + f", {len(markdown) - len(misses)} from cache, in {elapsed:.2f}s")
+    if problems:
+        broken_files = len({p.path for p in problems})
+        print(f"❌ {len(problems)} broken link(s) in {broken_files} file(s)")
+    else:
+        print("✅ All links resolve")
+    print("=" * 80)
+
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
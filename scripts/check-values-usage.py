@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Cross-Reference Template Values Usage
+
+This script indexes every `.Values.x.y` reference in charts/*/templates
+(including _helpers.tpl and NOTES.txt) and every key defined in each chart's
+values.yaml and values-*.yaml scenario files, then joins the two per chart:
+1. Undefined references: paths templates read that values.yaml does not define
+2. Dead keys: values.yaml keys no template reads
+3. Dead scenario keys: keys a values-*.yaml file sets that no template reads
+
+A reference covers everything below it (`toYaml .Values.resources` uses all
+of `resources`), and a key whose value is empty, null or a scalar is treated
+as opaque. `global` and subchart (dependency) keys are ignored. Only the
+topmost dead key of a dead subtree is reported.
+
+Files are indexed in parallel and the extracted paths are kept in a
+persistent per-file index (.cache/chart-tools/values-usage-index.json), so a
+warm run only re-reads files that changed.
+
+Usage:
+    python3 scripts/check-values-usage.py
+
+    # Check specific chart
+    python3 scripts/check-values-usage.py --chart redis
+
+    # Only charts touched since a git ref, fail on dead keys too
+    python3 scripts/check-values-usage.py --changed-since origin/master --strict
+
+Exit codes:
+    0: No undefined references (and no dead keys with --strict)
+    1: Issues found
+"""
+
+import sys
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import yaml
+
+from chartlib import ChartRepository, find_chart_dirs
+from chartlib.cache import SafeLoader
+from chartlib.fileindex import FileIndex
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.parallel import EXECUTORS, map_ordered, resolve_jobs
+from chartlib.valuerefs import (
+    Path_, extract_references, is_used, reference_prefixes, template_files,
+)
+
+# Changing the extractor invalidates the persistent index
+EXTRACTOR_VERSION = hashlib.sha256(
+    Path(__file__).read_bytes() + (Path(__file__).parent / 'chartlib' / 'valuerefs.py').read_bytes()
+).hexdigest()
+
+# Top-level keys Helm itself consumes
+IGNORED_ROOTS = {'global'}
+
+# Kinds recorded for defined values paths
+MAP, OPAQUE = 'map', 'opaque'
+
+
+def extract_definitions(data) -> List[List]:
+    """Return [[path, kind], ...] for every key in a parsed values document."""
+    defs = []
+
+    def walk(node, prefix: List[str]) -> None:
+        for key, value in node.items():
+            path = prefix + [str(key)]
+            if isinstance(value, dict) and value:
+                defs.append([path, MAP])
+                walk(value, path)
+            else:
+                defs.append([path, OPAQUE])
+
+    if isinstance(data, dict):
+        walk(data, [])
+    return defs
+
+
+def index_file(path: Path) -> List[List]:
+    """Worker: extract references from a template or definitions from a values file."""
+    text = path.read_text(encoding='utf-8', errors='replace')
+    if path.parent.name != 'templates' and path.name.startswith('values'):
+        # values-example.yaml files may hold several example documents
+        defs = {}
+        for data in yaml.load_all(text, Loader=SafeLoader):
+            for key, kind in extract_definitions(data):
+                if defs.get(tuple(key)) != MAP:
+                    defs[tuple(key)] = kind
+        return [[list(key), kind] for key, kind in defs.items()]
+    return extract_references(text)
+
+
+def values_files(chart_dir: Path) -> List[Path]:
+    """values.yaml first, then the values-*.yaml scenario files."""
+    base = chart_dir / 'values.yaml'
+    return ([base] if base.exists() else []) + sorted(chart_dir.glob('values-*.yaml'))
+
+
+def dependency_roots(repo: ChartRepository, chart_dir: Path) -> Set[str]:
+    """Top-level keys that configure subcharts."""
+    try:
+        chart_yaml = repo.load_yaml(chart_dir / 'Chart.yaml') or {}
+    except Exception:
+        return set()
+    roots = set()
+    for dep in chart_yaml.get('dependencies') or []:
+        if isinstance(dep, dict):
+            roots.add(str(dep.get('alias') or dep.get('name')))
+    return roots
+
+
+class UsageReport(NamedTuple):
+    """Findings for one chart."""
+    name: str
+    undefined: List[str]
+    dead: List[str]
+    dead_scenario: Dict[str, List[str]]
+    refs: int
+    keys: int
+
+
+def dead_keys(defs: Iterable[Path_], ref_prefixes: Set[Path_], refs: Set[Path_],
+              ignored: Set[str]) -> List[str]:
+    """Topmost unused keys."""
+    dead = []
+    dead_set = set()
+    for path in defs:
+        if path[:-1] in dead_set:
+            dead_set.add(path)
+            continue
+        if path[0] not in ignored and not is_used(path, ref_prefixes, refs):
+            dead_set.add(path)
+            dead.append('.'.join(path))
+    return dead
+
+
+def is_defined(path: Path_, defs: Dict[Path_, str]) -> bool:
+    """Whether values.yaml defines path, treating opaque values as free-form."""
+    for i in range(1, len(path) + 1):
+        kind = defs.get(path[:i])
+        if kind is None:
+            return False
+        if kind == OPAQUE:
+            return True
+    return True
+
+
+def analyze_chart(
+    name: str,
+    templates: Dict[Path, List[List]],
+    values: Dict[Path, List[List]],
+    ignored: Set[str]
+) -> UsageReport:
+    """Join a chart's template references with its values definitions."""
+    first_seen: Dict[Path_, str] = {}
+    for path, refs in templates.items():
+        location = path.name if path.parent.name == 'templates' else f"{path.parent.name}/{path.name}"
+        for ref, line in refs:
+            first_seen.setdefault(tuple(ref), f"{location}:{line}")
+    refs = set(first_seen)
+    ref_prefixes = reference_prefixes(refs)
+
+    base_defs: Dict[Path_, str] = {}
+    scenario_defs: Dict[str, Dict[Path_, str]] = {}
+    for path, defs in values.items():
+        target = base_defs if path.name == 'values.yaml' else scenario_defs.setdefault(path.name, {})
+        for key, kind in defs:
+            target[tuple(key)] = kind
+
+    undefined = []
+    for ref in sorted(refs):
+        if ref[0] in ignored or is_defined(ref, base_defs):
+            continue
+        where = first_seen[ref]
+        also = [f for f, defs in scenario_defs.items() if is_defined(ref, defs)]
+        note = f" (only in {', '.join(also)})" if also else ''
+        undefined.append(f"{'.'.join(ref)} ({where}){note}")
+
+    dead = dead_keys(base_defs, ref_prefixes, refs, ignored)
+    dead_scenario = {}
+    for file_name, defs in sorted(scenario_defs.items()):
+        unused = dead_keys(defs, ref_prefixes, refs, ignored)
+        if unused:
+            dead_scenario[file_name] = unused
+
+    return UsageReport(name, undefined, dead, dead_scenario, len(refs), len(base_defs))
+
+
+def build_index(
+    index: FileIndex,
+    files: List[Path],
+    jobs: int,
+    executor: str
+) -> Tuple[Dict[Path, List[List]], List[str]]:
+    """Return extracted data per file, re-indexing only files that changed."""
+    results = {}
+    missed = []
+    for path in files:
+        value = index.get(path)
+        if value is None:
+            missed.append(path)
+        else:
+            results[path] = value
+
+    errors = []
+    for path, (value, error) in zip(missed, map_ordered(safe_index_file, missed, jobs, executor)):
+        if error:
+            errors.append(f"{path}: {error}")
+            continue
+        index.put(path, value)
+        results[path] = value
+    return results, errors
+
+
+def safe_index_file(path: Path) -> Tuple[Optional[List[List]], Optional[str]]:
+    try:
+        return index_file(path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def main():
+    """Main cross-reference logic."""
+    parser = argparse.ArgumentParser(
+        description='Cross-reference template .Values usage with values.yaml and scenario files'
+    )
+    parser.add_argument(
+        '--chart',
+        type=str,
+        help='Check specific chart only'
+    )
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='Also fail on dead keys'
+    )
+    parser.add_argument(
+        '--no-dead-keys',
+        action='store_true',
+        help='Only report undefined references'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Worker count for indexing changed files (default: 0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--executor',
+        choices=EXECUTORS,
+        default='process',
+        help='Worker pool type (default: process)'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Values Usage Cross-Reference")
+    print("=" * 80)
+    print()
+
+    chart_dirs = find_chart_dirs(repo.charts_dir)
+    if args.chart:
+        chart_dirs = [d for d in chart_dirs if d.name == args.chart]
+        if not chart_dirs:
+            print(f"Error: Chart '{args.chart}' not found in {repo.charts_dir}")
+            sys.exit(1)
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(
+                repo.repo_root, {d.name for d in chart_dirs}, args.changed_since, args.staged
+            )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+
+    index = FileIndex(repo.repo_root, 'values-usage-index', EXTRACTOR_VERSION)
+    chart_files = {d: (template_files(d), values_files(d)) for d in chart_dirs}
+    all_files = [p for templates, values in chart_files.values() for p in templates + values]
+    extracted, errors = build_index(index, all_files, args.jobs, args.executor)
+    index.save()
+
+    reports = []
+    for chart_dir, (templates, values) in chart_files.items():
+        ignored = IGNORED_ROOTS | dependency_roots(repo, chart_dir)
+        reports.append(analyze_chart(
+            chart_dir.name,
+            {p: extracted[p] for p in templates if p in extracted},
+            {p: extracted[p] for p in values if p in extracted},
+            ignored
+        ))
+    repo.save_cache()
+
+    total_refs = sum(r.refs for r in reports)
+    print(f"Indexed {len(all_files)} files in {len(reports)} charts "
+          f"({index.misses} re-indexed with {resolve_jobs(args.jobs)} worker(s), {index.hits} from index)")
+    print(f"Distinct values references: {total_refs}")
+    print()
+
+    for error in errors:
+        print(f"❌ Error indexing {error}")
+    if errors:
+        print()
+
+    undefined_count = dead_count = 0
+    for report in reports:
+        dead = [] if args.no_dead_keys else report.dead
+        dead_scenario = {} if args.no_dead_keys else report.dead_scenario
+        if not (report.undefined or dead or dead_scenario):
+            continue
+        print(f"{report.name}:")
+        if report.undefined:
+            print(f"  ❌ Undefined references ({len(report.undefined)}):")
+            for line in report.undefined:
+                print(f"    - {line}")
+        if dead:
+            print(f"  ⚠️  Dead keys in values.yaml ({len(dead)}):")
+            for key in dead:
+                print(f"    - {key}")
+        for file_name, keys in dead_scenario.items():
+            print(f"  ⚠️  Dead keys in {file_name} ({len(keys)}):")
+            for key in keys:
+                print(f"    - {key}")
+        print()
+        undefined_count += len(report.undefined)
+        dead_count += len(dead) + sum(len(k) for k in dead_scenario.values())
+
+    print("=" * 80)
+    failed = undefined_count or errors or (args.strict and dead_count)
+    if not undefined_count and not dead_count and not errors:
+        print("✅ All values references and keys are consistent!")
+    else:
+        print(f"Undefined references: {undefined_count}, dead keys: {dead_count}")
+        if failed:
+            print("❌ Values usage issues found - please fix the errors above")
+    print("=" * 80)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,20 +8,37 @@ for all charts in the repository.
 Usage:
     python3 scripts/generate-artifacthub-dashboard.py
 
+    # Per-phase timings or a Chrome trace
+    python3 scripts/generate-artifacthub-dashboard.py --timings --trace dashboard.trace.json
+
 Output:
     docs/ARTIFACTHUB_DASHBOARD.md
 """
 
+import re
 import yaml
 import sys
+import argparse
 from pathlib import Path
 from datetime import datetime
 
-def load_yaml_file(file_path):
+from chartlib import ChartRepository
+from chartlib.catalog import CatalogModel, register_output
+from chartlib.markdown import slugify
+from chartlib.output import write_lines
+from chartlib.timing import add_timing_arguments, instrument, span
+
+# Repository name on Artifact Hub (adjust as needed)
+REPO_NAME = 'sb-helm-charts'
+# Generation timestamps: a render differing only in these lines is not rewritten
+TIMESTAMP_LINES = re.compile(r'<!-- Generated: |\*\*Last Updated\*\*: ')
+
+def load_yaml_file(file_path, repository=None):
     """Load and parse a YAML file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        if repository is None:
+            repository = ChartRepository()
+        return repository.load_yaml(file_path)
     except FileNotFoundError:
         print(f"❌ Error: File not found: {file_path}", file=sys.stderr)
         sys.exit(1)
@@ -42,24 +59,15 @@ def generate_artifacthub_badge(repo_name, chart_name=None):
 
     return f"[![Artifact Hub]({badge_url})]({link_url})"
 
-def generate_dashboard(metadata_file, output_file, repo_name):
-    """Generate Artifact Hub dashboard from metadata."""
-
-    # Load metadata
-    metadata = load_yaml_file(metadata_file)
-    charts = metadata.get('charts', {})
-
-    if not charts:
-        print("❌ No charts found in metadata", file=sys.stderr)
-        sys.exit(1)
+def render_dashboard(model, repo_name):
+    """Render the dashboard as a list of markdown lines from a CatalogModel."""
+    charts = model.charts
 
-    # Group by category
-    categories = {}
-    for chart_name, chart_info in sorted(charts.items()):
-        category = chart_info.get('category', 'uncategorized')
-        if category not in categories:
-            categories[category] = []
-        categories[category].append((chart_name, chart_info))
+    # Group by category, charts in name order
+    categories = {
+        category: sorted(entries, key=lambda entry: entry[0])
+        for category, entries in model.categories.items()
+    }
 
     # Generate markdown
     md = []
@@ -101,8 +109,7 @@ def generate_dashboard(metadata_file, output_file, repo_name):
     md.append("")
     for category in sorted(categories.keys()):
         category_title = category.replace('_', ' ').title()
-        md.append(f"- [{category_title} Charts](#" +
-                 category.replace('_', '-') + "-charts)")
+        md.append(f"- [{category_title} Charts](#{slugify(category_title + ' Charts')})")
     md.append("")
     md.append("---")
     md.append("")
@@ -235,29 +242,56 @@ def generate_dashboard(metadata_file, output_file, repo_name):
     md.append(f"**Last Updated**: {datetime.now().strftime('%Y-%m-%d')}")
     md.append("")
 
-    # Write to file
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    return md
+
+register_output(
+    'artifacthub-dashboard',
+    'docs/ARTIFACTHUB_DASHBOARD.md',
+    lambda model: render_dashboard(model, REPO_NAME),
+    volatile=TIMESTAMP_LINES
+)
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(md))
+def generate_dashboard(metadata_file, output_file, repo_name, repository=None):
+    """Generate Artifact Hub dashboard from metadata."""
+
+    # Load metadata
+    with span('load metadata'):
+        metadata = load_yaml_file(metadata_file, repository)
+    charts = metadata.get('charts', {})
+
+    if not charts:
+        print("❌ No charts found in metadata", file=sys.stderr)
+        sys.exit(1)
+
+    model = CatalogModel(metadata, repository)
+    with span('render'):
+        md = render_dashboard(model, repo_name)
+
+    # Write to file (skipped when the content is unchanged)
+    write_lines(output_file, md, TIMESTAMP_LINES)
 
     print(f"✅ Generated Artifact Hub dashboard: {output_file}")
-    print(f"   Total charts: {total_charts}")
-    print(f"   Categories: {len(categories)}")
+    print(f"   Total charts: {len(charts)}")
+    print(f"   Categories: {len(model.categories)}")
 
-def main():
+def main(argv=None, repo=None):
     """Main function."""
-    # File paths
-    repo_root = Path(__file__).parent.parent
-    metadata_file = repo_root / 'charts' / 'charts-metadata.yaml'
-    output_file = repo_root / 'docs' / 'ARTIFACTHUB_DASHBOARD.md'
+    parser = argparse.ArgumentParser(
+        description='Generate the Artifact Hub dashboard from charts-metadata.yaml'
+    )
+    add_timing_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument(args)
 
-    # Repository name (adjust as needed)
-    repo_name = 'sb-helm-charts'
+    # File paths
+    if repo is None:
+        repo = ChartRepository(Path(__file__).parent.parent)
+    metadata_file = repo.metadata_file
+    output_file = repo.repo_root / 'docs' / 'ARTIFACTHUB_DASHBOARD.md'
 
     print("Generating Artifact Hub dashboard...")
-    generate_dashboard(metadata_file, output_file, repo_name)
+    generate_dashboard(metadata_file, output_file, REPO_NAME, repo)
+    repo.save_cache()
     print("✅ Dashboard generation complete!")
 
 if __name__ == '__main__':
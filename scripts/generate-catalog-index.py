@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Generate Machine-Readable Chart Catalog Index
+
+This script exports the catalog as compact JSON next to docs/CHARTS.md so
+tools can query it without scraping markdown or parsing YAML:
+- charts: per-chart metadata plus version/appVersion/home from Chart.yaml
+- categories: category -> chart ids
+- index.tags / index.keywords: inverted indexes, term -> sorted chart ids
+
+"Charts with tag X and keyword Y" is one file read and a set intersection:
+
+    index = json.load(open('docs/charts-index.json'))
+    set(index['index']['tags']['Monitoring']) & set(index['index']['keywords']['s3'])
+
+Optionally an NDJSON stream (one chart record per line) is written as well.
+The JSON output is also registered with generate-docs.py.
+
+Usage:
+    # Generate docs/charts-index.json
+    python3 scripts/generate-catalog-index.py
+
+    # Also write an NDJSON stream
+    python3 scripts/generate-catalog-index.py --ndjson docs/charts-index.ndjson
+
+Exit codes:
+    0: Success
+    1: Errors occurred
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator
+
+from chartlib import ChartRepository
+from chartlib.catalog import CatalogModel, register_output
+from chartlib.output import write_lines
+
+INDEX_FORMAT_VERSION = 1
+
+# Metadata fields copied into each chart record
+CHART_FIELDS = ('name', 'description', 'category', 'path', 'tags', 'keywords', 'production_note')
+
+
+def chart_record(model: CatalogModel, chart_id: str) -> Dict:
+    """Flatten one chart's metadata entry and Chart.yaml info."""
+    chart_meta = model.charts[chart_id]
+    record = {'id': chart_id}
+    for field in CHART_FIELDS:
+        if field in chart_meta:
+            record[field] = chart_meta[field]
+    record.setdefault('path', f'charts/{chart_id}')
+    record.setdefault('category', 'uncategorized')
+    for key, value in model.chart_info(chart_id).items():
+        if value not in ('', 'N/A'):
+            record[key] = str(value)
+    return record
+
+
+def build_index(model: CatalogModel) -> Dict:
+    """Build the JSON index document."""
+    return {
+        'version': INDEX_FORMAT_VERSION,
+        'source': 'charts/charts-metadata.yaml',
+        'total': len(model.charts),
+        'charts': {chart_id: chart_record(model, chart_id) for chart_id in sorted(model.charts)},
+        'categories': {
+            category: sorted(chart_id for chart_id, _ in entries)
+            for category, entries in sorted(model.categories.items())
+        },
+        'index': {
+            'tags': {tag: sorted(set(ids)) for tag, ids in sorted(model.tags_index.items())},
+            'keywords': {kw: sorted(ids) for kw, ids in sorted(model.keywords_index.items())},
+        },
+    }
+
+
+def render_index(model: CatalogModel) -> Iterator[str]:
+    """Compact JSON index as a single chunk (with trailing newline)."""
+    yield json.dumps(build_index(model), separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+    yield ''
+
+
+def render_ndjson(model: CatalogModel) -> Iterator[str]:
+    """One JSON chart record per line."""
+    for chart_id in sorted(model.charts):
+        yield json.dumps(chart_record(model, chart_id), separators=(',', ':'),
+                         sort_keys=True, ensure_ascii=False)
+    yield ''
+
+
+register_output('catalog-index', 'docs/charts-index.json', render_index)
+
+
+def main(argv=None, repo=None):
+    """Main generation logic."""
+    parser = argparse.ArgumentParser(
+        description='Generate JSON catalog index from charts-metadata.yaml'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='docs/charts-index.json',
+        help='Output file path (default: docs/charts-index.json)'
+    )
+    parser.add_argument(
+        '--ndjson',
+        type=str,
+        metavar='PATH',
+        help='Also write one chart record per line to PATH'
+    )
+    args = parser.parse_args(argv)
+
+    if repo is None:
+        repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Chart Catalog Index Generation")
+    print("=" * 80)
+    print()
+
+    if not repo.metadata_file.exists():
+        print(f"Error: {repo.metadata_file} not found")
+        sys.exit(1)
+
+    try:
+        model = CatalogModel.load(repo)
+    except Exception as e:
+        print(f"Error loading {repo.metadata_file}: {e}")
+        sys.exit(1)
+
+    outputs = [(repo.repo_root / args.output, render_index)]
+    if args.ndjson:
+        outputs.append((repo.repo_root / args.ndjson, render_ndjson))
+
+    for output_file, render in outputs:
+        changed = write_lines(output_file, render(model))
+        status = "✅ Generated" if changed else "ℹ️  Unchanged"
+        print(f"{status}: {output_file}")
+    repo.save_cache()
+
+    print(f"   Charts: {len(model.charts)}")
+    print(f"   Tags: {len(model.tags_index)}, Keywords: {len(model.keywords_index)}")
+    print()
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
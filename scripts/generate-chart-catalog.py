@@ -12,6 +12,14 @@ Usage:
     # Specify output file
     python3 scripts/generate-chart-catalog.py --output docs/CHARTS.md
 
+    # Per-phase timings (cached vs. rendered sections show in the table)
+    python3 scripts/generate-chart-catalog.py --timings
+
+Chart sections are cached by a hash of their inputs (metadata entry plus
+Chart.yaml version info), so only changed charts are re-rendered. The
+output is streamed to a temporary file and renamed into place, and left
+untouched when the content did not change.
+
 Exit codes:
     0: Success
     1: Errors occurred
@@ -19,59 +27,93 @@ Exit codes:
 
 import sys
 import argparse
-import yaml
+import hashlib
 from pathlib import Path
-from typing import Dict, List, Set
-from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
 
+from chartlib import ChartRepository, load_yaml_file
+from chartlib.catalog import CatalogModel, register_output
+from chartlib.markdown import slugify
+from chartlib.output import SectionCache, content_hash, write_lines
+from chartlib.timing import add_timing_arguments, instrument, span
 
-def load_yaml_file(file_path: Path) -> Dict:
-    """Load and parse YAML file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}")
-        sys.exit(1)
+# Rendered sections are invalidated whenever this script changes
+RENDERER_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
 
 
-def load_chart_info(chart_dir: Path) -> Dict:
-    """Load chart version info from Chart.yaml."""
-    chart_yaml = chart_dir / "Chart.yaml"
-    if not chart_yaml.exists():
-        return {}
+def render_chart_section(chart_id: str, chart_meta: Dict, chart_info: Dict) -> List[str]:
+    """Render the catalog section of a single chart."""
+    md = []
+    chart_name = chart_meta.get('name', chart_id)
+    description = chart_meta.get('description', 'No description')
+    path = chart_meta.get('path', f'charts/{chart_id}')
+    tags = chart_meta.get('tags', [])
+    production_note = chart_meta.get('production_note', '')
+
+    version = chart_info.get('version', 'N/A')
+    app_version = chart_info.get('appVersion', 'N/A')
+    home = chart_info.get('home', '')
+
+    # Chart header with badges
+    md.append(f"#### {chart_name}")
+    md.append("")
 
-    try:
-        data = load_yaml_file(chart_yaml)
-        return {
-            'version': data.get('version', 'N/A'),
-            'appVersion': data.get('appVersion', 'N/A'),
-            'home': data.get('home', ''),
-        }
-    except:
-        return {}
+    # Badges
+    badge_line = []
+    badge_line.append(f"![Chart Version](https://img.shields.io/badge/chart-{version}-blue.svg)")
+    badge_line.append(f"![App Version](https://img.shields.io/badge/app-{app_version}-green.svg)")
+    if tags:
+        for tag in tags[:3]:  # Show first 3 tags
+            tag_badge = tag.replace(' ', '%20')
+            md.append(f"![{tag}](https://img.shields.io/badge/tag-{tag_badge}-orange.svg)")
+    md.append(" ".join(badge_line))
+    md.append("")
 
+    # Description
+    md.append(f"**Description**: {description}")
+    md.append("")
 
-def generate_catalog(metadata: Dict, charts_dir: Path) -> str:
-    """Generate markdown catalog from metadata."""
-    charts = metadata.get('charts', {})
+    # Details
+    if home:
+        md.append(f"**Homepage**: [{home}]({home})")
+        md.append("")
+
+    md.append(f"**Chart Path**: `{path}`")
+    md.append("")
+
+    if tags:
+        md.append(f"**Tags**: {', '.join(tags)}")
+        md.append("")
+
+    # Production note for infrastructure charts
+    if production_note:
+        md.append(f"> ⚠️ **Production Note**: {production_note}")
+        md.append("")
 
-    # Organize by category
-    categories = defaultdict(list)
-    tags_index = defaultdict(list)
-    keywords_index = defaultdict(set)
+    # Installation example
+    md.append("**Installation**:")
+    md.append("```bash")
+    md.append(f"helm install my-{chart_id} oci://ghcr.io/scriptonbasestar-containers/charts/{chart_id}")
+    md.append("# or")
+    md.append(f"helm install my-{chart_id} sb-charts/{chart_id}")
+    md.append("```")
+    md.append("")
+
+    md.append("---")
+    md.append("")
+    return md
 
-    for chart_id, chart_meta in charts.items():
-        category = chart_meta.get('category', 'uncategorized')
-        categories[category].append((chart_id, chart_meta))
 
-        # Build tags index
-        for tag in chart_meta.get('tags', []):
-            tags_index[tag].append(chart_id)
+def render_catalog(model: CatalogModel, sections: Optional[SectionCache] = None) -> Iterator[str]:
+    """Yield the catalog as markdown chunks, to be joined with newlines.
 
-        # Build keywords index
-        for keyword in chart_meta.get('keywords', []):
-            keywords_index[keyword].add(chart_id)
+    Chart sections come from `sections` when their inputs are unchanged.
+    """
+    charts = model.charts
+    categories = model.categories
+    tags_index = model.tags_index
+    keywords_index = model.keywords_index
+    chart_infos = model.chart_infos()
 
     # Start building markdown
     md = []
@@ -92,7 +134,7 @@ def generate_catalog(metadata: Dict, charts_dir: Path) -> str:
     md.append("- [Charts by Category](#charts-by-category)")
     for category in sorted(categories.keys()):
         category_title = category.replace('-', ' ').title()
-        md.append(f"  - [{category_title}](#{category.lower()})")
+        md.append(f"  - [{category_title}](#{slugify(category_title)})")
     md.append("- [Charts by Tag](#charts-by-tag)")
     md.append("- [Keyword Index](#keyword-index)")
     md.append("")
@@ -100,78 +142,32 @@ def generate_catalog(metadata: Dict, charts_dir: Path) -> str:
     # Charts by Category
     md.append("## Charts by Category")
     md.append("")
+    yield from md
 
     for category in sorted(categories.keys()):
         category_title = category.replace('-', ' ').title()
-        md.append(f"### {category_title}")
-        md.append("")
+        yield f"### {category_title}"
+        yield ""
 
         # Sort charts by name
         sorted_charts = sorted(categories[category], key=lambda x: x[1].get('name', x[0]))
 
         for chart_id, chart_meta in sorted_charts:
-            chart_name = chart_meta.get('name', chart_id)
-            description = chart_meta.get('description', 'No description')
-            path = chart_meta.get('path', f'charts/{chart_id}')
-            tags = chart_meta.get('tags', [])
-            production_note = chart_meta.get('production_note', '')
-
-            # Load chart version info
-            chart_dir = charts_dir / chart_id
-            chart_info = load_chart_info(chart_dir)
-            version = chart_info.get('version', 'N/A')
-            app_version = chart_info.get('appVersion', 'N/A')
-            home = chart_info.get('home', '')
-
-            # Chart header with badges
-            md.append(f"#### {chart_name}")
-            md.append("")
-
-            # Badges
-            badge_line = []
-            badge_line.append(f"![Chart Version](https://img.shields.io/badge/chart-{version}-blue.svg)")
-            badge_line.append(f"![App Version](https://img.shields.io/badge/app-{app_version}-green.svg)")
-            if tags:
-                for tag in tags[:3]:  # Show first 3 tags
-                    tag_badge = tag.replace(' ', '%20')
-                    md.append(f"![{tag}](https://img.shields.io/badge/tag-{tag_badge}-orange.svg)")
-            md.append(" ".join(badge_line))
-            md.append("")
-
-            # Description
-            md.append(f"**Description**: {description}")
-            md.append("")
-
-            # Details
-            if home:
-                md.append(f"**Homepage**: [{home}]({home})")
-                md.append("")
-
-            md.append(f"**Chart Path**: `{path}`")
-            md.append("")
-
-            if tags:
-                md.append(f"**Tags**: {', '.join(tags)}")
-                md.append("")
-
-            # Production note for infrastructure charts
-            if production_note:
-                md.append(f"> ⚠️ **Production Note**: {production_note}")
-                md.append("")
-
-            # Installation example
-            md.append("**Installation**:")
-            md.append("```bash")
-            md.append(f"helm install my-{chart_id} oci://ghcr.io/scriptonbasestar-containers/charts/{chart_id}")
-            md.append("# or")
-            md.append(f"helm install my-{chart_id} sb-charts/{chart_id}")
-            md.append("```")
-            md.append("")
-
-            md.append("---")
-            md.append("")
+            chart_info = chart_infos[chart_id]
+            # Yield outside the span so the writer's time is not counted here
+            with span('render section', chart=chart_id):
+                if sections is None:
+                    section = '\n'.join(render_chart_section(chart_id, chart_meta, chart_info))
+                else:
+                    section = sections.get(
+                        chart_id,
+                        content_hash(chart_id, chart_meta, chart_info),
+                        lambda: '\n'.join(render_chart_section(chart_id, chart_meta, chart_info))
+                    )
+            yield section
 
     # Charts by Tag
+    md = []
     md.append("## Charts by Tag")
     md.append("")
 
@@ -180,7 +176,8 @@ def generate_catalog(metadata: Dict, charts_dir: Path) -> str:
         chart_names = []
         for cid in chart_ids:
             cname = charts.get(cid, {}).get('name', cid)
-            chart_names.append(f"[{cname}](#{cid})")
+            # Chart sections are headed by display name (render_chart_section)
+            chart_names.append(f"[{cname}](#{slugify(cname)})")
 
         md.append(f"### {tag}")
         md.append("")
@@ -210,11 +207,32 @@ def generate_catalog(metadata: Dict, charts_dir: Path) -> str:
     md.append("")
     md.append("**Maintained by**: [ScriptonBasestar](https://github.com/scriptonbasestar-container)")
     md.append("")
+    yield from md
+
+
+def render_catalog_output(model: CatalogModel) -> Iterator[str]:
+    """Render the catalog with the persistent section cache."""
+    sections = SectionCache(model.repo_root, 'catalog-sections', RENDERER_VERSION)
+    yield from render_catalog(model, sections)
+    sections.save()
+    print(f"   Catalog sections: {sections.rendered} rendered, {sections.reused} reused")
 
-    return '\n'.join(md)
 
+register_output('catalog', 'docs/CHARTS.md', render_catalog_output)
 
-def main():
+
+def generate_catalog(
+    metadata: Dict,
+    charts_dir: Path,
+    repository: Optional[ChartRepository] = None
+) -> str:
+    """Generate markdown catalog from metadata."""
+    if repository is None:
+        repository = ChartRepository(charts_dir.parent)
+    return '\n'.join(render_catalog(CatalogModel(metadata, repository)))
+
+
+def main(argv=None, repo=None):
     """Main generation logic."""
     parser = argparse.ArgumentParser(
         description='Generate chart catalog from charts-metadata.yaml'
@@ -225,13 +243,15 @@ def main():
         default='docs/CHARTS.md',
         help='Output file path (default: docs/CHARTS.md)'
     )
-    args = parser.parse_args()
+    add_timing_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument(args)
 
     # Setup paths
-    repo_root = Path(__file__).parent.parent
-    charts_dir = repo_root / "charts"
-    metadata_file = repo_root / "charts" / "charts-metadata.yaml"
-    output_file = repo_root / args.output
+    if repo is None:
+        repo = ChartRepository(Path(__file__).parent.parent)
+    metadata_file = repo.metadata_file
+    output_file = repo.repo_root / args.output
 
     print("=" * 80)
     print("Chart Catalog Generation")
@@ -243,23 +263,24 @@ def main():
         print(f"Error: {metadata_file} not found")
         sys.exit(1)
 
-    metadata = load_yaml_file(metadata_file)
+    with span('load metadata'):
+        metadata = load_yaml_file(metadata_file, repo)
     charts_count = len(metadata.get('charts', {}))
 
     print(f"Loaded metadata for {charts_count} charts")
     print(f"Output: {output_file}")
     print()
 
-    # Generate catalog
+    # Generate catalog, streaming straight into the output file
     print("Generating catalog...")
-    catalog_md = generate_catalog(metadata, charts_dir)
-
-    # Write output
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(catalog_md)
-
-    print(f"✅ Catalog generated successfully!")
+    model = CatalogModel(metadata, repo)
+    changed = write_lines(output_file, render_catalog_output(model))
+    repo.save_cache()
+
+    if changed:
+        print(f"✅ Catalog generated successfully!")
+    else:
+        print(f"✅ Catalog already up to date (file not rewritten)")
     print(f"   Output: {output_file}")
     print(f"   Charts: {charts_count}")
     print()
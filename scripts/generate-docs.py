@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Generate All Metadata-Driven Docs in One Pass
+
+This script parses charts-metadata.yaml once, builds the category grouping
+and the tag/keyword indexes once, and renders every registered output from
+that shared model:
+- catalog: docs/CHARTS.md (generate-chart-catalog.py)
+- artifacthub-dashboard: docs/ARTIFACTHUB_DASHBOARD.md (generate-artifacthub-dashboard.py)
+- catalog-index: docs/charts-index.json (generate-catalog-index.py)
+
+Other generators add outputs by calling chartlib.catalog.register_output()
+at import time and listing their script in GENERATOR_SCRIPTS. Files whose
+content did not change are not rewritten.
+
+Usage:
+    # Generate every output
+    python3 scripts/generate-docs.py
+
+    # Only some outputs
+    python3 scripts/generate-docs.py --only catalog
+
+    # List registered outputs
+    python3 scripts/generate-docs.py --list
+
+Exit codes:
+    0: Success
+    1: Errors occurred
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from chartlib import ChartRepository
+from chartlib.catalog import CatalogModel, registered_outputs, write_outputs
+from chartlib.scripts import load_script
+
+# Scripts that register outputs when imported
+GENERATOR_SCRIPTS = [
+    'generate-chart-catalog',
+    'generate-artifacthub-dashboard',
+    'generate-catalog-index',
+]
+
+
+def load_generators() -> None:
+    """Import every generator script so it registers its outputs."""
+    for name in GENERATOR_SCRIPTS:
+        load_script(name)
+
+
+def main(argv=None, repo=None):
+    """Main generation logic."""
+    parser = argparse.ArgumentParser(
+        description='Generate all docs derived from charts-metadata.yaml in one pass'
+    )
+    parser.add_argument(
+        '--only',
+        action='append',
+        metavar='NAME',
+        help='Generate only this output (repeatable)'
+    )
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List registered outputs and exit'
+    )
+    args = parser.parse_args(argv)
+
+    load_generators()
+    outputs = registered_outputs()
+
+    if args.list:
+        for name, output in outputs.items():
+            print(f"{name:<24} {output.path}")
+        return
+
+    selected = args.only or list(outputs)
+    unknown = [name for name in selected if name not in outputs]
+    if unknown:
+        print(f"Error: Unknown output(s): {', '.join(unknown)}")
+        print(f"Available: {', '.join(outputs)}")
+        sys.exit(1)
+
+    if repo is None:
+        repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Docs Generation")
+    print("=" * 80)
+    print()
+
+    if not repo.metadata_file.exists():
+        print(f"Error: {repo.metadata_file} not found")
+        sys.exit(1)
+
+    try:
+        model = CatalogModel.load(repo)
+    except Exception as e:
+        print(f"Error loading {repo.metadata_file}: {e}")
+        sys.exit(1)
+
+    if not model.charts:
+        print("❌ No charts found in metadata")
+        sys.exit(1)
+
+    print(f"Loaded metadata for {len(model.charts)} charts "
+          f"({len(model.categories)} categories, {len(model.tags_index)} tags, "
+          f"{len(model.keywords_index)} keywords)")
+    print()
+
+    results = write_outputs(model, selected)
+    repo.save_cache()
+
+    for name, changed in results.items():
+        status = "✅ updated  " if changed else "ℹ️  unchanged"
+        print(f"  {status} {name}: {outputs[name].path}")
+
+    print()
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
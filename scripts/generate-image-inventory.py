@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Image Inventory, Pre-pull DaemonSets and Mirror List
+
+This script finds every container image the charts run, per scenario,
+without helm: each values-*.yaml file (each document of a multi-document
+values-example.yaml) is merged over the chart's values.yaml and scanned
+for image mappings (registry/repository/tag/digest) and plain image
+strings, and literal images in templates are added to every scenario of
+their chart (see chartlib/images.py). References are normalized
+(docker.io/library/..., empty tags resolved to the chart appVersion) and
+deduplicated.
+
+Scenarios are grouped by name across charts ("default" is values.yaml alone),
+and for each group the script writes:
+
+- prepull-<scenario>.yaml: a DaemonSet whose init containers pull each image
+  on every node (running a copied busybox `true`, so images without a shell
+  work), to warm nodes before a rollout
+- a section of mirror-list.txt: one image per line, or "SOURCE MIRROR" pairs
+  with --mirror-registry, for copying images into a local registry
+
+images.json holds the full inventory: which charts, scenarios and values
+paths reference each image.
+
+Usage:
+    # Inventory, DaemonSets and mirror list in build/images/
+    python3 scripts/generate-image-inventory.py
+
+    # Pull from the local mirror, production scenarios only
+    python3 scripts/generate-image-inventory.py --scenario 'prod*' --mirror-registry harbor.local/mirror
+
+    # Show what would be written
+    python3 scripts/generate-image-inventory.py --dry-run
+
+Exit codes:
+    0: Inventory generated
+    1: A values file could not be read
+"""
+
+import re
+import sys
+import json
+import fnmatch
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.images import ImageRef, find_images, merge_values, parse_image, template_images
+from chartlib.output import AtomicWriter
+from chartlib.render import Scenario, chart_scenarios, scenario_values
+from chartlib.repository import ChartRepository, find_chart_dirs
+from chartlib.yamledit import render_scalar
+
+DEFAULT_OUTPUT_DIR = 'build/images'
+DEFAULT_HELPER_IMAGE = 'busybox:1.36-musl'
+DEFAULT_PAUSE_IMAGE = 'registry.k8s.io/pause:3.10'
+DAEMONSET_PREFIX = 'image-prepull'
+MAX_NAME_LENGTH = 63
+
+
+class ImageUse:
+    """Where one image is referenced."""
+
+    def __init__(self, ref: ImageRef):
+        self.ref = ref
+        self.charts: Set[str] = set()
+        self.scenarios: Set[str] = set()
+        self.sources: Set[str] = set()
+
+
+def scenario_images(repo: ChartRepository, scenario: Scenario, base: Dict,
+                    app_version: str) -> List[Tuple[str, ImageRef]]:
+    if scenario.values_file is None:
+        return [(f"values.yaml:{path}", ref) for path, ref in find_images(base, app_version)]
+    # Every example of a multi-document values-example.yaml counts towards its scenario
+    found = []
+    for document in scenario_values(repo, scenario):
+        values = merge_values(base, document.values or {})
+        found.extend((f"{document.source}:{path}", ref) for path, ref in find_images(values, app_version))
+    return found
+
+
+def container_name(index: int, ref: ImageRef) -> str:
+    short = re.sub(r'[^a-z0-9]+', '-', ref.repository.rsplit('/', 1)[-1].lower()).strip('-')
+    return f"pull-{index}-{short}"[:MAX_NAME_LENGTH].rstrip('-')
+
+
+def render_daemonset(scenario: str, images: List[ImageRef], namespace: str, helper: str,
+                     pause: str, mirror: Optional[str]) -> str:
+    name = f"{DAEMONSET_PREFIX}-{scenario}"[:MAX_NAME_LENGTH].rstrip('-')
+
+    def image(ref: ImageRef) -> str:
+        return ref.mirrored(mirror) if mirror else ref.canonical
+
+    helper_ref = image(parse_image(helper))
+    lines = [
+        "# Generated by scripts/generate-image-inventory.py from charts/*/values*.yaml. Do not edit manually.",
+        f"# Pre-pulls the {len(images)} image(s) of the '{scenario}' scenario on every node.",
+        "apiVersion: apps/v1",
+        "kind: DaemonSet",
+        "metadata:",
+        f"  name: {name}",
+        f"  namespace: {render_scalar(namespace)}",
+        "  labels:",
+        f"    app.kubernetes.io/name: {DAEMONSET_PREFIX}",
+        f"    app.kubernetes.io/instance: {render_scalar(scenario)}",
+        "spec:",
+        "  selector:",
+        "    matchLabels:",
+        f"      app.kubernetes.io/name: {DAEMONSET_PREFIX}",
+        f"      app.kubernetes.io/instance: {render_scalar(scenario)}",
+        "  updateStrategy:",
+        "    type: RollingUpdate",
+        "    rollingUpdate:",
+        "      maxUnavailable: \"100%\"",
+        "  template:",
+        "    metadata:",
+        "      labels:",
+        f"        app.kubernetes.io/name: {DAEMONSET_PREFIX}",
+        f"        app.kubernetes.io/instance: {render_scalar(scenario)}",
+        "    spec:",
+        "      automountServiceAccountToken: false",
+        "      terminationGracePeriodSeconds: 0",
+        "      tolerations:",
+        "        - operator: Exists",
+        "      volumes:",
+        "        - name: prepull",
+        "          emptyDir: {}",
+        "      initContainers:",
+        "        - name: install",
+        f"          image: {helper_ref}",
+        "          command: [\"cp\", \"/bin/busybox\", \"/prepull/busybox\"]",
+        "          volumeMounts:",
+        "            - name: prepull",
+        "              mountPath: /prepull",
+    ]
+    for index, ref in enumerate(images, 1):
+        lines.extend([
+            f"        - name: {container_name(index, ref)}",
+            f"          image: {image(ref)}",
+            "          imagePullPolicy: IfNotPresent",
+            "          command: [\"/prepull/busybox\", \"true\"]",
+            "          resources:",
+            "            requests:",
+            "              cpu: 1m",
+            "              memory: 8Mi",
+            "            limits:",
+            "              memory: 32Mi",
+            "          volumeMounts:",
+            "            - name: prepull",
+            "              mountPath: /prepull",
+        ])
+    lines.extend([
+        "      containers:",
+        "        - name: pause",
+        f"          image: {image(parse_image(pause))}",
+        "          resources:",
+        "            requests:",
+        "              cpu: 1m",
+        "              memory: 8Mi",
+        "            limits:",
+        "              memory: 16Mi",
+        '',
+    ])
+    return '\n'.join(lines)
+
+
+def render_mirror_list(groups: Dict[str, List[ImageRef]], helpers: List[ImageRef],
+                       mirror: Optional[str]) -> str:
+    def line(ref: ImageRef) -> str:
+        return f"{ref.canonical} {ref.mirrored(mirror)}" if mirror else ref.canonical
+
+    lines = ["# Generated by scripts/generate-image-inventory.py. Do not edit manually."]
+    if mirror:
+        lines.append(f"# SOURCE MIRROR pairs for {mirror}")
+    lines.extend(['', f"# pre-pull helpers ({len(helpers)} images)"])
+    lines.extend(line(ref) for ref in helpers)
+    for scenario, images in groups.items():
+        lines.extend(['', f"# scenario: {scenario} ({len(images)} images)"])
+        lines.extend(line(ref) for ref in images)
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def main():
+    """Main inventory logic."""
+    parser = argparse.ArgumentParser(
+        description='Inventory chart images and generate pre-pull DaemonSets and a mirror list'
+    )
+    parser.add_argument(
+        '--chart',
+        type=str,
+        help='Inventory specific chart only'
+    )
+    parser.add_argument(
+        '--scenario',
+        type=str,
+        help="Only scenarios matching this glob, e.g. 'prod*' or home-single"
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default=DEFAULT_OUTPUT_DIR,
+        help=f'Directory for images.json, mirror-list.txt and DaemonSets (default: {DEFAULT_OUTPUT_DIR})'
+    )
+    parser.add_argument(
+        '--mirror-registry',
+        type=str,
+        help='Local registry prefix; DaemonSets pull from it and the mirror list maps sources to it'
+    )
+    parser.add_argument(
+        '--namespace',
+        type=str,
+        default='kube-system',
+        help='Namespace of the pre-pull DaemonSets (default: kube-system)'
+    )
+    parser.add_argument(
+        '--helper-image',
+        type=str,
+        default=DEFAULT_HELPER_IMAGE,
+        help=f'Static busybox image providing `true` (default: {DEFAULT_HELPER_IMAGE})'
+    )
+    parser.add_argument(
+        '--pause-image',
+        type=str,
+        default=DEFAULT_PAUSE_IMAGE,
+        help=f'Image of the idle main container (default: {DEFAULT_PAUSE_IMAGE})'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Print the inventory without writing files'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Chart Image Inventory" + (" (DRY RUN)" if args.dry_run else ""))
+    print("=" * 80)
+    print()
+
+    chart_dirs = find_chart_dirs(repo.charts_dir)
+    if args.chart:
+        chart_dirs = [d for d in chart_dirs if d.name == args.chart]
+        if not chart_dirs:
+            print(f"Error: Chart '{args.chart}' not found in {repo.charts_dir}")
+            sys.exit(1)
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(
+                repo.repo_root, {d.name for d in chart_dirs}, args.changed_since, args.staged
+            )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+
+    uses: Dict[str, ImageUse] = {}
+    groups: Dict[str, Set[str]] = defaultdict(set)
+    group_charts: Dict[str, Set[str]] = defaultdict(set)
+    errors: List[str] = []
+    scenario_count = 0
+
+    for chart_dir in chart_dirs:
+        chart = chart_dir.name
+        try:
+            base = repo.load_yaml(chart_dir / 'values.yaml') or {}
+            app_version = str(repo.chart_yaml(chart).get('appVersion') or '')
+        except Exception as e:
+            errors.append(f"{chart}: {str(e).splitlines()[0]}")
+            continue
+        literal = template_images(chart_dir)
+
+        for scenario in chart_scenarios(chart_dir):
+            if args.scenario and not fnmatch.fnmatch(scenario.name, args.scenario):
+                continue
+            try:
+                found = scenario_images(repo, scenario, base, app_version)
+            except Exception as e:
+                errors.append(f"{scenario.label}: {str(e).splitlines()[0]}")
+                continue
+            scenario_count += 1
+            group_charts[scenario.name].add(chart)
+            for source, ref in found + literal:
+                use = uses.setdefault(ref.canonical, ImageUse(ref))
+                use.charts.add(chart)
+                use.scenarios.add(scenario.label)
+                use.sources.add(f"{chart}/{source}")
+                groups[scenario.name].add(ref.canonical)
+
+    ordered_groups = {
+        name: [uses[key].ref for key in sorted(keys)]
+        for name, keys in sorted(groups.items())
+    }
+    helpers = [parse_image(args.helper_image), parse_image(args.pause_image)]
+
+    print(f"{'Scenario':<28} {'Images':>7}  Charts")
+    print("-" * 80)
+    for name, images in ordered_groups.items():
+        print(f"{name:<28} {len(images):>7}  {len(group_charts[name])}")
+    print("-" * 80)
+    print(f"{'Unique images':<28} {len(uses):>7}")
+    print()
+
+    untagged = sorted(key for key, use in uses.items() if not use.ref.tag and not use.ref.digest)
+    latest = sorted(key for key, use in uses.items() if use.ref.tag == 'latest' and not use.ref.digest)
+    for key in untagged + latest:
+        print(f"⚠️  {key}: no pinned tag or digest - pre-pulled copy may not match what runs")
+
+    output_dir = repo.repo_root / args.output_dir
+    files: Dict[str, str] = {}
+    for name, images in ordered_groups.items():
+        files[f"prepull-{name}.yaml"] = render_daemonset(
+            name, images, args.namespace, args.helper_image, args.pause_image, args.mirror_registry
+        )
+    files['mirror-list.txt'] = render_mirror_list(ordered_groups, helpers, args.mirror_registry)
+    inventory = {
+        'images': {
+            key: {
+                'registry': use.ref.registry or 'docker.io',
+                'repository': use.ref.repository,
+                'tag': use.ref.tag,
+                'digest': use.ref.digest,
+                'charts': sorted(use.charts),
+                'scenarios': sorted(use.scenarios),
+                'sources': sorted(use.sources),
+            }
+            for key, use in sorted(uses.items())
+        },
+        'scenarios': {name: sorted(keys) for name, keys in sorted(groups.items())},
+    }
+    files['images.json'] = json.dumps(inventory, indent=2) + '\n'
+
+    # A full run knows every scenario; DaemonSets for any other are stale
+    stale: List[str] = []
+    if output_dir.is_dir() and not (args.chart or args.scenario or diff_requested(args)):
+        stale = sorted(p.name for p in output_dir.glob('prepull-*.yaml') if p.name not in files)
+
+    updated = 0
+    if not args.dry_run:
+        for filename, text in files.items():
+            with AtomicWriter(output_dir / filename) as writer:
+                writer.write(text)
+            updated += writer.changed
+        for filename in stale:
+            (output_dir / filename).unlink(missing_ok=True)
+
+    print()
+    print("=" * 80)
+    summary = f"{len(uses)} unique image(s) across {scenario_count} scenario(s) in {len(chart_dirs)} chart(s)"
+    if args.dry_run:
+        print(f"{summary}; would write {len(files)} file(s) to {args.output_dir}")
+    else:
+        print(f"{summary}; {updated} of {len(files)} file(s) updated in {args.output_dir}"
+              + (f", {len(stale)} stale DaemonSet(s) removed" if stale else ""))
+    if errors:
+        print(f"❌ {len(errors)} values file(s) could not be read:")
+        for error in errors:
+            print(f"  - {error}")
+    else:
+        print("✅ Image inventory complete")
+    print("=" * 80)
+
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Generate Recording Rules from Repeated PromQL Sub-Expressions
+
+This script parses every expression in alerting-rules/*.yaml and
+dashboards/*.json, normalizes sub-expressions (sorted matchers and grouping
+labels, so `sum(x) by (a)` and `sum by (a) (x)` are the same), and finds the
+ones that at least --min-occurrences expressions compute. Each becomes a
+recording rule named level:metric:operations, e.g.
+
+    le:apiserver_request_duration_seconds_bucket:sum_rate5m
+
+Larger sub-expressions win over the smaller ones they contain; a smaller
+one is only recorded if it is still repeated outside the larger ones.
+Recording rules that contain other recorded expressions reference them and
+are ordered after them. Sub-expressions using Grafana variables ($namespace)
+or topk/bottomk are never recorded.
+
+Outputs (under --output-dir):
+- recording-rules.yaml: PrometheusRule manifest with the recording rules
+- alerting-rules/*.yaml, dashboards/*.json: copies of the files that use
+  them, with the sub-expressions replaced by the recorded series. Only the
+  expressions change; comments and formatting elsewhere are kept.
+
+Review the output and copy it over the originals; deploy
+recording-rules.yaml to the same Prometheus as the alerts.
+
+Usage:
+    # Write build/recording-rules/
+    python3 scripts/generate-recording-rules.py
+
+    # Only show what would be recorded
+    python3 scripts/generate-recording-rules.py --dry-run
+
+    # Require three users per recording rule
+    python3 scripts/generate-recording-rules.py --min-occurrences 3
+
+Exit codes:
+    0: Success
+    1: Errors occurred
+"""
+
+import re
+import sys
+import json
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from chartlib.monitoring import ExprSource, collect_expressions, load_rule_documents
+from chartlib.output import AtomicWriter
+from chartlib.promql import (
+    COMPARISON_OPS, RANGE_FUNCTIONS, SET_OPS, Aggregate, Binary, Call, MatrixSelector,
+    Node, NumberLiteral, PromQLError, StringLiteral, Subquery, Unary, VectorSelector,
+    format_duration, format_expr, is_scalar, parse, parse_with_spans, walk,
+)
+from chartlib.yamledit import YamlEditError, YamlEditor, render_scalar
+
+DEFAULT_OUTPUT_DIR = 'build/recording-rules'
+DEFAULT_GROUP_NAME = 'sb-helm-charts-recording.rules'
+
+# Aggregations whose output series set changes between evaluations
+UNSTABLE_AGGREGATIONS = {'topk', 'bottomk', 'limitk', 'limit_ratio'}
+OP_WORDS = {'/': 'per', '*': 'times', '+': 'plus', '-': 'minus', '%': 'mod', '^': 'pow', 'atan2': 'atan2'}
+
+
+class Candidate(NamedTuple):
+    """A recordable sub-expression occurrence within one source."""
+    key: str
+    start: int
+    end: int
+
+
+class ParsedSource(NamedTuple):
+    source: ExprSource
+    node: Node
+    candidates: List[Candidate]
+
+
+class RecordingRule(NamedTuple):
+    name: str
+    key: str
+    node: Node
+    users: List[ExprSource]
+
+
+def recordable(node: Node) -> bool:
+    """Whether a sub-expression is worth and safe to record."""
+    if not isinstance(node, (Call, Aggregate, Binary)) or is_scalar(node):
+        return False
+    if isinstance(node, Binary) and (node.op in COMPARISON_OPS or node.op in SET_OPS):
+        return False
+    costly = False
+    for sub in walk(node):
+        if isinstance(sub, VectorSelector) and any('$' in m.value for m in sub.matchers):
+            return False
+        if isinstance(sub, Aggregate):
+            if sub.op in UNSTABLE_AGGREGATIONS:
+                return False
+            costly = True
+        if isinstance(sub, Call) and sub.func in RANGE_FUNCTIONS:
+            costly = True
+    return costly
+
+
+def _sanitize(text: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9]+', '_', text).strip('_')
+
+
+def describe(node: Node) -> Tuple[Optional[Tuple[str, ...]], str, List[str]]:
+    """(level labels or None if unaggregated, metric, operations outermost first)."""
+    if isinstance(node, VectorSelector):
+        metric = node.name or 'series'
+        for m in sorted(node.matchers):
+            if m.name == '__name__':
+                continue
+            prefix = 'not_' if m.op in ('!=', '!~') else ''
+            metric += f"_{prefix}{_sanitize(m.name)}_{_sanitize(m.value) or 'any'}"
+        return None, metric, []
+    if isinstance(node, MatrixSelector):
+        return describe(node.vector)
+    if isinstance(node, Subquery):
+        return describe(node.expr)
+    if isinstance(node, Aggregate):
+        _, metric, ops = describe(node.expr)
+        level = tuple(sorted(node.grouping)) if not node.without else None
+        op = node.op + ('_without_' + '_'.join(sorted(node.grouping)) if node.without else '')
+        return level, metric, [op] + ops
+    if isinstance(node, Call):
+        vectors = [a for a in node.args if not is_scalar(a) and not isinstance(a, StringLiteral)]
+        if not vectors:
+            return None, node.func, []
+        level, metric, ops = describe(vectors[-1] if node.func == 'histogram_quantile' else vectors[0])
+        if node.func in RANGE_FUNCTIONS:
+            ranged = next((a for a in node.args if isinstance(a, (MatrixSelector, Subquery))), None)
+            window = format_duration(ranged.range) if ranged is not None else ''
+            return level, metric, [f"{node.func}{window}"] + ops
+        if node.func == 'histogram_quantile' and isinstance(node.args[0], NumberLiteral):
+            quantile = _sanitize(format_expr(NumberLiteral(node.args[0].value * 100)))
+            if level is not None:
+                level = tuple(label for label in level if label != 'le')
+            return level, metric.replace('_bucket', '', 1), [f"p{quantile}"] + ops
+        return level, metric, [node.func] + ops
+    if isinstance(node, Unary):
+        level, metric, ops = describe(node.expr)
+        return level, metric, ['neg'] + ops
+    if isinstance(node, Binary):
+        word = OP_WORDS.get(node.op, _sanitize(node.op))
+        if is_scalar(node.lhs) or is_scalar(node.rhs):
+            vector, scalar = (node.rhs, node.lhs) if is_scalar(node.lhs) else (node.lhs, node.rhs)
+            level, metric, ops = describe(vector)
+            number = _sanitize(format_expr(scalar))
+            op = f"{number}_{word}" if vector is node.rhs else f"{word}_{number}"
+            return level, metric, [op] + ops
+        l_level, l_metric, l_ops = describe(node.lhs)
+        _, r_metric, r_ops = describe(node.rhs)
+        if l_ops == r_ops:
+            return l_level, f"{l_metric}_{word}_{r_metric}", l_ops
+        lhs = '_'.join([l_metric] + l_ops)
+        rhs = '_'.join([r_metric] + r_ops)
+        return l_level, f"{lhs}_{word}_{rhs}", ['expr']
+    return None, _sanitize(format_expr(node)) or 'expr', []
+
+
+def rule_name(node: Node) -> str:
+    level, metric, ops = describe(node)
+    operations = '_'.join(ops) or 'value'
+    if level is None:
+        return f"{metric}:{operations}"
+    return f"{'_'.join(level) or 'all'}:{metric}:{operations}"
+
+
+def parse_sources(sources: List[ExprSource]) -> Tuple[List[ParsedSource], List[str]]:
+    parsed, errors = [], []
+    for source in sources:
+        try:
+            node, spans = parse_with_spans(source.expr)
+        except PromQLError as e:
+            errors.append(f"{source.label}: {e}")
+            continue
+        candidates = {}
+        for sub, start, end in spans:
+            if recordable(sub):
+                key = format_expr(sub)
+                # Keep the widest span (with parentheses) per position
+                candidates.setdefault((key, start), Candidate(key, start, end))
+        parsed.append(ParsedSource(source, node, list(candidates.values())))
+    return parsed, errors
+
+
+def select_rules(parsed: List[ParsedSource], min_occurrences: int, taken: Set[str]) -> List[RecordingRule]:
+    """Pick repeated sub-expressions, largest first."""
+    nodes: Dict[str, Node] = {}
+    for item in parsed:
+        for sub in walk(item.node):
+            if recordable(sub):
+                nodes.setdefault(format_expr(sub), sub)
+
+    selected_spans: Dict[int, List[Candidate]] = defaultdict(list)
+    selected: Dict[str, List[int]] = {}
+    for key in sorted(nodes, key=lambda k: (-len(k), k)):
+        users = []
+        for i, item in enumerate(parsed):
+            for cand in item.candidates:
+                if cand.key != key:
+                    continue
+                covered = any(s.start <= cand.start and cand.end <= s.end for s in selected_spans[i])
+                if not covered:
+                    users.append(i)
+                    break
+        if len(users) < min_occurrences:
+            continue
+        selected[key] = users
+        for i in users:
+            selected_spans[i].extend(c for c in parsed[i].candidates if c.key == key)
+
+    rules = []
+    names = set(taken)
+    # Smaller expressions first so rules can reference earlier ones
+    for key in sorted(selected, key=lambda k: (len(k), k)):
+        name = base = rule_name(nodes[key])
+        n = 2
+        while name in names:
+            name, n = f"{base}_{n}", n + 1
+        names.add(name)
+        rules.append(RecordingRule(name, key, nodes[key], [parsed[i].source for i in selected[key]]))
+    return rules
+
+
+def substitute(node: Node, names: Dict[str, str], skip: Optional[str] = None) -> Node:
+    """Replace recorded sub-expressions with selectors for their series."""
+    key = format_expr(node)
+    if key != skip and key in names:
+        return VectorSelector(names[key], ())
+    if isinstance(node, Subquery):
+        return node._replace(expr=substitute(node.expr, names))
+    if isinstance(node, Call):
+        return node._replace(args=tuple(substitute(a, names) for a in node.args))
+    if isinstance(node, Aggregate):
+        param = substitute(node.param, names) if node.param is not None else None
+        return node._replace(expr=substitute(node.expr, names), param=param)
+    if isinstance(node, Binary):
+        return node._replace(lhs=substitute(node.lhs, names), rhs=substitute(node.rhs, names))
+    if isinstance(node, Unary):
+        return node._replace(expr=substitute(node.expr, names))
+    return node
+
+
+def rewrite_expression(item: ParsedSource, names: Dict[str, str]) -> Optional[str]:
+    """The source expression with recorded sub-expressions replaced, or None."""
+    text = item.source.expr
+    chosen: List[Candidate] = []
+    for cand in sorted(item.candidates, key=lambda c: (c.start, -c.end)):
+        if cand.key in names and not any(c.start <= cand.start and cand.end <= c.end for c in chosen):
+            chosen.append(cand)
+    if not chosen:
+        return None
+    for cand in sorted(chosen, key=lambda c: c.start, reverse=True):
+        text = text[:cand.start] + names[cand.key] + text[cand.end:]
+
+    expected = format_expr(substitute(item.node, names))
+    try:
+        if format_expr(parse(text)) == expected:
+            return text
+    except PromQLError:
+        pass
+    # Fall back to the canonical form if the in-place edit changed meaning
+    return expected + ('\n' if item.source.expr.endswith('\n') else '')
+
+
+def render_rules_file(rules: List[RecordingRule], names: Dict[str, str], group: str,
+                      interval: Optional[str]) -> str:
+    lines = [
+        "# Recording Rules",
+        "# Generated by scripts/generate-recording-rules.py from sub-expressions",
+        "# shared by alerting-rules/ and dashboards/. Do not edit manually.",
+        "",
+        "apiVersion: monitoring.coreos.com/v1",
+        "kind: PrometheusRule",
+        "metadata:",
+        "  name: recording-rules",
+        "  labels:",
+        "    app.kubernetes.io/component: recording-rules",
+        "    prometheus: main",
+        "    role: alert-rules",
+        "spec:",
+        "  groups:",
+        f"    - name: {group}",
+    ]
+    if interval:
+        lines.append(f"      interval: {interval}")
+    lines.append("      rules:")
+    for rule in rules:
+        users = sorted({f"{u.file.name}: {u.name}" for u in rule.users})
+        lines.append(f"        # Used by {len(users)}: {'; '.join(users)}")
+        lines.append(f"        - record: {rule.name}")
+        lines.append(f"          expr: {render_scalar(format_expr(substitute(rule.node, names, skip=rule.key)))}")
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def rewrite_rule_file(path: Path, items: List[Tuple[ParsedSource, str]]) -> str:
+    if len(load_rule_documents(path)) != 1:
+        raise YamlEditError("multi-document rule files are not supported")
+    editor = YamlEditor.from_file(path)
+    for item, expr in items:
+        editor.set(list(item.source.pointer[1:]), expr)
+    return editor.text
+
+
+def rewrite_dashboard(path: Path, items: List[Tuple[ParsedSource, str]]) -> str:
+    text = path.read_text(encoding='utf-8')
+    for item, expr in items:
+        old = f'"expr": {json.dumps(item.source.expr, ensure_ascii=False)}'
+        if old not in text:
+            raise ValueError(f"cannot locate expression of {item.source.name!r}")
+        text = text.replace(old, f'"expr": {json.dumps(expr, ensure_ascii=False)}')
+    return text
+
+
+def main():
+    """Main generation logic."""
+    parser = argparse.ArgumentParser(
+        description='Generate recording rules from repeated PromQL in alerting rules and dashboards'
+    )
+    parser.add_argument(
+        '--min-occurrences',
+        type=int,
+        default=2,
+        help='Record sub-expressions used by at least this many expressions (default: 2)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default=DEFAULT_OUTPUT_DIR,
+        help=f'Directory for the rules file and rewritten copies (default: {DEFAULT_OUTPUT_DIR})'
+    )
+    parser.add_argument(
+        '--group-name',
+        type=str,
+        default=DEFAULT_GROUP_NAME,
+        help=f'Rule group name (default: {DEFAULT_GROUP_NAME})'
+    )
+    parser.add_argument(
+        '--interval',
+        type=str,
+        help='Evaluation interval for the rule group (default: Prometheus global interval)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show the recording rules and rewrites without writing files'
+    )
+    args = parser.parse_args()
+
+    if args.min_occurrences < 2:
+        parser.error('--min-occurrences must be at least 2')
+
+    repo_root = Path(__file__).parent.parent
+    output_dir = repo_root / args.output_dir
+
+    print("=" * 80)
+    print("Recording Rule Generation" + (" (DRY RUN)" if args.dry_run else ""))
+    print("=" * 80)
+    print()
+
+    sources = collect_expressions(repo_root)
+    # Existing recording rules are outputs, not users
+    taken = {s.name for s in sources if s.kind == 'record'}
+    parsed, errors = parse_sources([s for s in sources if s.kind != 'record'])
+    for error in errors:
+        print(f"❌ {error}")
+
+    rules = select_rules(parsed, args.min_occurrences, taken)
+    names = {rule.key: rule.name for rule in rules}
+    print(f"Parsed {len(parsed)} expressions; {len(rules)} sub-expression(s) used by "
+          f"{args.min_occurrences}+ expressions")
+    print()
+
+    for rule in rules:
+        print(f"  📼 {rule.name}  (used by {len(rule.users)})")
+        print(f"     {rule.key}")
+    if rules:
+        print()
+
+    rewrites: Dict[Path, List[Tuple[ParsedSource, str]]] = defaultdict(list)
+    for item in parsed:
+        new_expr = rewrite_expression(item, names)
+        if new_expr is not None:
+            rewrites[item.source.file].append((item, new_expr))
+
+    outputs: Dict[Path, str] = {}
+    if rules:
+        outputs[output_dir / 'recording-rules.yaml'] = render_rules_file(
+            rules, names, args.group_name, args.interval
+        )
+    for path, items in sorted(rewrites.items()):
+        try:
+            if path.suffix == '.json':
+                text = rewrite_dashboard(path, items)
+            else:
+                text = rewrite_rule_file(path, items)
+        except (YamlEditError, ValueError) as e:
+            errors.append(f"{path.name}: {e}")
+            print(f"❌ Cannot rewrite {path.name}: {e}")
+            continue
+        outputs[output_dir / path.relative_to(repo_root)] = text
+        print(f"  ✏️  {path.relative_to(repo_root)}: {len(items)} expression(s) rewritten")
+        if args.dry_run:
+            for item, expr in items:
+                print(f"     {item.source.name}: {' '.join(expr.split())}")
+
+    if not args.dry_run:
+        for path, text in outputs.items():
+            with AtomicWriter(path) as writer:
+                writer.write(text)
+        print()
+        print(f"✅ Wrote {len(outputs)} file(s) to {output_dir}")
+
+    print()
+    print("=" * 80)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
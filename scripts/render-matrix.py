@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Render Every Chart x Scenario with helm template
+
+This script runs `helm template` for each chart with its default values and
+with every values-*.yaml scenario file (about 190 renders), on a bounded
+pool of concurrent helm processes, and streams pass/fail with timings as
+renders finish. Results are cached by a hash of the chart contents and the
+scenario file (see chartlib/render.py), so a warm run only re-renders what
+changed.
+
+Usage:
+    # Full matrix, one helm process per CPU
+    python3 scripts/render-matrix.py
+
+    # One chart, production scenarios only, keep the manifests
+    python3 scripts/render-matrix.py --chart keycloak --scenario 'prod*' --output-dir build/rendered
+
+    # Charts changed on this branch
+    python3 scripts/render-matrix.py --changed-since origin/master
+
+Exit codes:
+    0: All scenarios rendered
+    1: A render failed or helm is not available
+"""
+
+import sys
+import time
+import fnmatch
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List
+
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.output import AtomicWriter
+from chartlib.parallel import resolve_jobs
+from chartlib.render import HelmError, RenderResult, Renderer, Scenario, chart_scenarios
+from chartlib.repository import ChartRepository, find_chart_dirs
+
+ERROR_LINES = 5
+
+
+def print_result(result: RenderResult, done: int, total: int) -> None:
+    width = len(str(total))
+    status = '✅' if result.ok else '❌'
+    timing = f"{result.seconds:6.2f}s" + (" (cached)" if result.cached else "")
+    print(f"[{done:>{width}}/{total}] {status} {result.scenario.label:<48} {timing}", flush=True)
+    if not result.ok:
+        lines = result.error.splitlines() or ['(no output)']
+        for line in lines[-ERROR_LINES:]:
+            print(f"        {line}")
+
+
+def main():
+    """Main render logic."""
+    parser = argparse.ArgumentParser(
+        description='Render every chart with every scenario values file using helm template'
+    )
+    parser.add_argument(
+        '--chart',
+        type=str,
+        help='Render specific chart only'
+    )
+    parser.add_argument(
+        '--scenario',
+        type=str,
+        help="Only scenarios matching this glob, e.g. 'prod*' or default"
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Concurrent helm processes (default: 0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--helm',
+        type=str,
+        default='helm',
+        help='helm binary (default: helm)'
+    )
+    parser.add_argument(
+        '--namespace',
+        type=str,
+        default='default',
+        help='Namespace passed to helm template (default: default)'
+    )
+    parser.add_argument(
+        '--helm-arg',
+        action='append',
+        default=[],
+        metavar='ARG',
+        help='Extra argument for helm template, e.g. --helm-arg=--kube-version=1.29; repeatable'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        help='Write rendered manifests to DIR/<chart>/<scenario>.yaml'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Render everything, ignoring and not updating the cache'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Chart x Scenario Render Matrix")
+    print("=" * 80)
+    print()
+
+    chart_dirs = find_chart_dirs(repo.charts_dir)
+    if args.chart:
+        chart_dirs = [d for d in chart_dirs if d.name == args.chart]
+        if not chart_dirs:
+            print(f"Error: Chart '{args.chart}' not found in {repo.charts_dir}")
+            sys.exit(1)
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(
+                repo.repo_root, {d.name for d in chart_dirs}, args.changed_since, args.staged
+            )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+
+    scenarios: List[Scenario] = [s for d in chart_dirs for s in chart_scenarios(d)]
+    if args.scenario:
+        scenarios = [s for s in scenarios if fnmatch.fnmatch(s.name, args.scenario)]
+
+    try:
+        renderer = Renderer(repo.repo_root, args.helm, args.namespace, args.helm_arg,
+                            use_cache=not args.no_cache)
+    except HelmError as e:
+        print(f"❌ Error: {e}")
+        print("   Install helm: https://helm.sh/docs/intro/install/")
+        sys.exit(1)
+
+    jobs = resolve_jobs(args.jobs)
+    print(f"{renderer.version}: {len(scenarios)} scenario(s) in {len(chart_dirs)} chart(s), {jobs} worker(s)")
+    print()
+
+    started = time.perf_counter()
+    results: List[RenderResult] = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(renderer.render, s) for s in scenarios]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print_result(result, len(results), len(scenarios))
+        except HelmError as e:
+            print(f"❌ Error: {e}")
+            for future in futures:
+                future.cancel()
+            sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    if args.output_dir:
+        output_dir = repo.repo_root / args.output_dir
+        for result in results:
+            if result.ok:
+                path = output_dir / result.scenario.chart / f"{result.scenario.name}.yaml"
+                with AtomicWriter(path) as writer:
+                    writer.write(result.manifest)
+
+    # A full run knows every live render; drop the rest from the cache
+    pruned = 0
+    if not (args.chart or args.scenario or diff_requested(args)):
+        pruned = renderer.prune()
+
+    failed = sorted((r for r in results if not r.ok), key=lambda r: r.scenario.label)
+    cached = sum(r.cached for r in results)
+    helm_time = sum(r.seconds for r in results if not r.cached)
+
+    print()
+    print("=" * 80)
+    print(f"Rendered {len(results)} scenario(s) in {elapsed:.1f}s: "
+          f"{len(results) - cached} with helm ({helm_time:.1f}s of helm time), {cached} from cache"
+          + (f", {pruned} stale cache entries removed" if pruned else ""))
+    if failed:
+        print(f"❌ {len(failed)} scenario(s) failed:")
+        for result in failed:
+            print(f"  - {result.scenario.label}")
+    else:
+        print("✅ All scenarios rendered successfully!")
+    print("=" * 80)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
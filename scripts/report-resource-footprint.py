@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Resource Footprint Report per Chart Scenario
+
+This script renders each chart scenario (values.yaml alone and with every
+values-*.yaml file, through the cached renderer in chartlib/render.py) and
+adds up what the rendered manifests ask the cluster for:
+
+- Pods: Deployment/StatefulSet/ReplicaSet replicas, or the HPA min/max range
+  when a HorizontalPodAutoscaler targets the workload
+- CPU and memory requests/limits per pod (init containers counted the way
+  the scheduler does), multiplied by the replica count
+- Storage: PersistentVolumeClaims plus StatefulSet volumeClaimTemplates
+  multiplied by the replica count
+- DaemonSets separately, per node; Jobs and CronJobs are not counted
+
+Totals are printed per chart/scenario, per scenario across charts, and per
+chart category (from charts-metadata.yaml) and scenario. Values shown as
+"2-10" are the HPA min-max range; a trailing "+" means some containers set
+no limit, so the real limit is unbounded.
+
+Usage:
+    # Every chart and scenario
+    python3 scripts/report-resource-footprint.py
+
+    # Compare homeserver and production footprints
+    python3 scripts/report-resource-footprint.py --scenario home-single
+    python3 scripts/report-resource-footprint.py --scenario 'prod*' --json build/footprint.json
+
+    # Reuse manifests written by render-matrix.py --output-dir (no helm needed)
+    python3 scripts/report-resource-footprint.py --manifests build/rendered
+
+Exit codes:
+    0: Report generated
+    1: A scenario failed to render or parse, or helm is not available
+"""
+
+import sys
+import json
+import fnmatch
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.manifests import (
+    BATCH_KINDS, REPLICATED_KINDS, format_bytes, format_cpu, load_manifests, object_key,
+    parse_quantity, pod_resources, pod_spec,
+)
+from chartlib.output import AtomicWriter
+from chartlib.parallel import resolve_jobs
+from chartlib.render import HelmError, Renderer, Scenario, chart_scenarios
+from chartlib.repository import ChartRepository, find_chart_dirs
+
+UNCATEGORIZED = 'uncategorized'
+
+
+class Totals(NamedTuple):
+    pods: float = 0
+    cpu_request: float = 0.0
+    cpu_limit: float = 0.0
+    memory_request: float = 0.0
+    memory_limit: float = 0.0
+    storage: float = 0.0
+
+
+def add_totals(a: Totals, b: Totals) -> Totals:
+    return Totals(*(x + y for x, y in zip(a, b)))
+
+
+def scale_totals(t: Totals, factor: float) -> Totals:
+    return Totals(*(x * factor for x in t))
+
+
+class Footprint(NamedTuple):
+    chart: str
+    scenario: str
+    category: str
+    min: Totals             # at HPA minReplicas (or the fixed replica count)
+    max: Totals             # at HPA maxReplicas
+    per_node: Totals        # DaemonSets, per node
+    missing_requests: int   # containers without requests
+    missing_limits: int     # containers without a memory limit
+    batch: int              # Jobs/CronJobs, not counted in the totals
+
+    @property
+    def label(self) -> str:
+        return f"{self.chart}/{self.scenario}"
+
+
+def hpa_ranges(objects: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, str], Tuple[int, int]]:
+    """(kind, name) of each HPA target -> (minReplicas, maxReplicas)."""
+    ranges = {}
+    for obj in objects:
+        if obj.get('kind') != 'HorizontalPodAutoscaler':
+            continue
+        spec = obj.get('spec') or {}
+        target = spec.get('scaleTargetRef') or {}
+        low = int(spec.get('minReplicas', 1))
+        ranges[(target.get('kind'), target.get('name'))] = (low, int(spec.get('maxReplicas', low)))
+    return ranges
+
+
+def claim_size(claim: Dict[str, Any]) -> float:
+    storage = (((claim.get('spec') or {}).get('resources') or {}).get('requests') or {}).get('storage')
+    return parse_quantity(storage) if storage is not None else 0.0
+
+
+def footprint(chart: str, scenario: str, category: str, objects: List[Dict[str, Any]]) -> Footprint:
+    """Sum up the capacity one rendered scenario asks for."""
+    ranges = hpa_ranges(objects)
+    low = high = per_node = Totals()
+    missing_requests = missing_limits = batch = 0
+
+    for obj in objects:
+        kind = obj.get('kind')
+        if kind == 'PersistentVolumeClaim':
+            pvc = Totals(storage=claim_size(obj))
+            low, high = add_totals(low, pvc), add_totals(high, pvc)
+            continue
+        spec = pod_spec(obj)
+        if spec is None:
+            continue
+        if kind in BATCH_KINDS:
+            batch += 1
+            continue
+
+        pod = pod_resources(spec)
+        missing_requests += pod.missing_requests
+        missing_limits += pod.missing_limits
+        one = Totals(1, pod.cpu_request, pod.cpu_limit, pod.memory_request, pod.memory_limit)
+        if kind == 'StatefulSet':
+            claims = (obj.get('spec') or {}).get('volumeClaimTemplates') or []
+            one = one._replace(storage=sum(claim_size(c) for c in claims))
+        if kind == 'DaemonSet':
+            per_node = add_totals(per_node, one)
+            continue
+
+        replicas = 1
+        if kind in REPLICATED_KINDS:
+            replicas = (obj.get('spec') or {}).get('replicas')
+            replicas = 1 if replicas is None else int(replicas)
+        min_replicas, max_replicas = ranges.get(object_key(obj), (replicas, replicas))
+        low = add_totals(low, scale_totals(one, min_replicas))
+        high = add_totals(high, scale_totals(one, max_replicas))
+
+    return Footprint(chart, scenario, category, low, high, per_node,
+                     missing_requests, missing_limits, batch)
+
+
+def load_scenario(scenario: Scenario, renderer: Optional[Renderer],
+                  manifests_dir: Optional[Path]) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+    """(objects, error) for one scenario, from helm or a pre-rendered file."""
+    if manifests_dir is not None:
+        path = manifests_dir / scenario.chart / f"{scenario.name}.yaml"
+        try:
+            text = path.read_text(encoding='utf-8')
+        except OSError as e:
+            return None, f"cannot read {path}: {e}"
+    else:
+        result = renderer.render(scenario)
+        if not result.ok:
+            lines = result.error.splitlines() or ['helm template failed']
+            return None, lines[-1]
+        text = result.manifest
+    try:
+        return load_manifests(text), ''
+    except yaml.YAMLError as e:
+        return None, f"invalid manifest: {e}"
+
+
+def sum_footprints(footprints: Iterable[Footprint]) -> Dict[str, Any]:
+    low = high = per_node = Totals()
+    charts = 0
+    missing_requests = missing_limits = 0
+    for fp in footprints:
+        charts += 1
+        low, high = add_totals(low, fp.min), add_totals(high, fp.max)
+        per_node = add_totals(per_node, fp.per_node)
+        missing_requests += fp.missing_requests
+        missing_limits += fp.missing_limits
+    return {
+        'charts': charts, 'min': low, 'max': high, 'per_node': per_node,
+        'missing_requests': missing_requests, 'missing_limits': missing_limits,
+    }
+
+
+def format_range(low: float, high: float, fmt) -> str:
+    if fmt(low) == fmt(high):
+        return fmt(low)
+    return f"{fmt(low)}-{fmt(high)}"
+
+
+def format_count(value: float) -> str:
+    return f"{value:g}"
+
+
+HEADER = f"{'':<40} {'Pods':>7} {'CPU req':>11} {'CPU lim':>11} {'Mem req':>13} {'Mem lim':>13} {'Storage':>13}"
+
+
+def table_row(label: str, low: Totals, high: Totals, missing_limits: int) -> str:
+    unbounded = '+' if missing_limits else ''
+    return (
+        f"{label:<40} "
+        f"{format_range(low.pods, high.pods, format_count):>7} "
+        f"{format_range(low.cpu_request, high.cpu_request, format_cpu):>11} "
+        f"{format_range(low.cpu_limit, high.cpu_limit, format_cpu) + unbounded:>11} "
+        f"{format_range(low.memory_request, high.memory_request, format_bytes):>13} "
+        f"{format_range(low.memory_limit, high.memory_limit, format_bytes) + unbounded:>13} "
+        f"{format_range(low.storage, high.storage, format_bytes):>13}"
+    )
+
+
+def per_node_note(per_node: Totals) -> str:
+    return (f"  + per node: {format_count(per_node.pods)} DaemonSet pod(s), "
+            f"{format_cpu(per_node.cpu_request)} CPU, {format_bytes(per_node.memory_request)} memory requested")
+
+
+def totals_json(t: Totals) -> Dict[str, float]:
+    return {
+        'pods': t.pods,
+        'cpu_request_cores': round(t.cpu_request, 6),
+        'cpu_limit_cores': round(t.cpu_limit, 6),
+        'memory_request_bytes': int(t.memory_request),
+        'memory_limit_bytes': int(t.memory_limit),
+        'storage_bytes': int(t.storage),
+    }
+
+
+def summary_json(summary: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'charts': summary['charts'],
+        'min': totals_json(summary['min']),
+        'max': totals_json(summary['max']),
+        'per_node': totals_json(summary['per_node']),
+        'containers_without_requests': summary['missing_requests'],
+        'containers_without_limits': summary['missing_limits'],
+    }
+
+
+def main():
+    """Main report logic."""
+    parser = argparse.ArgumentParser(
+        description='Report CPU, memory and storage footprint of rendered chart scenarios'
+    )
+    parser.add_argument(
+        '--chart',
+        type=str,
+        help='Report specific chart only'
+    )
+    parser.add_argument(
+        '--scenario',
+        type=str,
+        help="Only scenarios matching this glob, e.g. 'prod*' or home-single"
+    )
+    parser.add_argument(
+        '--manifests',
+        type=str,
+        metavar='DIR',
+        help='Read DIR/<chart>/<scenario>.yaml (render-matrix.py --output-dir) instead of running helm'
+    )
+    parser.add_argument(
+        '--json',
+        type=str,
+        metavar='FILE',
+        help='Also write the report as JSON to FILE'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Concurrent helm processes (default: 0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--helm',
+        type=str,
+        default='helm',
+        help='helm binary (default: helm)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Render everything, ignoring and not updating the render cache'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Resource Footprint by Scenario")
+    print("=" * 80)
+    print()
+
+    chart_dirs = find_chart_dirs(repo.charts_dir)
+    if args.chart:
+        chart_dirs = [d for d in chart_dirs if d.name == args.chart]
+        if not chart_dirs:
+            print(f"Error: Chart '{args.chart}' not found in {repo.charts_dir}")
+            sys.exit(1)
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(
+                repo.repo_root, {d.name for d in chart_dirs}, args.changed_since, args.staged
+            )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+
+    scenarios: List[Scenario] = [s for d in chart_dirs for s in chart_scenarios(d)]
+    if args.scenario:
+        scenarios = [s for s in scenarios if fnmatch.fnmatch(s.name, args.scenario)]
+
+    renderer = None
+    manifests_dir = None
+    if args.manifests:
+        manifests_dir = repo.repo_root / args.manifests
+        if not manifests_dir.is_dir():
+            print(f"Error: {manifests_dir} is not a directory")
+            sys.exit(1)
+        # Only scenarios that were actually rendered there
+        scenarios = [s for s in scenarios if (manifests_dir / s.chart / f"{s.name}.yaml").exists()]
+    else:
+        try:
+            renderer = Renderer(repo.repo_root, args.helm, use_cache=not args.no_cache)
+        except HelmError as e:
+            print(f"❌ Error: {e}")
+            print("   Install helm (https://helm.sh/docs/intro/install/) or pass --manifests DIR")
+            sys.exit(1)
+
+    print(f"Analyzing {len(scenarios)} scenario(s) in {len(chart_dirs)} chart(s)...")
+    print()
+
+    try:
+        with ThreadPoolExecutor(max_workers=resolve_jobs(args.jobs)) as pool:
+            loaded = list(pool.map(lambda s: load_scenario(s, renderer, manifests_dir), scenarios))
+    except HelmError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    footprints: List[Footprint] = []
+    failed: List[Tuple[str, str]] = []
+    for scenario, (objects, error) in zip(scenarios, loaded):
+        if objects is None:
+            failed.append((scenario.label, error))
+            continue
+        info = repo.charts_metadata.get(scenario.chart) or {}
+        try:
+            footprints.append(footprint(scenario.chart, scenario.name,
+                                        info.get('category') or UNCATEGORIZED, objects))
+        except (ValueError, TypeError) as e:
+            failed.append((scenario.label, f"cannot read resources: {e}"))
+
+    by_scenario: Dict[str, List[Footprint]] = defaultdict(list)
+    by_category: Dict[Tuple[str, str], List[Footprint]] = defaultdict(list)
+    for fp in footprints:
+        by_scenario[fp.scenario].append(fp)
+        by_category[(fp.category, fp.scenario)].append(fp)
+
+    print(HEADER)
+    print("-" * len(HEADER))
+    for fp in footprints:
+        print(table_row(fp.label, fp.min, fp.max, fp.missing_limits))
+        if fp.per_node.pods:
+            print(per_node_note(fp.per_node))
+
+    scenario_totals = {name: sum_footprints(fps) for name, fps in sorted(by_scenario.items())}
+    category_totals = {key: sum_footprints(fps) for key, fps in sorted(by_category.items())}
+
+    print()
+    print("Totals by scenario:")
+    print(HEADER)
+    print("-" * len(HEADER))
+    for name, summary in scenario_totals.items():
+        label = f"{name} ({summary['charts']} charts)"
+        print(table_row(label, summary['min'], summary['max'], summary['missing_limits']))
+        if summary['per_node'].pods:
+            print(per_node_note(summary['per_node']))
+
+    print()
+    print("Totals by category:")
+    print(HEADER)
+    print("-" * len(HEADER))
+    for (category, name), summary in category_totals.items():
+        label = f"{category}/{name} ({summary['charts']} charts)"
+        print(table_row(label, summary['min'], summary['max'], summary['missing_limits']))
+
+    if args.json:
+        report = {
+            'scenarios': [
+                {
+                    'chart': fp.chart,
+                    'scenario': fp.scenario,
+                    'category': fp.category,
+                    'min': totals_json(fp.min),
+                    'max': totals_json(fp.max),
+                    'per_node': totals_json(fp.per_node),
+                    'containers_without_requests': fp.missing_requests,
+                    'containers_without_limits': fp.missing_limits,
+                    'batch_workloads': fp.batch,
+                }
+                for fp in footprints
+            ],
+            'by_scenario': {name: summary_json(s) for name, s in scenario_totals.items()},
+            'by_category': {},
+            'failed': [{'scenario': label, 'error': error} for label, error in failed],
+        }
+        for (category, name), summary in category_totals.items():
+            report['by_category'].setdefault(category, {})[name] = summary_json(summary)
+        with AtomicWriter(repo.repo_root / args.json) as writer:
+            writer.write(json.dumps(report, indent=2) + '\n')
+
+    missing = sum(fp.missing_requests for fp in footprints)
+    print()
+    print("=" * 80)
+    print(f"Analyzed {len(footprints)} scenario(s)"
+          + (f"; wrote {args.json}" if args.json else ""))
+    if missing:
+        print(f"⚠️  {missing} container(s) set no CPU/memory requests; totals understate them")
+    if failed:
+        print(f"❌ {len(failed)} scenario(s) could not be analyzed:")
+        for label, error in failed:
+            print(f"  - {label}: {error}")
+    else:
+        print("✅ Footprint report complete")
+    print("=" * 80)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
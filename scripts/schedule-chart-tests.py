@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Duration-Aware Chart Testing Shard Scheduler
+
+This script splits the charts chart-testing has to lint and install into N
+shards with balanced wall-clock time, using lint/install durations recorded
+from earlier CI runs:
+
+- Charts are bin-packed longest-processing-time first: the slowest remaining
+  chart goes to the shard that currently finishes earliest, which keeps the
+  slowest shard close to total/N
+- Chart families (charts sharing a name prefix, like thanos-*) stay in one
+  shard, ordered so a chart comes after the family members it references in
+  its values.yaml or templates
+- Charts without history are estimated with the median recorded duration
+
+The shard matrix is printed as a table, or as JSON for a CI matrix
+(`--format github` prints `matrix=...` for $GITHUB_OUTPUT). Each shard lists
+its charts in run order and as a `ct --charts` argument.
+
+Durations are recorded from timing files with one "<chart> <lint|install>
+<seconds>" line per measurement, e.g. written by each shard job with:
+
+    start=$(date +%s); ct install --config ct.yaml --charts charts/redis
+    echo "redis install $(( $(date +%s) - start ))" >> timings.txt
+
+and kept as a moving average in scripts/chart-test-durations.json.
+
+Usage:
+    # Charts changed since develop in 4 shards
+    python3 scripts/schedule-chart-tests.py --shards 4 --changed-since origin/develop
+
+    # Matrix for a GitHub Actions job output
+    python3 scripts/schedule-chart-tests.py --shards 4 --format github >> "$GITHUB_OUTPUT"
+
+    # Fold the timings of a CI run into the history
+    python3 scripts/schedule-chart-tests.py --record timings-*.txt
+
+Exit codes:
+    0: Schedule printed (or timings recorded)
+    1: Invalid timings file or arguments
+"""
+
+import re
+import sys
+import json
+import heapq
+import argparse
+import statistics
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.output import AtomicWriter
+from chartlib.repository import ChartRepository, find_chart_dirs
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_HISTORY = SCRIPTS_DIR / 'chart-test-durations.json'
+PHASES = ('lint', 'install')
+# Used per phase when there is no history at all
+DEFAULT_ESTIMATES = {'lint': 15.0, 'install': 120.0}
+# Weight of the newest measurement in the moving average
+SMOOTHING = 0.3
+TIMING_RE = re.compile(r'^\s*([a-z0-9][a-z0-9-]*)\s+(lint|install)\s+(\d+(?:\.\d+)?)\s*$')
+
+
+class Unit(NamedTuple):
+    """Charts scheduled together, in run order."""
+    charts: List[str]
+    seconds: float
+
+
+class Shard(NamedTuple):
+    index: int
+    charts: List[str]
+    seconds: float
+
+
+def load_history(path: Path) -> Dict[str, Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return (json.load(f) or {}).get('charts', {})
+    except FileNotFoundError:
+        return {}
+
+
+def record_timings(history: Dict[str, Dict], files: List[Path]) -> int:
+    """Fold "<chart> <phase> <seconds>" lines into history; returns the count."""
+    recorded = 0
+    today = date.today().isoformat()
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                m = TIMING_RE.match(line)
+                if not m:
+                    raise ValueError(f"{path}:{lineno}: expected '<chart> <lint|install> <seconds>'")
+                chart, phase, seconds = m.group(1), m.group(2), float(m.group(3))
+                entry = history.setdefault(chart, {})
+                previous = entry.get(phase)
+                entry[phase] = round(seconds if previous is None
+                                     else previous + SMOOTHING * (seconds - previous), 1)
+                entry['runs'] = entry.get('runs', 0) + (phase == 'install')
+                entry['updated'] = today
+                recorded += 1
+    return recorded
+
+
+def estimator(history: Dict[str, Dict]):
+    """Function giving a chart's expected lint+install seconds."""
+    medians = {}
+    for phase in PHASES:
+        known = [entry[phase] for entry in history.values() if phase in entry]
+        medians[phase] = statistics.median(known) if known else DEFAULT_ESTIMATES[phase]
+
+    def estimate(chart: str) -> float:
+        entry = history.get(chart, {})
+        return sum(entry.get(phase, medians[phase]) for phase in PHASES)
+    return estimate
+
+
+def family_of(chart: str, prefixes: Set[str]) -> Optional[str]:
+    prefix = chart.split('-', 1)[0]
+    return prefix if prefix in prefixes and '-' in chart else None
+
+
+def family_prefixes(all_charts: List[str]) -> Set[str]:
+    """Name prefixes shared by two or more charts (e.g. thanos)."""
+    counts: Dict[str, int] = {}
+    for chart in all_charts:
+        if '-' in chart:
+            prefix = chart.split('-', 1)[0]
+            counts[prefix] = counts.get(prefix, 0) + 1
+    return {prefix for prefix, count in counts.items() if count > 1}
+
+
+def references(chart_dir: Path, names: List[str]) -> Set[str]:
+    """Which of names a chart's values.yaml and templates mention."""
+    texts = []
+    for path in [chart_dir / 'values.yaml'] + sorted((chart_dir / 'templates').rglob('*')):
+        if path.is_file():
+            texts.append(path.read_text(encoding='utf-8', errors='replace'))
+    text = '\n'.join(texts)
+    found = set()
+    for name in names:
+        # thanos-query must not match inside thanos-query-frontend
+        if name != chart_dir.name and re.search(rf'(?<![a-z0-9-]){re.escape(name)}(?![a-z0-9-]*[a-z0-9])', text):
+            found.add(name)
+    return found
+
+
+def dependency_order(members: List[str], charts_dir: Path) -> List[str]:
+    """Family members with referenced charts first (stable, name order on ties/cycles)."""
+    deps = {name: references(charts_dir / name, members) for name in members}
+    ordered: List[str] = []
+    remaining = sorted(members)
+    while remaining:
+        ready = [name for name in remaining if not (deps[name] - set(ordered))]
+        # A cycle: take the first remaining chart so the order is still defined
+        batch = ready or remaining[:1]
+        ordered.extend(batch)
+        remaining = [name for name in remaining if name not in batch]
+    return ordered
+
+
+def build_units(charts: List[str], all_charts: List[str], charts_dir: Path, estimate) -> List[Unit]:
+    prefixes = family_prefixes(all_charts)
+    families: Dict[str, List[str]] = {}
+    units = []
+    for chart in charts:
+        family = family_of(chart, prefixes)
+        if family:
+            families.setdefault(family, []).append(chart)
+        else:
+            units.append(Unit([chart], estimate(chart)))
+    for members in families.values():
+        ordered = dependency_order(members, charts_dir)
+        units.append(Unit(ordered, sum(estimate(c) for c in ordered)))
+    return units
+
+
+def schedule(units: List[Unit], shards: int) -> List[Shard]:
+    """Longest-processing-time-first assignment to the least loaded shard."""
+    heap = [(0.0, index) for index in range(shards)]
+    assigned: List[List[str]] = [[] for _ in range(shards)]
+    loads = [0.0] * shards
+    for unit in sorted(units, key=lambda u: (-u.seconds, u.charts[0])):
+        load, index = heapq.heappop(heap)
+        assigned[index].extend(unit.charts)
+        loads[index] = load + unit.seconds
+        heapq.heappush(heap, (loads[index], index))
+    return [Shard(i + 1, assigned[i], round(loads[i], 1)) for i in range(shards) if assigned[i]]
+
+
+def format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes}m{secs:02d}s" if minutes else f"{secs}s"
+
+
+def matrix(shards: List[Shard]) -> Dict:
+    return {
+        'include': [
+            {
+                'shard': shard.index,
+                'charts': ' '.join(shard.charts),
+                'ct_charts': ','.join(f"charts/{chart}" for chart in shard.charts),
+                'estimate_seconds': shard.seconds,
+            }
+            for shard in shards
+        ]
+    }
+
+
+def main():
+    """Main scheduling logic."""
+    parser = argparse.ArgumentParser(
+        description='Split chart-testing work into duration-balanced shards'
+    )
+    parser.add_argument(
+        '--shards', '-n',
+        type=int,
+        default=4,
+        help='Number of shards (default: 4)'
+    )
+    parser.add_argument(
+        '--chart',
+        action='append',
+        default=[],
+        help='Schedule only these charts (repeatable)'
+    )
+    parser.add_argument(
+        '--history',
+        type=str,
+        default=str(DEFAULT_HISTORY),
+        help='Duration history JSON (default: scripts/chart-test-durations.json)'
+    )
+    parser.add_argument(
+        '--record',
+        nargs='+',
+        metavar='FILE',
+        help='Add timings files ("<chart> <lint|install> <seconds>" lines) to the history and exit'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['table', 'json', 'github'],
+        default='table',
+        help='Output format (default: table; github prints matrix=<json> for $GITHUB_OUTPUT)'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+    history_path = Path(args.history)
+    history = load_history(history_path)
+
+    if args.record:
+        try:
+            recorded = record_timings(history, [Path(p) for p in args.record])
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        document = {'charts': dict(sorted(history.items()))}
+        with AtomicWriter(history_path) as writer:
+            writer.write(json.dumps(document, indent=2) + '\n')
+        print(f"✅ Recorded {recorded} timing(s) for {len(history)} chart(s) in {history_path}")
+        return
+
+    if args.shards < 1:
+        print("Error: --shards must be at least 1")
+        sys.exit(1)
+
+    all_charts = [d.name for d in find_chart_dirs(repo.charts_dir)]
+    charts = all_charts
+    if args.chart:
+        unknown = sorted(set(args.chart) - set(all_charts))
+        if unknown:
+            print(f"Error: Chart(s) not found in {repo.charts_dir}: {', '.join(unknown)}")
+            sys.exit(1)
+        charts = [c for c in all_charts if c in args.chart]
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(repo.repo_root, set(charts), args.changed_since, args.staged)
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        charts = [c for c in charts if c in affected]
+
+    estimate = estimator(history)
+    units = build_units(charts, all_charts, repo.charts_dir, estimate)
+    shards = schedule(units, args.shards)
+
+    if args.format == 'github':
+        print(f"matrix={json.dumps(matrix(shards), separators=(',', ':'))}")
+        return
+    if args.format == 'json':
+        print(json.dumps(matrix(shards), indent=2))
+        return
+
+    total = sum(unit.seconds for unit in units)
+    longest = max((unit.seconds for unit in units), default=0.0)
+    makespan = max((shard.seconds for shard in shards), default=0.0)
+    unknown = sorted(c for c in charts if c not in history)
+
+    print("=" * 80)
+    print("Chart Testing Shards")
+    print("=" * 80)
+    print()
+    for shard in shards:
+        print(f"Shard {shard.index}: {format_duration(shard.seconds):>8}  {len(shard.charts)} chart(s)")
+        for chart in shard.charts:
+            marker = '' if chart in history else ' (estimated)'
+            print(f"  - {chart:<28} {format_duration(estimate(chart)):>8}{marker}")
+    print()
+    print("=" * 80)
+    print(f"{len(charts)} chart(s) in {len(shards)} shard(s): serial {format_duration(total)}, "
+          f"slowest shard {format_duration(makespan)} "
+          f"(ideal {format_duration(max(total / args.shards, longest))})")
+    if unknown:
+        print(f"ℹ️  {len(unknown)} chart(s) without recorded durations use the median estimate")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
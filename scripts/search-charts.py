@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Search Charts by Name, Description, Tags and Keywords
+
+This script answers questions like "which charts carry keyword s3 and tag
+Monitoring?" from an inverted index over charts-metadata.yaml. The index is
+built on first use (and whenever the metadata file changes) into
+.cache/chart-tools/search-index.bin and memory-mapped for each query, so
+answers do not require a YAML parse.
+
+Query syntax:
+    term              Match in any field (name, description, tags, keywords, category)
+    term*             Prefix match
+    field:term        Restrict to a field: name, desc, tag, keyword, category
+    a b  /  a AND b   Both terms (default)
+    a OR b            Either term
+    NOT a  /  -a      Exclude
+    ( ... )           Grouping
+    "two words"       All words of a phrase
+
+Results are ranked with BM25; name matches weigh most, then tags/keywords.
+
+Usage:
+    python3 scripts/search-charts.py 'keyword:s3 tag:Monitoring'
+    python3 scripts/search-charts.py 'thanos* -tag:Data-Management'
+    python3 scripts/search-charts.py --any object storage backup
+    python3 scripts/search-charts.py --ids 'tag:Database'
+
+Exit codes:
+    0: At least one chart matched
+    1: No matches
+    2: Invalid query or missing metadata
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from chartlib import ChartRepository
+from chartlib.cache import cache_dir_for
+from chartlib.search import QueryEngine, QueryError, open_index
+
+INDEX_FILENAME = 'search-index.bin'
+
+
+def main():
+    """Main search logic."""
+    parser = argparse.ArgumentParser(
+        description='Search charts-metadata.yaml by name, description, tags and keywords'
+    )
+    parser.add_argument(
+        'query',
+        nargs='+',
+        help='Query terms (see module docstring for syntax)'
+    )
+    parser.add_argument(
+        '--any',
+        action='store_true',
+        help='Combine terms with OR instead of AND'
+    )
+    parser.add_argument(
+        '--limit', '-n',
+        type=int,
+        default=0,
+        help='Show at most N results (default: all)'
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        '--ids',
+        action='store_true',
+        help='Print chart ids only, one per line'
+    )
+    output.add_argument(
+        '--json',
+        action='store_true',
+        help='Print results as JSON'
+    )
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Rebuild the search index before querying'
+    )
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+    if not repo.metadata_file.exists():
+        print(f"Error: {repo.metadata_file} not found", file=sys.stderr)
+        sys.exit(2)
+
+    started = time.perf_counter()
+    index_file = cache_dir_for(repo.repo_root) / INDEX_FILENAME
+    query = ' '.join(args.query)
+    with open_index(repo.metadata_file, index_file, args.rebuild) as index:
+        try:
+            results = QueryEngine(index, default_or=args.any).search(query, args.limit or None)
+        except QueryError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.ids:
+        for result in results:
+            print(result.chart_id)
+    elif args.json:
+        print(json.dumps([result._asdict() for result in results], indent=2, ensure_ascii=False))
+    else:
+        for result in results:
+            print(f"{result.score:6.2f}  {result.chart_id:<26} {result.description}")
+        print(f"\n{len(results)} chart(s) matched in {elapsed_ms:.1f} ms")
+
+    sys.exit(0 if results else 1)
+
+
+if __name__ == "__main__":
+    main()
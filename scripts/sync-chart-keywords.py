@@ -5,6 +5,11 @@ Sync Chart.yaml Keywords from Metadata
 This script automatically updates Chart.yaml keywords based on charts-metadata.yaml.
 Useful for bulk updates when metadata is the source of truth.
 
+Edits are applied in place with chartlib.yamledit, so comments, key order
+and quoting in Chart.yaml are preserved. Annotation, field and version
+updates can be batched into the same pass; each file is written once,
+atomically. --dry-run prints a unified diff per chart.
+
 Usage:
     # Dry-run (preview changes)
     python scripts/sync-chart-keywords.py --dry-run
@@ -15,6 +20,18 @@ Usage:
     # Sync specific chart
     python scripts/sync-chart-keywords.py --chart keycloak
 
+    # Batch other Chart.yaml updates into the same pass (bumps the version
+    # of every chart that changes)
+    python scripts/sync-chart-keywords.py --dry-run \\
+        --set-annotation artifacthub.io/prerelease=false --bump-version patch
+
+    # Sync only charts touched since a git ref, or by staged changes
+    python scripts/sync-chart-keywords.py --changed-since origin/master
+    python scripts/sync-chart-keywords.py --staged
+
+    # Per-phase timings, Chrome trace or cProfile output
+    python scripts/sync-chart-keywords.py --dry-run --timings --trace sync.trace.json
+
 Exit codes:
     0: Success (changes applied or no changes needed)
     1: Errors occurred
@@ -22,103 +39,111 @@ Exit codes:
 
 import sys
 import argparse
-import yaml
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-
-def load_yaml_file(file_path: Path) -> Dict:
-    """Load and parse YAML file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}")
-        sys.exit(1)
+from chartlib import ChartRepository, load_yaml_file
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.timing import add_timing_arguments, instrument, span
+from chartlib.yamledit import YamlEditError, YamlEditor, bump_version
 
 
-def save_yaml_file(file_path: Path, data: Dict) -> None:
-    """Save YAML file preserving formatting."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Simple keyword replacement to preserve formatting
-        # Find the keywords section and replace it
-        lines = content.split('\n')
-        new_lines = []
-        in_keywords = False
-        indent = ''
-
-        for line in lines:
-            if line.strip().startswith('keywords:'):
-                in_keywords = True
-                indent = line[:len(line) - len(line.lstrip())]
-                new_lines.append(line)
-                # Add new keywords
-                for keyword in data.get('keywords', []):
-                    new_lines.append(f"{indent}  - {keyword}")
-            elif in_keywords and line.strip().startswith('-'):
-                # Skip old keywords
-                continue
-            elif in_keywords and line and not line.startswith(' '):
-                # End of keywords section
-                in_keywords = False
-                new_lines.append(line)
-            elif in_keywords and not line.strip():
-                # Empty line in keywords - end of section
-                in_keywords = False
-                new_lines.append(line)
-            else:
-                new_lines.append(line)
-
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(new_lines))
-
-    except Exception as e:
-        print(f"Error saving {file_path}: {e}")
-        sys.exit(1)
+def parse_assignments(pairs: List[str], option: str) -> Dict[str, str]:
+    """Parse repeated KEY=VALUE command line options."""
+    result = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition('=')
+        if not sep or not key:
+            print(f"Error: {option} expects KEY=VALUE, got '{pair}'")
+            sys.exit(1)
+        result[key] = value
+    return result
 
 
 def sync_chart_keywords(
     chart_name: str,
     chart_yaml_path: Path,
     metadata_keywords: List[str],
-    dry_run: bool
-) -> Tuple[bool, str]:
-    """Sync keywords from metadata to Chart.yaml.
+    dry_run: bool,
+    repository: Optional[ChartRepository] = None,
+    annotations: Optional[Dict[str, str]] = None,
+    fields: Optional[Dict[str, str]] = None,
+    bump: Optional[str] = None
+) -> Tuple[bool, str, bool]:
+    """Sync keywords from metadata to Chart.yaml, plus any extra field updates.
+
+    All edits for the chart are applied to the original text in one pass and
+    written atomically; comments, ordering and quoting are preserved. Pass
+    metadata_keywords=None to leave keywords untouched.
 
     Returns:
-        (changed, message)
+        (changed, message, failed)
     """
     # Load Chart.yaml
-    chart_yaml = load_yaml_file(chart_yaml_path)
-    current_keywords = chart_yaml.get('keywords', [])
+    chart_yaml = load_yaml_file(chart_yaml_path, repository)
+    try:
+        editor = YamlEditor.from_file(chart_yaml_path)
+    except OSError as e:
+        return (False, f"  ❌ {chart_name}: Cannot read Chart.yaml: {e}", True)
 
-    # Compare keywords
-    if set(current_keywords) == set(metadata_keywords):
-        return (False, f"  ℹ️  {chart_name}: Keywords already synchronized")
+    lines = []
+    verb = "Would update" if dry_run else "Updated"
+    try:
+        if metadata_keywords is not None:
+            current_keywords = chart_yaml.get('keywords', [])
+            if set(current_keywords) == set(metadata_keywords):
+                lines.append(f"  ℹ️  {chart_name}: Keywords already synchronized")
+            else:
+                editor.set(['keywords'], metadata_keywords)
+                if dry_run:
+                    lines.append(
+                        f"  🔄 {chart_name}: Would update keywords\n"
+                        f"     Current: {current_keywords}\n"
+                        f"     New:     {metadata_keywords}"
+                    )
+                else:
+                    lines.append(
+                        f"  ✅ {chart_name}: Keywords updated\n"
+                        f"     Old: {current_keywords}\n"
+                        f"     New: {metadata_keywords}"
+                    )
+
+        for key, value in (fields or {}).items():
+            if str(editor.get([key])) != value:
+                editor.set([key], value)
+                lines.append(f"  🔄 {chart_name}: {verb} {key}: {chart_yaml.get(key)} -> {value}")
+
+        for key, value in (annotations or {}).items():
+            if editor.get(['annotations', key]) != value:
+                editor.set(['annotations', key], value)
+                lines.append(f"  🔄 {chart_name}: {verb} annotation {key}")
+
+        if bump and editor.changed:
+            old_version = str(editor.get(['version']))
+            new_version = bump_version(old_version, bump)
+            editor.set(['version'], new_version)
+            lines.append(f"  🔄 {chart_name}: {verb} version: {old_version} -> {new_version}")
+        # Refuse edits that would leave Chart.yaml unparsable, also in a dry run
+        editor.validate()
+    except YamlEditError as e:
+        return (False, f"  ❌ {chart_name}: {e}", True)
+
+    if not editor.changed:
+        return (False, '\n'.join(lines) or f"  ℹ️  {chart_name}: Already up to date", False)
 
-    # Update keywords
     if dry_run:
-        return (
-            True,
-            f"  🔄 {chart_name}: Would update keywords\n"
-            f"     Current: {current_keywords}\n"
-            f"     New:     {metadata_keywords}"
-        )
+        lines.append(editor.diff(f"charts/{chart_name}/Chart.yaml").rstrip('\n'))
     else:
-        chart_yaml['keywords'] = metadata_keywords
-        save_yaml_file(chart_yaml_path, chart_yaml)
-        return (
-            True,
-            f"  ✅ {chart_name}: Keywords updated\n"
-            f"     Old: {current_keywords}\n"
-            f"     New: {metadata_keywords}"
-        )
+        try:
+            with span('write', path=chart_yaml_path):
+                editor.save(chart_yaml_path)
+        except OSError as e:
+            print(f"Error saving {chart_yaml_path}: {e}")
+            sys.exit(1)
+    return (True, '\n'.join(lines), False)
 
 
-def main():
+def main(argv=None, repo=None):
     """Main sync logic."""
     parser = argparse.ArgumentParser(
         description='Sync Chart.yaml keywords from charts-metadata.yaml'
@@ -133,12 +158,42 @@ def main():
         type=str,
         help='Sync specific chart only'
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        '--skip-keywords',
+        action='store_true',
+        help='Do not sync keywords (only apply the other updates)'
+    )
+    parser.add_argument(
+        '--set-annotation',
+        action='append',
+        metavar='KEY=VALUE',
+        help='Set a Chart.yaml annotation (repeatable)'
+    )
+    parser.add_argument(
+        '--set',
+        action='append',
+        dest='set_fields',
+        metavar='FIELD=VALUE',
+        help='Set a top-level Chart.yaml field, e.g. appVersion=1.2.3 (repeatable)'
+    )
+    parser.add_argument(
+        '--bump-version',
+        choices=['patch', 'minor', 'major'],
+        help='Bump the chart version of every chart that is changed'
+    )
+    add_diff_arguments(parser)
+    add_timing_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument(args)
+
+    annotations = parse_assignments(args.set_annotation, '--set-annotation')
+    fields = parse_assignments(args.set_fields, '--set')
 
     # Setup paths
-    repo_root = Path(__file__).parent.parent
-    charts_dir = repo_root / "charts"
-    metadata_file = repo_root / "charts" / "charts-metadata.yaml"
+    if repo is None:
+        repo = ChartRepository(Path(__file__).parent.parent)
+    charts_dir = repo.charts_dir
+    metadata_file = repo.metadata_file
 
     print("=" * 80)
     if args.dry_run:
@@ -153,7 +208,8 @@ def main():
         print(f"Error: {metadata_file} not found")
         sys.exit(1)
 
-    metadata = load_yaml_file(metadata_file)
+    with span('load metadata'):
+        metadata = load_yaml_file(metadata_file, repo)
     charts_metadata = metadata.get('charts', {})
 
     # Determine which charts to sync
@@ -165,11 +221,24 @@ def main():
     else:
         charts_to_sync = charts_metadata
 
+    # Restrict to charts touched by the git diff
+    if diff_requested(args):
+        try:
+            with span('git diff'):
+                affected = affected_charts(
+                    repo.repo_root, set(charts_metadata), args.changed_since, args.staged
+                )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        charts_to_sync = {k: v for k, v in charts_to_sync.items() if k in affected}
+
     print(f"Syncing {len(charts_to_sync)} chart(s)...")
     print()
 
     # Sync each chart
     changes_made = False
+    errors: List[str] = []
     for chart_name, chart_meta in charts_to_sync.items():
         chart_yaml_path = charts_dir / chart_name / "Chart.yaml"
 
@@ -177,21 +246,34 @@ def main():
             print(f"  ⚠️  {chart_name}: Chart.yaml not found, skipping")
             continue
 
-        metadata_keywords = chart_meta.get('keywords', [])
-        if not metadata_keywords:
-            print(f"  ⚠️  {chart_name}: No keywords in metadata, skipping")
-            continue
-
-        changed, message = sync_chart_keywords(
-            chart_name,
-            chart_yaml_path,
-            metadata_keywords,
-            args.dry_run
-        )
+        metadata_keywords = None
+        if not args.skip_keywords:
+            metadata_keywords = chart_meta.get('keywords', [])
+            if not metadata_keywords:
+                print(f"  ⚠️  {chart_name}: No keywords in metadata, skipping")
+                if not (annotations or fields):
+                    continue
+                metadata_keywords = None
+
+        with span('sync chart', chart=chart_name):
+            changed, message, failed = sync_chart_keywords(
+                chart_name,
+                chart_yaml_path,
+                metadata_keywords,
+                args.dry_run,
+                repo,
+                annotations=annotations,
+                fields=fields,
+                bump=args.bump_version
+            )
 
         print(message)
         if changed:
             changes_made = True
+        if failed:
+            errors.append(chart_name)
+
+    repo.save_cache()
 
     # Summary
     print()
@@ -208,8 +290,13 @@ def main():
             print("   Don't forget to commit the changes")
         else:
             print("✅ All keywords already synchronized")
+    if errors:
+        print(f"❌ {len(errors)} chart(s) could not be updated: {', '.join(errors)}")
     print("=" * 80)
 
+    if errors:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Offline Alerting Rule Tests
+
+This script unit-tests alerting-rules/*.yaml without a running Prometheus.
+Test fixtures use the promtool `test rules` format: synthetic input series,
+and the alerts (or PromQL results) expected at given times. Each rule is
+evaluated over the whole time grid of a test in one pass (see
+chartlib/promeval.py), so the full corpus runs in seconds.
+
+Fixture format (alerting-rules/tests/*.yaml):
+
+    rule_files:                    # relative to the fixture (default: all rule files)
+      - ../prometheus-alerts.yaml
+    evaluation_interval: 1m
+    tests:
+      - name: target down for 5m fires
+        interval: 1m               # spacing of input samples
+        input_series:
+          - series: 'up{job="node", instance="a"}'
+            values: '1x5 0x10'     # 1 six times, then 0 eleven times
+          - series: 'up{job="node"}'
+            values: '1x60'
+        alert_rule_test:
+          - eval_time: 12m
+            alertname: PrometheusTargetDown
+            exp_alerts:
+              - exp_labels: {severity: critical, job: node, instance: a}
+          - eval_time: 12m
+            alertname: PrometheusConfigurationReloadFailure
+            exp_alerts: []
+        promql_expr_test:
+          - expr: sum(up)
+            eval_time: 1m
+            exp_samples:
+              - labels: '{}'
+                value: 2
+
+Values notation: `a+bxn` (n+1 samples starting at a, step b), `axn`, `_`
+(missing sample), `_xn`, `stale`.
+
+Two local extensions help with ad-hoc load tests: `replicas: N` on an input
+series adds N copies labelled replica="0".."N-1", and `exp_count: N` in
+place of exp_alerts only compares the number of firing alerts. promtool
+rejects both, so the committed fixtures do not use them and also run with
+`promtool test rules`.
+
+Usage:
+    # Run every fixture in alerting-rules/tests/
+    python3 scripts/test-alert-rules.py
+
+    # Run one fixture, only tests whose name matches
+    python3 scripts/test-alert-rules.py alerting-rules/tests/prometheus-alerts.test.yaml --run "target down"
+
+    # Also list alerts without tests
+    python3 scripts/test-alert-rules.py --coverage
+
+Exit codes:
+    0: All tests passed
+    1: Test failures or errors
+"""
+
+import re
+import sys
+import math
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import yaml
+
+from chartlib.monitoring import RULES_DIR, load_rule_documents, rule_files, rule_groups
+from chartlib.promeval import (
+    EvaluationError, Evaluator, Labels, Storage, alert_states, format_labels, make_labels,
+)
+from chartlib.promql import PromQLError, VectorSelector, parse, parse_duration
+
+TESTS_DIR = Path(RULES_DIR) / 'tests'
+DEFAULT_EVALUATION_INTERVAL = '1m'
+
+NUMBER = r'[-+]?(?:\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+|Inf|inf|NaN)'
+EXPANDING_RE = re.compile(rf'^(?P<start>{NUMBER}|_|stale)(?P<step>[-+](?:\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+))?x(?P<count>\d+)$')
+LABEL_TEMPLATE_RE = re.compile(r'\{\{\s*\$labels\.([a-zA-Z_][a-zA-Z0-9_]*)\s*\}\}')
+
+
+class Rule(NamedTuple):
+    kind: str           # 'alert' or 'record'
+    name: str
+    expr: str
+    hold: float         # `for:` in seconds
+    labels: Dict[str, str]
+    file: Path
+
+
+class TestResult(NamedTuple):
+    name: str
+    errors: List[str]
+    series: int
+    steps: int
+
+
+def parse_values(text: str) -> List[Any]:
+    """Expand promtool's values notation; '_' is a missing sample, None a stale marker."""
+    values: List[Any] = []
+    for token in str(text).split():
+        m = EXPANDING_RE.match(token)
+        if m:
+            start, step, count = m.group('start'), m.group('step'), int(m.group('count'))
+            if start == '_':
+                values.extend(['_'] * count)
+            elif start == 'stale':
+                values.extend([None] * count)
+            else:
+                base, inc = float(start), float(step or 0)
+                values.extend(base + inc * i for i in range(count + 1))
+        elif token == '_':
+            values.append('_')
+        elif token == 'stale':
+            values.append(None)
+        else:
+            try:
+                values.append(float(token))
+            except ValueError:
+                raise ValueError(f"invalid value {token!r} in {text!r}")
+    return values
+
+
+def parse_series(text: str) -> Dict[str, str]:
+    """Labels of a series written as a selector: metric{label="value", ...}."""
+    text = text.strip()
+    if text in ('', '{}'):
+        return {}
+    node = parse(text)
+    if not isinstance(node, VectorSelector) or any(m.op != '=' for m in node.matchers):
+        raise ValueError(f"invalid series {text!r}: use metric{{label=\"value\"}}")
+    labels = {m.name: m.value for m in node.matchers}
+    if node.name:
+        labels['__name__'] = node.name
+    return labels
+
+
+def load_rules(paths: List[Path]) -> List[Rule]:
+    rules = []
+    for path in paths:
+        for doc in load_rule_documents(path):
+            if not isinstance(doc, dict):
+                continue
+            groups, _ = rule_groups(doc)
+            for group in groups:
+                for rule in group.get('rules') or []:
+                    if 'expr' not in rule:
+                        continue
+                    kind = 'alert' if 'alert' in rule else 'record'
+                    rules.append(Rule(
+                        kind=kind,
+                        name=str(rule[kind]),
+                        expr=str(rule['expr']),
+                        hold=parse_duration(str(rule.get('for') or '0s')),
+                        labels={str(k): str(v) for k, v in (rule.get('labels') or {}).items()},
+                        file=path,
+                    ))
+    return rules
+
+
+def render_labels(rule_labels: Dict[str, str], series: Dict[str, str]) -> Dict[str, str]:
+    """Rule labels with {{ $labels.x }} expanded; other templates are kept as-is."""
+    return {
+        key: LABEL_TEMPLATE_RE.sub(lambda m: series.get(m.group(1), ''), value)
+        for key, value in rule_labels.items()
+    }
+
+
+def build_storage(test: Dict, interval: float) -> Storage:
+    storage = Storage()
+    for entry in test.get('input_series') or []:
+        labels = parse_series(entry['series'])
+        samples = [(i * interval, v) for i, v in enumerate(parse_values(entry.get('values', ''))) if v != '_']
+        replicas = int(entry.get('replicas', 0))
+        if replicas:
+            for r in range(replicas):
+                storage.add(dict(labels, replica=str(r)), samples)
+        else:
+            storage.add(labels, samples)
+    return storage
+
+
+def values_close(expected: float, actual: float) -> bool:
+    if math.isnan(expected) or math.isnan(actual):
+        return math.isnan(expected) and math.isnan(actual)
+    return math.isclose(expected, actual, rel_tol=1e-6, abs_tol=1e-9)
+
+
+def run_test(test: Dict, rules: List[Rule], eval_interval: float) -> TestResult:
+    name = str(test.get('name', '(unnamed)'))
+    errors: List[str] = []
+    interval = parse_duration(str(test.get('interval') or eval_interval))
+    alert_tests = test.get('alert_rule_test') or []
+    expr_tests = test.get('promql_expr_test') or []
+
+    try:
+        storage = build_storage(test, interval)
+        eval_times = [parse_duration(str(t['eval_time'])) for t in alert_tests + expr_tests]
+    except (KeyError, ValueError) as e:
+        return TestResult(name, [f"invalid test: {e}"], 0, 0)
+    end = max(eval_times, default=0.0)
+    times = [i * eval_interval for i in range(int(end // eval_interval) + 1)]
+    evaluator = Evaluator(storage, times)
+
+    def index_of(t: float) -> int:
+        return min(int(t // eval_interval), len(times) - 1)
+
+    # Recording rules feed later rules, as they would in Prometheus
+    for rule in rules:
+        if rule.kind != 'record':
+            continue
+        try:
+            result = evaluator.eval_vector(parse(rule.expr))
+        except (PromQLError, EvaluationError) as e:
+            errors.append(f"record {rule.name}: {e}")
+            continue
+        for labels, column in result.items():
+            series = dict(labels, **rule.labels, __name__=rule.name)
+            storage.add(series, [(t, v) for t, v in zip(times, column) if v is not None])
+
+    alerts = {rule.name: rule for rule in rules if rule.kind == 'alert'}
+    states_cache: Dict[str, Dict[Labels, List[Optional[str]]]] = {}
+    for check in alert_tests:
+        alertname = str(check.get('alertname', ''))
+        at = parse_duration(str(check['eval_time']))
+        rule = alerts.get(alertname)
+        if rule is None:
+            errors.append(f"alertname {alertname!r} not found in rule files")
+            continue
+        if alertname not in states_cache:
+            try:
+                vector = evaluator.eval_vector(parse(rule.expr))
+            except (PromQLError, EvaluationError) as e:
+                errors.append(f"{alertname}: {e}")
+                continue
+            states_cache[alertname] = alert_states(vector, times, rule.hold)
+
+        k = index_of(at)
+        got = []
+        for labels, row in states_cache[alertname].items():
+            if row[k] == 'firing':
+                series = dict(labels)
+                series.update(render_labels(rule.labels, series))
+                series['alertname'] = alertname
+                got.append(make_labels(series))
+        got.sort()
+
+        if 'exp_count' in check:
+            if len(got) != int(check['exp_count']):
+                errors.append(f"{alertname} at {check['eval_time']}: expected {check['exp_count']} "
+                              f"firing alerts, got {len(got)}")
+            continue
+        expected = sorted(
+            make_labels(dict({str(k): str(v) for k, v in (e.get('exp_labels') or {}).items()},
+                             alertname=alertname))
+            for e in check.get('exp_alerts') or []
+        )
+        if got != expected:
+            errors.append(
+                f"{alertname} at {check['eval_time']}:\n"
+                f"        expected: {[format_labels(x) for x in expected]}\n"
+                f"        got:      {[format_labels(x) for x in got]}"
+            )
+
+    for check in expr_tests:
+        expr = str(check.get('expr', ''))
+        k = index_of(parse_duration(str(check['eval_time'])))
+        try:
+            value = evaluator.eval(parse(expr))
+            expected = {make_labels(parse_series(str(s.get('labels', '')))): float(s['value'])
+                        for s in check.get('exp_samples') or []}
+        except (PromQLError, EvaluationError, ValueError, KeyError) as e:
+            errors.append(f"{expr}: {e}")
+            continue
+        if isinstance(value, dict):
+            got = {labels: col[k] for labels, col in value.items() if col[k] is not None}
+        else:
+            got = {(): value[k]}
+        if set(got) != set(expected) or any(not values_close(expected[x], got[x]) for x in got):
+            fmt = lambda samples: [f"{format_labels(x)} {samples[x]:g}" for x in sorted(samples)]
+            errors.append(
+                f"{expr} at {check['eval_time']}:\n"
+                f"        expected: {fmt(expected)}\n"
+                f"        got:      {fmt(got)}"
+            )
+
+    return TestResult(name, errors, len(storage), len(times))
+
+
+def run_fixture(path: Path, repo_root: Path, pattern: Optional[re.Pattern],
+                tested: Set[str]) -> Tuple[int, int, int]:
+    """Run one fixture file; returns (passed, failed, cells evaluated)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        fixture = yaml.safe_load(f) or {}
+    if fixture.get('rule_files'):
+        paths = [(path.parent / p).resolve() for p in fixture['rule_files']]
+    else:
+        paths = rule_files(repo_root)
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        print(f"❌ {path.name}: rule file not found: {', '.join(str(p) for p in missing)}")
+        return 0, 1, 0
+    rules = load_rules(paths)
+    eval_interval = parse_duration(str(fixture.get('evaluation_interval') or DEFAULT_EVALUATION_INTERVAL))
+
+    print(f"📄 {path.relative_to(repo_root) if path.is_relative_to(repo_root) else path}")
+    passed = failed = cells = 0
+    for test in fixture.get('tests') or []:
+        if pattern and not pattern.search(str(test.get('name', ''))):
+            continue
+        tested.update(str(c.get('alertname')) for c in test.get('alert_rule_test') or [])
+        result = run_test(test, rules, eval_interval)
+        cells += result.series * result.steps
+        if result.errors:
+            failed += 1
+            print(f"  ❌ {result.name}")
+            for error in result.errors:
+                print(f"      {error}")
+        else:
+            passed += 1
+            print(f"  ✅ {result.name}")
+    return passed, failed, cells
+
+
+def main():
+    """Main test logic."""
+    parser = argparse.ArgumentParser(
+        description='Unit-test alerting rules offline against synthetic series'
+    )
+    parser.add_argument(
+        'fixtures',
+        nargs='*',
+        help=f'Fixture files (default: {TESTS_DIR}/*.yaml)'
+    )
+    parser.add_argument(
+        '--run',
+        type=str,
+        help='Only run tests whose name matches this regular expression'
+    )
+    parser.add_argument(
+        '--coverage',
+        action='store_true',
+        help='List alerts that no test checks'
+    )
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).parent.parent.resolve()
+    if args.fixtures:
+        fixtures = [Path(f).resolve() for f in args.fixtures]
+    else:
+        fixtures = sorted((repo_root / TESTS_DIR).glob('*.yaml'))
+    pattern = re.compile(args.run) if args.run else None
+
+    print("=" * 80)
+    print("Alerting Rule Tests")
+    print("=" * 80)
+    print()
+
+    if not fixtures:
+        print(f"⚠️  No fixtures found in {TESTS_DIR}/")
+        return
+
+    started = time.perf_counter()
+    tested: Set[str] = set()
+    passed = failed = cells = 0
+    for path in fixtures:
+        p, f, c = run_fixture(path, repo_root, pattern, tested)
+        passed, failed, cells = passed + p, failed + f, cells + c
+        print()
+    elapsed = time.perf_counter() - started
+
+    alerts = [rule for rule in load_rules(rule_files(repo_root)) if rule.kind == 'alert']
+    untested = [rule for rule in alerts if rule.name not in tested]
+
+    print("=" * 80)
+    print(f"Tests: {passed} passed, {failed} failed ({cells:,} series×steps in {elapsed:.2f}s)")
+    print(f"Coverage: {len(alerts) - len(untested)}/{len(alerts)} alerts tested")
+    if args.coverage and untested:
+        print()
+        for rule in untested:
+            print(f"  ⚪ {rule.file.name}: {rule.name}")
+    print("=" * 80)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
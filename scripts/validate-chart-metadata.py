@@ -10,34 +10,32 @@ This script validates that:
 Usage:
     python scripts/validate-chart-metadata.py
 
+    # Where does the time go? (per-phase table, Chrome trace, cProfile)
+    python scripts/validate-chart-metadata.py --timings --trace validate.trace.json
+    python scripts/validate-chart-metadata.py --profile validate.pstats
+
+    # Validate charts in parallel (0 = one worker per CPU)
+    python scripts/validate-chart-metadata.py --jobs 0
+
+    # Only charts touched since a git ref, or by staged changes
+    python scripts/validate-chart-metadata.py --changed-since origin/master
+    python scripts/validate-chart-metadata.py --staged
+
 Exit codes:
     0: All validations passed
     1: Validation failures found
 """
 
 import sys
-import yaml
+import time
+import argparse
 from pathlib import Path
-from typing import Dict, List, Tuple
-
-
-def load_yaml_file(file_path: Path) -> Dict:
-    """Load and parse YAML file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}")
-        sys.exit(1)
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-
-def find_chart_dirs(charts_dir: Path) -> List[Path]:
-    """Find all chart directories."""
-    chart_dirs = []
-    for item in charts_dir.iterdir():
-        if item.is_dir() and (item / "Chart.yaml").exists():
-            chart_dirs.append(item)
-    return sorted(chart_dirs)
+from chartlib import ChartRepository, find_chart_dirs, load_yaml_file
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.parallel import EXECUTORS, map_repository, resolve_jobs
+from chartlib.timing import add_timing_arguments, instrument, span
 
 
 def normalize_keywords(keywords: List[str]) -> set:
@@ -74,12 +72,87 @@ def validate_chart(
     return (len(errors) == 0, errors)
 
 
-def main():
+class ChartReport(NamedTuple):
+    """Outcome of checking one chart directory."""
+    name: str
+    valid: bool
+    lines: List[str]
+    elapsed: float
+    fatal: bool = False
+
+
+def check_chart(
+    repo: ChartRepository,
+    task: Tuple[Path, Optional[Dict]]
+) -> ChartReport:
+    """Load one chart's Chart.yaml and validate it against its metadata entry."""
+    chart_dir, metadata_entry = task
+    started = time.perf_counter()
+    chart_name = chart_dir.name
+    lines = [f"Checking {chart_name}..."]
+
+    try:
+        chart_yaml = repo.load_yaml(chart_dir / "Chart.yaml")
+    except Exception as e:
+        lines.append(f"Error loading {chart_dir / 'Chart.yaml'}: {e}")
+        return ChartReport(chart_name, False, lines, time.perf_counter() - started, fatal=True)
+
+    # Check if chart exists in metadata
+    if metadata_entry is None:
+        lines.append(f"  ❌ Chart not found in charts-metadata.yaml")
+        return ChartReport(chart_name, False, lines, time.perf_counter() - started)
+
+    with span('validate chart', chart=chart_name):
+        is_valid, errors = validate_chart(chart_name, chart_yaml, metadata_entry)
+
+    if is_valid:
+        lines.append(f"  ✅ Valid")
+    else:
+        lines.append(f"  ❌ Validation failed:")
+        lines.extend(errors)
+    lines.append("")
+
+    return ChartReport(chart_name, is_valid, lines, time.perf_counter() - started)
+
+
+def print_timing_summary(reports: List[ChartReport], wall_time: float, jobs: int) -> None:
+    """Print per-chart validation timings, slowest first."""
+    print("Timing summary:")
+    for report in sorted(reports, key=lambda r: r.elapsed, reverse=True):
+        print(f"  {report.name:<32} {report.elapsed * 1000:8.1f} ms")
+    total = sum(r.elapsed for r in reports)
+    print(f"  {'total (sum of charts)':<32} {total * 1000:8.1f} ms")
+    print(f"  {f'wall time ({jobs} jobs)':<32} {wall_time * 1000:8.1f} ms")
+    print()
+
+
+def main(argv=None, repo=None):
     """Main validation logic."""
+    parser = argparse.ArgumentParser(
+        description='Validate Chart.yaml files against charts-metadata.yaml'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Validate charts in N parallel workers (0 = one per CPU, default: 1)'
+    )
+    parser.add_argument(
+        '--executor',
+        choices=EXECUTORS,
+        default='process',
+        help='Worker pool type for --jobs (default: process)'
+    )
+    add_diff_arguments(parser)
+    add_timing_arguments(parser)
+    args = parser.parse_args(argv)
+    instrument(args)
+
     # Setup paths
-    repo_root = Path(__file__).parent.parent
-    charts_dir = repo_root / "charts"
-    metadata_file = repo_root / "charts" / "charts-metadata.yaml"
+    if repo is None:
+        repo = ChartRepository(Path(__file__).parent.parent)
+    charts_dir = repo.charts_dir
+    metadata_file = repo.metadata_file
 
     print("=" * 80)
     print("Chart Metadata Validation")
@@ -91,7 +164,8 @@ def main():
         print(f"Error: {metadata_file} not found")
         sys.exit(1)
 
-    metadata = load_yaml_file(metadata_file)
+    with span('load metadata'):
+        metadata = load_yaml_file(metadata_file, repo)
     charts_metadata = metadata.get('charts', {})
 
     # Find all charts
@@ -101,46 +175,43 @@ def main():
         print(f"Error: No charts found in {charts_dir}")
         sys.exit(1)
 
+    # Restrict to charts touched by the git diff
+    if diff_requested(args):
+        all_charts = {d.name for d in chart_dirs} | set(charts_metadata)
+        try:
+            with span('git diff'):
+                affected = affected_charts(
+                    repo.repo_root, all_charts, args.changed_since, args.staged
+                )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+        charts_metadata = {k: v for k, v in charts_metadata.items() if k in affected}
+        print(f"Git diff affects {len(affected)} chart(s)")
+
     print(f"Found {len(chart_dirs)} charts to validate")
     print(f"Metadata file contains {len(charts_metadata)} chart entries")
     print()
 
-    # Validate each chart
+    # Validate each chart; results come back in chart order
+    tasks = [(chart_dir, charts_metadata.get(chart_dir.name)) for chart_dir in chart_dirs]
+    started = time.perf_counter()
+    with span('validate charts', jobs=args.jobs):
+        reports = map_repository(repo, check_chart, tasks, args.jobs, args.executor)
+    wall_time = time.perf_counter() - started
+
     all_valid = True
     charts_checked = []
 
-    for chart_dir in chart_dirs:
-        chart_name = chart_dir.name
-        chart_yaml_path = chart_dir / "Chart.yaml"
-
-        print(f"Checking {chart_name}...")
-        charts_checked.append(chart_name)
-
-        # Load Chart.yaml
-        chart_yaml = load_yaml_file(chart_yaml_path)
-
-        # Check if chart exists in metadata
-        if chart_name not in charts_metadata:
-            print(f"  ❌ Chart not found in charts-metadata.yaml")
+    for report in reports:
+        charts_checked.append(report.name)
+        for line in report.lines:
+            print(line)
+        if report.fatal:
+            sys.exit(1)
+        if not report.valid:
             all_valid = False
-            continue
-
-        # Validate chart
-        is_valid, errors = validate_chart(
-            chart_name,
-            chart_yaml,
-            charts_metadata[chart_name]
-        )
-
-        if is_valid:
-            print(f"  ✅ Valid")
-        else:
-            print(f"  ❌ Validation failed:")
-            for error in errors:
-                print(error)
-            all_valid = False
-
-        print()
 
     # Check for charts in metadata but not in filesystem
     for meta_chart_name in charts_metadata.keys():
@@ -148,6 +219,11 @@ def main():
             print(f"⚠️  Warning: {meta_chart_name} exists in metadata but not in charts/ directory")
             print()
 
+    if args.jobs != 1:
+        print_timing_summary(reports, wall_time, resolve_jobs(args.jobs))
+
+    repo.save_cache()
+
     # Summary
     print("=" * 80)
     if all_valid:
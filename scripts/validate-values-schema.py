@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Validate Scenario Values Files Against Chart Schemas
+
+This script checks every values-*.yaml scenario file (values-home-single.yaml,
+values-prod-*.yaml, values-example.yaml, ...) against a schema for its chart:
+1. values.schema.json when the chart ships one
+2. Otherwise a schema inferred from the chart's base values.yaml
+
+It reports keys the chart does not define and values whose type differs from
+the base. Empty maps, empty lists, empty strings and null defaults in the
+base are treated as free-form. Undefined keys that the chart's templates
+read anyway (optional settings values.yaml only documents in comments) are
+warnings, not errors. A values-example.yaml holding several example
+documents is checked document by document. Charts are checked in parallel
+and all files go through the shared parse cache.
+
+Usage:
+    python3 scripts/validate-values-schema.py
+
+    # Check specific chart
+    python3 scripts/validate-values-schema.py --chart redis
+
+    # Parallel (0 = one worker per CPU), only charts touched since a ref
+    python3 scripts/validate-values-schema.py --jobs 0 --changed-since origin/master
+
+Exit codes:
+    0: All scenario files match their schema
+    1: Unknown keys no template reads, or type mismatches found
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from chartlib import ChartRepository, find_chart_dirs
+from chartlib.gitdiff import GitError, add_diff_arguments, affected_charts, diff_requested
+from chartlib.parallel import EXECUTORS, map_repository, resolve_jobs
+from chartlib.render import chart_scenarios, scenario_values
+from chartlib.valuerefs import is_used, reference_prefixes, template_references
+
+# Maps whose keys are user-defined even when the base values.yaml ships
+# example entries (annotations, labels, env maps, ...), and Kubernetes
+# objects the templates pass through verbatim with toYaml
+FREEFORM_KEY_SUFFIXES = (
+    'annotations',
+    'labels',
+    'selector',
+    'probe',
+    'securitycontext',
+    'resources',
+    'affinity',
+    'env',
+    'extraenv',
+    'envvars',
+    'config',
+    'configs',
+    'settings',
+    'data',
+    'stringdata',
+    'secrets',
+)
+
+
+class ChartSchemaReport(NamedTuple):
+    """Outcome of checking one chart's scenario files."""
+    name: str
+    schema_source: str
+    files: List[str]
+    issues: Dict[str, List[str]]
+    # Unknown keys the templates read anyway (documented only in comments)
+    warnings: Dict[str, List[str]]
+    elapsed: float
+
+
+def json_type(value: Any) -> str:
+    """JSON schema type name of a parsed YAML value."""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, float):
+        return 'number'
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, list):
+        return 'array'
+    return 'string'
+
+
+def is_freeform(key: str) -> bool:
+    """Whether a map under this key holds arbitrary user-defined keys.
+
+    A suffix matches the whole key or its last camelCase/snake_case words:
+    podAnnotations, extraEnv and pod_labels match, metadata does not.
+    """
+    lowered = key.lower()
+    for suffix in FREEFORM_KEY_SUFFIXES:
+        if lowered == suffix:
+            return True
+        if len(key) > len(suffix) and lowered.endswith(suffix):
+            start = len(key) - len(suffix)
+            if key[start].isupper() or key[start - 1] in '_-.':
+                return True
+    return False
+
+
+def merge_schemas(a: Dict, b: Dict) -> Dict:
+    """Combine two inferred schemas (used for list items)."""
+    if a.get('type') != b.get('type'):
+        return {}
+    if a.get('type') != 'object':
+        return a
+    properties = dict(a.get('properties', {}))
+    for key, sub in b.get('properties', {}).items():
+        properties[key] = merge_schemas(properties[key], sub) if key in properties else sub
+    merged = {'type': 'object', 'properties': properties}
+    if a.get('additionalProperties') is False and b.get('additionalProperties') is False:
+        merged['additionalProperties'] = False
+    return merged
+
+
+def infer_schema(value: Any, key: str = '', closed: bool = True) -> Dict:
+    """Infer a JSON schema subset from a base values.yaml node.
+
+    Objects inside lists (ports, hosts, network policy rules, ...) are
+    examples rather than a complete key set, so they stay open.
+    """
+    kind = json_type(value)
+    # "" is the usual "unset" placeholder (nodePort: "", storageClass: "")
+    if kind == 'null' or value == '':
+        return {}
+    if kind == 'object':
+        if not value:
+            return {'type': 'object'}
+        # Everything below a free-form key stays open (resources.limits.nvidia.com/gpu)
+        closed = closed and not is_freeform(key)
+        schema = {
+            'type': 'object',
+            'properties': {k: infer_schema(v, str(k), closed) for k, v in value.items()},
+        }
+        if closed:
+            schema['additionalProperties'] = False
+        return schema
+    if kind == 'array':
+        if not value:
+            return {'type': 'array'}
+        items = infer_schema(value[0], closed=False)
+        for item in value[1:]:
+            items = merge_schemas(items, infer_schema(item, closed=False))
+        return {'type': 'array', 'items': items}
+    if kind in ('integer', 'number'):
+        return {'type': 'number'}
+    return {'type': kind}
+
+
+def type_matches(value: Any, expected) -> bool:
+    """Check a value against a schema `type` (string or list)."""
+    actual = json_type(value)
+    for name in (expected if isinstance(expected, list) else [expected]):
+        if name == actual or (name == 'number' and actual == 'integer'):
+            return True
+    return False
+
+
+def dotted(keys: Tuple) -> str:
+    """a.b[0].c for a key path."""
+    text = ''
+    for key in keys:
+        text += f"[{key}]" if isinstance(key, int) else (f".{key}" if text else str(key))
+    return text
+
+
+def check_value(value: Any, schema: Dict, keys: Tuple, issues: List[str], unknown: List[Tuple]) -> None:
+    """Collect schema violations for a scenario values node.
+
+    Keys the schema does not allow go to unknown rather than issues, so the
+    caller can tell them apart from type mismatches.
+    """
+    # null in an override file removes the default, which Helm allows
+    if not schema or value is None:
+        return
+
+    expected = schema.get('type')
+    if expected and not type_matches(value, expected):
+        issues.append(
+            f"type mismatch at {dotted(keys) or '<root>'}: expected {expected}, got {json_type(value)}"
+        )
+        return
+
+    if isinstance(value, dict):
+        properties = schema.get('properties', {})
+        additional = schema.get('additionalProperties', True)
+        for key, sub in value.items():
+            sub_keys = keys + (str(key),)
+            if key in properties:
+                check_value(sub, properties[key], sub_keys, issues, unknown)
+            elif additional is False:
+                unknown.append(sub_keys)
+            elif isinstance(additional, dict):
+                check_value(sub, additional, sub_keys, issues, unknown)
+    elif isinstance(value, list) and isinstance(schema.get('items'), dict):
+        for index, item in enumerate(value):
+            check_value(item, schema['items'], keys + (index,), issues, unknown)
+
+
+def load_chart_schema(repo: ChartRepository, chart_dir: Path):
+    """Return (schema, source) for a chart, or (None, reason)."""
+    schema_file = chart_dir / "values.schema.json"
+    if schema_file.exists():
+        with open(schema_file, 'r', encoding='utf-8') as f:
+            return json.load(f), schema_file.name
+
+    values_file = chart_dir / "values.yaml"
+    if not values_file.exists():
+        return None, "no values.yaml"
+    return infer_schema(repo.load_yaml(values_file) or {}), values_file.name
+
+
+def scenario_files(chart_dir: Path) -> List[Path]:
+    """All values-*.yaml overlays of a chart."""
+    return sorted(chart_dir.glob("values-*.yaml"))
+
+
+def check_chart(repo: ChartRepository, chart_dir: Path) -> ChartSchemaReport:
+    """Check every scenario file of one chart."""
+    started = time.perf_counter()
+    files = [f.name for f in scenario_files(chart_dir)]
+    issues: Dict[str, List[str]] = {}
+    warnings: Dict[str, List[str]] = {}
+
+    try:
+        schema, source = load_chart_schema(repo, chart_dir)
+    except Exception as e:
+        issues['values.yaml'] = [f"cannot load schema: {e}"]
+        return ChartSchemaReport(chart_dir.name, '', files, issues, warnings, time.perf_counter() - started)
+
+    # Template references, read the first time a file has unknown keys
+    refs: Optional[Set[Tuple]] = None
+    prefixes: Set[Tuple] = set()
+    if schema is not None:
+        for scenario in chart_scenarios(chart_dir):
+            if scenario.values_file is None:
+                continue
+            try:
+                documents = scenario_values(repo, scenario)
+            except Exception as e:
+                issues[scenario.values_file.name] = [f"cannot parse: {e}"]
+                continue
+            # Each example of a multi-document values-example.yaml is checked on its own
+            for document in documents:
+                file_issues: List[str] = []
+                unknown: List[Tuple] = []
+                check_value(document.values or {}, schema, (), file_issues, unknown)
+                if unknown and refs is None:
+                    refs = template_references(chart_dir)
+                    prefixes = reference_prefixes(refs)
+                file_warnings = []
+                for keys in unknown:
+                    # values.yaml often documents optional keys only in comments
+                    if is_used(keys, prefixes, refs):
+                        file_warnings.append(f"not in values.yaml, read by templates: {dotted(keys)}")
+                    else:
+                        file_issues.append(f"unknown key: {dotted(keys)}")
+                if file_issues:
+                    issues[document.source] = file_issues
+                if file_warnings:
+                    warnings[document.source] = file_warnings
+
+    return ChartSchemaReport(chart_dir.name, source, files, issues, warnings, time.perf_counter() - started)
+
+
+def main():
+    """Main validation logic."""
+    parser = argparse.ArgumentParser(
+        description='Validate values-*.yaml scenario files against each chart schema'
+    )
+    parser.add_argument(
+        '--chart',
+        type=str,
+        help='Check specific chart only'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Check charts in N parallel workers (0 = one per CPU, default: 1)'
+    )
+    parser.add_argument(
+        '--executor',
+        choices=EXECUTORS,
+        default='process',
+        help='Worker pool type for --jobs (default: process)'
+    )
+    add_diff_arguments(parser)
+    args = parser.parse_args()
+
+    repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Scenario Values Schema Validation")
+    print("=" * 80)
+    print()
+
+    chart_dirs = find_chart_dirs(repo.charts_dir)
+    if args.chart:
+        chart_dirs = [d for d in chart_dirs if d.name == args.chart]
+        if not chart_dirs:
+            print(f"Error: Chart '{args.chart}' not found in {repo.charts_dir}")
+            sys.exit(1)
+
+    if diff_requested(args):
+        try:
+            affected = affected_charts(
+                repo.repo_root, {d.name for d in chart_dirs}, args.changed_since, args.staged
+            )
+        except GitError as e:
+            print(f"Error: git diff failed: {e}")
+            sys.exit(1)
+        chart_dirs = [d for d in chart_dirs if d.name in affected]
+
+    started = time.perf_counter()
+    reports = map_repository(repo, check_chart, chart_dirs, args.jobs, args.executor)
+    wall_time = time.perf_counter() - started
+    repo.save_cache()
+
+    total_files = sum(len(r.files) for r in reports)
+    print(f"Checked {total_files} scenario files in {len(reports)} charts "
+          f"({wall_time * 1000:.0f} ms, {resolve_jobs(args.jobs)} jobs)")
+    print()
+
+    failed_files = 0
+    warning_count = 0
+    for report in reports:
+        if not report.issues and not report.warnings:
+            continue
+        print(f"{report.name} (schema: {report.schema_source or 'unavailable'})")
+        for name, file_issues in report.issues.items():
+            failed_files += 1
+            print(f"  ❌ {name}:")
+            for issue in file_issues:
+                print(f"    - {issue}")
+        for name, file_warnings in report.warnings.items():
+            warning_count += len(file_warnings)
+            print(f"  ⚠️  {name}:")
+            for warning in file_warnings:
+                print(f"    - {warning}")
+        print()
+
+    # Summary
+    print("=" * 80)
+    if warning_count:
+        print(f"⚠️  {warning_count} key(s) missing from values.yaml but read by templates - "
+              f"consider adding defaults")
+    if failed_files == 0:
+        print("✅ All scenario files match their chart schema!")
+        print("=" * 80)
+        sys.exit(0)
+    else:
+        print(f"❌ {failed_files} scenario file(s) have schema issues - please fix the errors above")
+        print("=" * 80)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
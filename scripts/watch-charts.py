@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Watch Chart Metadata and Regenerate on Change
+
+This script keeps charts-metadata.yaml and every Chart.yaml parsed in memory
+and reacts to edits as they are saved:
+- Only the charts an edit affects are re-validated: a Chart.yaml edit affects
+  its chart, a charts-metadata.yaml edit the entries whose content changed
+- docs/CHARTS.md and docs/ARTIFACTHUB_DASHBOARD.md are regenerated from the
+  in-memory model; catalog sections of unaffected charts are reused and a
+  file whose content did not change is not rewritten (the dashboard's
+  generation timestamps alone do not count as a change)
+
+Changes are picked up with inotify on Linux and by polling elsewhere (or
+with --poll, e.g. on network filesystems). A burst of saves within the
+--debounce window is handled as one change. Stop with Ctrl-C; the parse and
+section caches are saved on exit so the next run starts warm.
+
+Usage:
+    # Validate and regenerate docs on every save
+    python3 scripts/watch-charts.py
+
+    # Validation only
+    python3 scripts/watch-charts.py --no-docs
+
+    # Poll once a second instead of using inotify
+    python3 scripts/watch-charts.py --poll --interval 1
+
+Exit codes:
+    0: Stopped with Ctrl-C
+    1: Errors occurred on startup
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from chartlib import ChartRepository
+from chartlib.catalog import CatalogModel, registered_outputs
+from chartlib.output import SectionCache, write_lines
+from chartlib.scripts import load_script
+from chartlib.watch import batches, open_watcher
+
+
+class WatchSession:
+    """Chart model kept in memory between changes."""
+
+    def __init__(self, repo: ChartRepository, docs: bool = True):
+        self.repo = repo
+        self.validator = load_script('validate-chart-metadata')
+        self.catalog = load_script('generate-chart-catalog') if docs else None
+        self.dashboard = load_script('generate-artifacthub-dashboard') if docs else None
+        self.sections = None
+        if docs:
+            self.sections = SectionCache(repo.repo_root, 'catalog-sections', self.catalog.RENDERER_VERSION)
+        # Last metadata that parsed; kept while the file is mid-edit and broken
+        self.metadata: Dict = {}
+        self.charts_metadata: Dict[str, Dict] = {}
+        self.chart_names: Set[str] = set()
+        self.failing: Set[str] = set()
+
+    def directories(self) -> List[Path]:
+        """charts/ and every directory below it."""
+        charts_dir = self.repo.charts_dir
+        return [charts_dir] + sorted(p for p in charts_dir.iterdir() if p.is_dir())
+
+    def load_metadata(self) -> Optional[Dict[str, Dict]]:
+        """Re-read charts-metadata.yaml; None (keeping the old model) when it does not parse."""
+        self.repo.reload()
+        try:
+            metadata = self.repo.metadata
+        except Exception as e:
+            problem = getattr(e, 'problem', None)
+            mark = getattr(e, 'problem_mark', None)
+            message = f"{problem} (line {mark.line + 1})" if problem and mark else str(e).splitlines()[0]
+            print(f"  ❌ {self.repo.metadata_file.name}: {message}")
+            return None
+        self.metadata = metadata
+        return metadata.get('charts', {})
+
+    def start(self) -> bool:
+        """Load and check everything once."""
+        charts = self.load_metadata()
+        if charts is None:
+            return False
+        self.charts_metadata = charts
+        self.chart_names = {d.name for d in self.repo.chart_dirs()}
+        self.validate(self.chart_names | set(charts), quiet=True)
+        print(f"Validated {len(self.chart_names)} chart(s): "
+              + (f"{len(self.failing)} failing ({', '.join(sorted(self.failing))})"
+                 if self.failing else "all valid"))
+        if self.sections is not None:
+            print(self.render())
+        return True
+
+    def classify(self, changed: Set[Path]) -> Tuple[Set[str], bool, bool]:
+        """(affected charts, metadata changed, chart directories changed) for changed paths."""
+        charts_dir = self.repo.charts_dir
+        affected: Set[str] = set()
+        metadata_changed = False
+        dirs_changed = False
+        for path in changed:
+            if path == charts_dir:
+                # Event queue overflow: start over
+                return self.chart_names | set(self.charts_metadata), True, True
+            if path == self.repo.metadata_file:
+                metadata_changed = True
+            elif path.parent == charts_dir and (path.is_dir() or path.name in self.chart_names):
+                affected.add(path.name)
+                dirs_changed = True
+            elif path.name == 'Chart.yaml' and path.parent.parent == charts_dir:
+                affected.add(path.parent.name)
+        return affected, metadata_changed, dirs_changed
+
+    def handle(self, changed: Set[Path]) -> None:
+        """React to one debounced batch of changed paths."""
+        affected, metadata_changed, dirs_changed = self.classify(changed)
+        if not affected and not metadata_changed:
+            return
+
+        started = time.perf_counter()
+        print(f"[{datetime.now():%H:%M:%S}] Change detected")
+        if metadata_changed:
+            charts = self.load_metadata()
+            if charts is None:
+                return
+            affected |= {
+                chart_id
+                for chart_id in set(charts) | set(self.charts_metadata)
+                if charts.get(chart_id) != self.charts_metadata.get(chart_id)
+            }
+            self.charts_metadata = charts
+        if dirs_changed:
+            self.repo.reload()
+            self.chart_names = {d.name for d in self.repo.chart_dirs()}
+
+        self.validate(affected)
+        rendered = self.render() if self.sections is not None else ''
+        elapsed = (time.perf_counter() - started) * 1000
+        if rendered:
+            print(rendered)
+        print(f"  ⏱️  {len(affected)} chart(s) checked in {elapsed:.1f} ms")
+        print()
+
+    def validate(self, charts: Set[str], quiet: bool = False) -> None:
+        """Re-validate charts, printing results (failures only when quiet)."""
+        for name in sorted(charts):
+            chart_dir = self.repo.charts_dir / name
+            if name not in self.chart_names:
+                self.failing.discard(name)
+                if name in self.charts_metadata:
+                    print(f"  ⚠️  {name}: exists in metadata but not in charts/ directory")
+                elif not quiet:
+                    print(f"  🗑️  {name}: removed")
+                continue
+            report = self.validator.check_chart(self.repo, (chart_dir, self.charts_metadata.get(name)))
+            if report.valid:
+                if not quiet:
+                    fixed = " (fixed)" if name in self.failing else ""
+                    print(f"  ✅ {name}: valid{fixed}")
+                self.failing.discard(name)
+            else:
+                self.failing.add(name)
+                print(f"  ❌ {name}:")
+                for line in report.lines[1:]:
+                    if line and not line.startswith("  ❌ Validation failed"):
+                        print(f"  {line}")
+
+    def render(self) -> str:
+        """Regenerate the docs from the current model; returns a status line."""
+        outputs = registered_outputs()
+        model = CatalogModel(self.metadata, self.repo)
+        before = self.sections.rendered
+        catalog_path = outputs['catalog'].path
+        dashboard_path = outputs['artifacthub-dashboard'].path
+        catalog_changed = write_lines(
+            self.repo.repo_root / catalog_path,
+            self.catalog.render_catalog(model, self.sections)
+        )
+        dashboard_changed = write_lines(
+            self.repo.repo_root / dashboard_path,
+            self.dashboard.render_dashboard(model, self.dashboard.REPO_NAME),
+            outputs['artifacthub-dashboard'].volatile
+        )
+        rendered = self.sections.rendered - before
+        return (
+            f"  📝 {catalog_path}: {'updated' if catalog_changed else 'unchanged'} "
+            f"({rendered} section(s) re-rendered), "
+            f"{dashboard_path}: {'updated' if dashboard_changed else 'unchanged'}"
+        )
+
+    def save(self) -> None:
+        self.repo.save_cache()
+        if self.sections is not None:
+            self.sections.save()
+
+
+def main(argv=None, repo=None):
+    """Main watch loop."""
+    parser = argparse.ArgumentParser(
+        description='Re-validate charts and regenerate docs whenever metadata changes'
+    )
+    parser.add_argument(
+        '--debounce',
+        type=int,
+        default=100,
+        metavar='MS',
+        help='Handle saves within MS milliseconds of each other as one change (default: 100)'
+    )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll for changes instead of using inotify'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=0.5,
+        help='Polling interval in seconds (default: 0.5)'
+    )
+    parser.add_argument(
+        '--no-docs',
+        action='store_true',
+        help='Only re-validate; do not regenerate CHARTS.md and ARTIFACTHUB_DASHBOARD.md'
+    )
+    args = parser.parse_args(argv)
+
+    if repo is None:
+        repo = ChartRepository(Path(__file__).parent.parent)
+
+    print("=" * 80)
+    print("Chart Metadata Watch")
+    print("=" * 80)
+    print()
+
+    if not repo.metadata_file.exists():
+        print(f"Error: {repo.metadata_file} not found")
+        sys.exit(1)
+
+    session = WatchSession(repo, docs=not args.no_docs)
+    if not session.start():
+        sys.exit(1)
+    session.save()
+
+    watcher = open_watcher(session.directories(), polling=args.poll, interval=args.interval)
+    print()
+    print(f"👀 Watching {repo.charts_dir} ({watcher.kind}), press Ctrl-C to stop")
+    print()
+
+    try:
+        for changed in batches(watcher, args.debounce / 1000):
+            for path in changed:
+                if path.parent == repo.charts_dir and path.is_dir():
+                    try:
+                        watcher.watch(path)
+                    except OSError as e:
+                        print(f"  ⚠️  Cannot watch {path}: {e}")
+            session.handle(changed)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        watcher.close()
+        session.save()
+
+    print("=" * 80)
+    print("Watch stopped")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()